@@ -10,7 +10,13 @@ build_pack_data.py — OCG 卡包数据构建脚本
 【使用方法】
   python build_pack_data.py                  # 构建所有 OCG 卡包
   python build_pack_data.py ocg_blzd         # 只构建指定卡包
+  python build_pack_data.py --force          # 忽略增量构建清单，强制重建所有卡包
+  python build_pack_data.py --jobs 4         # 4 个进程并行构建（不写数字则使用全部 CPU 核心）
+  python build_pack_data.py --changed <差异记录>  # 只构建引用了变更卡牌的卡包（差异记录由 update_cards_db.py 生成）
+  python build_pack_data.py --split-text     # 本次强制使用文本分片输出（默认按 packs.json 的 splitText）
+  python build_pack_data.py --no-split-text  # 本次强制使用完整输出（效果文本内联在卡包文件中）
   python build_pack_data.py --check          # 检查哪些卡在 cards.json 中找不到
+  python build_pack_data.py --validate       # 校验全部卡包配置（构建前也会自动校验，有错误时不构建）
   python build_pack_data.py --info           # 查看 cards.json 统计信息
 
 【数据流】
@@ -18,6 +24,32 @@ build_pack_data.py — OCG 卡包数据构建脚本
       ↓
   ocg_blzd.json (增强版：id+稀有度+完整卡牌信息)
 
+  cards.json 采用流式解析（逐条解码），只保留 extract_card_details() 用到的字段；
+  构建/检查时只保留卡包引用到的卡牌密码，降低内存占用。
+
+【增量构建】
+  data/ocg/.build_manifest.json 记录每个卡包的 cardIds 哈希、引用卡牌记录的哈希和输出文件哈希，
+  三者都没有变化的卡包直接跳过，不再重写文件（--force 强制全部重建）。
+
+【文本分片模式（data/ocg/packs.json 的 "splitText"）】
+  cardData 中的长文本（desc / pdesc / jp_ruby）移到 data/ocg/cards/text/{卡包文件名}，
+  卡包文件只保留开包需要的名称、类型和攻防，并写入 "textShard" 字段；
+  前端只在需要效果文本时才加载文本分片。构建时按卡包报告节省的字节数。
+  输出模式由 packs.json 顶层的 "splitText" 决定（未配置时为完整输出），
+  --split-text / --no-split-text 只覆盖本次构建；切换到完整输出时恢复内联文本并删除文本分片。
+
+【抽卡查找表（drawTables）】
+  ocg_default 方案的卡包在卡包文件中写入 "drawTables"：按基础稀有度 / 所含版本分好的卡牌下标池，
+  N 卡池（NR 按 nrWeightRatio 加权）和 versionOdds 的 Walker 别名表。
+  前端开包时直接按下标取卡，每个卡位 O(1) 抽取，不再每包遍历整个卡池。
+  nrWeightRatio / versionOdds 变化时（packs.json 修改）会重新生成。
+  cardsHash 为 cardIds 中 (密码, rarityVersions) 序列的 32 位 FNV-1a 哈希，前端算出的值不一致时
+  （卡包文件改了卡牌或稀有度但没有重新构建）不使用查找表，退回逐张扫描。
+
+【预览网格图集】
+  配置了 imageMapFile + localImagesDir 的卡包，构建后调用 tools/build_image_atlas.py
+  把本地小图拼成图集（需要 Pillow，未安装时跳过）。
+
 【输出格式】
   每张卡的 cardsData 节点包含：
   - cn_name: 中文名
@@ -34,23 +66,61 @@ build_pack_data.py — OCG 卡包数据构建脚本
   - type: 卡牌类型（数值编码）
 """
 
+import hashlib
 import json
 import os
 import sys
 import time
 
+import cards_index
+from cards_index import iter_cards_json, slim_card_entry
+
 
 # ====== 路径配置 ======
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(SCRIPT_DIR, 'data')
 COMMON_CARDS_PATH = os.path.join(DATA_DIR, 'common', 'cards.json')
+TOOLS_DIR = os.path.join(SCRIPT_DIR, 'tools')
 OCG_PACKS_PATH = os.path.join(DATA_DIR, 'ocg', 'packs.json')
 OCG_CARDS_DIR = os.path.join(DATA_DIR, 'ocg', 'cards')
+OCG_TEXT_DIR = os.path.join(OCG_CARDS_DIR, 'text')
+# 文本分片模式下从 cardData 移到文本分片的字段
+TEXT_SHARD_FIELDS = ('desc', 'pdesc', 'jp_ruby')
+# 生成抽卡查找表的方案，默认值与 js/game.js 一致
+DRAW_TABLE_SCHEMES = ('ocg_default',)
+DEFAULT_NR_WEIGHT_RATIO = 0.2
+ALIAS_PROB_DIGITS = 9
+# 增量构建清单：记录每个卡包上次构建时的输入哈希（自动生成，不入库）
+BUILD_MANIFEST_PATH = os.path.join(DATA_DIR, 'ocg', '.build_manifest.json')
+
+
+def get_peak_rss_mb():
+    """
+    获取当前进程的峰值内存占用（MB），不支持的平台（如 Windows）返回 None
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 单位为字节
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def load_cards_db(only_ids=None):
+    """
+    加载 cards.json 全量卡牌数据库（只保留网页需要的字段）
 
+    优先使用二进制索引 cards.idx（见 cards_index.py）：
+      - 指定 only_ids 时按密码二分查找，无需解析其余卡牌
+      - 索引不存在或与 cards.json 的 MD5 不一致时自动重建
+    无法使用索引时回退为流式解析 cards.json。
+
+    参数:
+      only_ids: 可选，卡牌密码集合；指定后只保留这些密码对应的卡牌
 
-def load_cards_db():
-    """
-    加载 cards.json 全量卡牌数据库
     返回两个映射：
       - by_id: { 卡牌密码(int) → 卡牌数据(dict) }
       - by_cid: { cid(int) → 卡牌数据(dict) }
@@ -58,13 +128,13 @@ def load_cards_db():
     print(f'📂 正在加载 cards.json ...')
     start = time.time()
 
-    with open(COMMON_CARDS_PATH, 'r', encoding='utf-8') as f:
-        raw = json.load(f)
+    if only_ids is not None:
+        only_ids = {int(i) for i in only_ids}
 
     by_id = {}   # 卡牌密码 → 数据
     by_cid = {}  # cid → 数据
 
-    for cid_str, card in raw.items():
+    def add(card):
         card_id = card.get('id')
         cid = card.get('cid')
         if card_id:
@@ -72,11 +142,61 @@ def load_cards_db():
         if cid:
             by_cid[int(cid)] = card
 
+    index = cards_index.open_index(COMMON_CARDS_PATH)
+    if index is not None:
+        source = '索引'
+        with index:
+            scanned = len(index)
+            if only_ids is not None:
+                for card_id in sorted(only_ids):
+                    card = index.get_by_id(card_id)
+                    if card:
+                        add(card)
+            else:
+                for card in index.iter_records():
+                    add(card)
+    else:
+        source = '流式解析'
+        scanned = 0
+        for cid_str, card in iter_cards_json(COMMON_CARDS_PATH):
+            scanned += 1
+            card_id = card.get('id')
+            if only_ids is not None and (not card_id or int(card_id) not in only_ids):
+                continue
+            add(slim_card_entry(card))
+
     elapsed = time.time() - start
-    print(f'✅ cards.json 加载完成：{len(by_id)} 张卡（耗时 {elapsed:.1f}s）')
+    peak_mb = get_peak_rss_mb()
+    peak_str = f'，峰值内存 {peak_mb:.1f} MB' if peak_mb is not None else ''
+    if only_ids is not None:
+        print(f'✅ cards.json 加载完成（{source}）：共 {scanned} 张，保留卡包引用的 {len(by_id)} 张（耗时 {elapsed:.2f}s{peak_str}）')
+    else:
+        print(f'✅ cards.json 加载完成（{source}）：{len(by_id)} 张卡（耗时 {elapsed:.2f}s{peak_str}）')
     return by_id, by_cid
 
 
+def collect_pack_card_ids(packs):
+    """
+    收集指定卡包文件中引用到的所有卡牌密码（含辅助包）
+    用于 load_cards_db(only_ids=...) 只加载需要的卡
+    """
+    ids = set()
+    for pack in packs:
+        card_file = pack.get('cardFile')
+        if not card_file:
+            continue
+        file_path = os.path.join(OCG_CARDS_DIR, card_file)
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, 'r', encoding='utf-8') as f:
+            pack_data = json.load(f)
+        card_defs = pack_data.get('cardIds', []) + pack_data.get('supplementPack', {}).get('cards', [])
+        for card_def in card_defs:
+            if card_def.get('id'):
+                ids.add(int(card_def['id']))
+    return ids
+
+
 def extract_card_details(card_db_entry):
     """
     从 cards.json 的一条记录中提取网页需要的卡牌详情
@@ -103,7 +223,129 @@ def extract_card_details(card_db_entry):
     }
 
 
-def build_pack(pack_file, by_id, dry_run=False):
+def text_shard_path(pack_file):
+    """卡包文件对应的文本分片路径"""
+    return os.path.join(OCG_TEXT_DIR, os.path.basename(pack_file))
+
+
+def split_card_text(pack_data):
+    """
+    把主卡池和辅助包 cardData 中的长文本字段移出，返回文本分片 { 密码: { 字段: 文本 } }（空文本不记录）
+    """
+    shard = {}
+    card_defs = pack_data.get('cardIds', []) + pack_data.get('supplementPack', {}).get('cards', [])
+    for card_def in card_defs:
+        card_data = card_def.get('cardData')
+        if not card_data:
+            continue
+        text = {}
+        for field in TEXT_SHARD_FIELDS:
+            value = card_data.pop(field, '')
+            if value:
+                text[field] = value
+        if text:
+            shard[str(card_def['id'])] = text
+    return shard
+
+
+def get_draw_params(pack, packs_config):
+    """
+    卡包的抽卡参数（与前端 `||` 写法一致），参数变化时需要重新生成查找表
+    不是 ocg_default 方案时返回 None（不生成查找表）
+    """
+    if pack.get('packScheme') not in DRAW_TABLE_SCHEMES:
+        return None
+    return {
+        'nrWeightRatio': pack.get('nrWeightRatio') or DEFAULT_NR_WEIGHT_RATIO,
+        'versionOdds': pack.get('versionOdds') or packs_config.get('defaultVersionOdds') or {},
+    }
+
+
+def build_alias_table(weights):
+    """
+    Walker 别名表（Vose 算法），返回 (prob, alias)
+    抽样时等概率选一格 i，以 prob[i] 的概率取 i，否则取 alias[i]，每次抽取 O(1)
+    """
+    n = len(weights)
+    total = float(sum(weights))
+    scaled = [w * n / total for w in weights]
+    prob = [1.0] * n
+    alias = list(range(n))
+    small = [i for i, w in enumerate(scaled) if w < 1.0]
+    large = [i for i, w in enumerate(scaled) if w >= 1.0]
+    while small and large:
+        lo = small.pop()
+        hi = large.pop()
+        prob[lo] = scaled[lo]
+        alias[lo] = hi
+        scaled[hi] -= 1.0 - scaled[lo]
+        (small if scaled[hi] < 1.0 else large).append(hi)
+    # 剩下的格子（含浮点误差）保留自身
+    return [1 if p >= 1.0 else round(p, ALIAS_PROB_DIGITS) for p in prob], alias
+
+
+def cards_hash(card_defs):
+    """
+    cardIds 中 (密码, rarityVersions) 序列的 32 位 FNV-1a 哈希（8 位十六进制），与 js/game.js 的 hashCardDefs 一致
+    哈希的字符串为 "密码:版本/版本|密码:版本|..."，没有 rarityVersions 的卡按 N 计
+    """
+    text = '|'.join(f"{card_def.get('id')}:{'/'.join(card_def.get('rarityVersions') or ['N'])}"
+                    for card_def in card_defs)
+    h = 0x811c9dc5
+    for ch in text:
+        h ^= ord(ch)
+        h = (h * 0x01000193) & 0xffffffff
+    return f'{h:08x}'
+
+
+def build_draw_tables(pack_data, draw_params):
+    """
+    生成抽卡查找表，卡牌下标为 cardIds 中的位置（与前端 cards 数组一致）
+      pools:        基础稀有度（rarityVersions[0]）→ 下标，对应前端的 nPool / poolByRarity
+      versionPools: 稀有度 → rarityVersions 中包含它的卡的下标，对应 findCardsForTargetRarity
+      nPool:        pools.N 的别名表，NR 卡权重为 nrWeightRatio，对应 weightedPickFromNPool
+      versionAlias: 版本列表（"/" 连接）→ 按 versionOdds 选版本的别名表，对应 resolveCardVersion
+      cardsHash:    cardIds 的 cards_hash，前端据此判断查找表是否与卡池一致
+    """
+    card_defs = pack_data.get('cardIds', [])
+    pools = {}
+    version_pools = {}
+    version_lists = {}
+    for idx, card_def in enumerate(card_defs):
+        versions = card_def.get('rarityVersions') or ['N']
+        pools.setdefault(versions[0], []).append(idx)
+        for version in dict.fromkeys(versions):
+            version_pools.setdefault(version, []).append(idx)
+        if len(versions) > 1:
+            version_lists.setdefault('/'.join(versions), versions)
+
+    tables = {
+        '_说明': '开包抽卡查找表（build_pack_data.py 自动生成）—— 下标为 cardIds 中的位置；'
+                 'nPool / versionAlias 为 Walker 别名表（prob + alias），每个卡位 O(1) 抽取',
+        'cardCount': len(card_defs),
+        'cardsHash': cards_hash(card_defs),
+        'pools': pools,
+        'versionPools': version_pools,
+    }
+
+    n_pool = pools.get('N', [])
+    if n_pool:
+        nr_ratio = draw_params['nrWeightRatio']
+        weights = [nr_ratio if 'NR' in (card_defs[i].get('rarityVersions') or []) else 1 for i in n_pool]
+        prob, alias = build_alias_table(weights)
+        tables['nPool'] = {'nrWeightRatio': nr_ratio, 'prob': prob, 'alias': alias}
+
+    version_odds = draw_params['versionOdds']
+    version_alias = {}
+    for key, versions in version_lists.items():
+        weights = [version_odds.get(v) or 1 for v in versions]
+        prob, alias = build_alias_table(weights)
+        version_alias[key] = {'weights': weights, 'prob': prob, 'alias': alias}
+    tables['versionAlias'] = version_alias
+    return tables
+
+
+def build_pack(pack_file, by_id, dry_run=False, split_text=False, draw_params=None):
     """
     为单个卡包文件注入卡牌详情数据
 
@@ -111,9 +353,12 @@ def build_pack(pack_file, by_id, dry_run=False):
       pack_file: 卡包文件路径（如 data/ocg/cards/ocg_blzd.json）
       by_id: 卡牌密码 → 卡牌数据的映射
       dry_run: 只检查不写入
+      split_text: 文本分片模式，长文本写入 data/ocg/cards/text/ 下的独立文件
+      draw_params: 抽卡参数（get_draw_params），不为 None 时写入抽卡查找表
 
     返回:
-      (found_count, missing_count, missing_ids)
+      (found_count, missing_count, missing_ids, sizes)
+      sizes: 文本分片模式下为 {'full': 完整输出字节数, 'roster': 精简名单字节数, 'text': 文本分片字节数}，否则为 None
     """
     with open(pack_file, 'r', encoding='utf-8') as f:
         pack_data = json.load(f)
@@ -121,7 +366,7 @@ def build_pack(pack_file, by_id, dry_run=False):
     card_ids = pack_data.get('cardIds', [])
     if not card_ids:
         print(f'  ⚠️ 卡包中没有 cardIds，跳过')
-        return 0, 0, []
+        return 0, 0, [], None
 
     found = 0
     missing = 0
@@ -160,26 +405,177 @@ def build_pack(pack_file, by_id, dry_run=False):
             missing += 1
             missing_ids.append(card_id)
 
-    if not dry_run:
-        # 写回文件
-        with open(pack_file, 'w', encoding='utf-8') as f:
-            json.dump(pack_data, f, ensure_ascii=False, indent=2)
+    if dry_run:
+        return found, missing, missing_ids, None
+
+    pack_data.pop('drawTables', None)
+    if draw_params is not None:
+        pack_data['drawTables'] = build_draw_tables(pack_data, draw_params)
+
+    sizes = None
+    shard_path = text_shard_path(pack_file)
+    pack_data.pop('textShard', None)
+    if split_text:
+        full_bytes = len(json.dumps(pack_data, ensure_ascii=False, indent=2).encode('utf-8'))
+        shard = {
+            '_说明': f'{os.path.basename(pack_file)} 卡牌文本分片（build_pack_data.py 文本分片模式自动生成）—— 密码 → 效果文本',
+            'cards': split_card_text(pack_data),
+        }
+        pack_data['textShard'] = f'text/{os.path.basename(pack_file)}'
+        os.makedirs(OCG_TEXT_DIR, exist_ok=True)
+        with open(shard_path, 'w', encoding='utf-8') as f:
+            json.dump(shard, f, ensure_ascii=False, separators=(',', ':'))
+        sizes = {'full': full_bytes, 'text': os.path.getsize(shard_path)}
+    elif os.path.exists(shard_path):
+        # 恢复完整输出：移除文本分片
+        os.remove(shard_path)
+
+    # 写回文件
+    with open(pack_file, 'w', encoding='utf-8') as f:
+        json.dump(pack_data, f, ensure_ascii=False, indent=2)
+    if sizes:
+        sizes['roster'] = os.path.getsize(pack_file)
+
+    return found, missing, missing_ids, sizes
+
+
+def load_build_manifest():
+    """加载增量构建清单，不存在或损坏时返回空清单"""
+    if os.path.exists(BUILD_MANIFEST_PATH):
+        try:
+            with open(BUILD_MANIFEST_PATH, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if isinstance(manifest.get('packs'), dict):
+                return manifest
+        except (OSError, ValueError):
+            pass
+    return {
+        '_说明': 'build_pack_data.py 增量构建清单（自动生成，请勿手动修改）',
+        'packs': {},
+    }
+
+
+def save_build_manifest(manifest):
+    """保存增量构建清单"""
+    with open(BUILD_MANIFEST_PATH, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
 
-    return found, missing, missing_ids
+def hash_file(path):
+    """计算文件内容的 MD5"""
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(8192), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
 
 
-def cmd_build(target_pack=None):
+def compute_pack_hashes(pack_file, by_id):
+    """
+    计算卡包的输入哈希，用于判断是否需要重新构建
+
+    返回: {
+      'idsHash': 卡包中 cardIds + 辅助包卡牌密码列表的哈希,
+      'cards': { 密码: 对应 cards.json 记录（提取后的详情）的哈希，找不到则为空串 },
+    }
+    """
+    with open(pack_file, 'r', encoding='utf-8') as f:
+        pack_data = json.load(f)
+
+    card_defs = pack_data.get('cardIds', []) + pack_data.get('supplementPack', {}).get('cards', [])
+    ids = [int(c['id']) for c in card_defs if c.get('id')]
+
+    card_hashes = {}
+    for card_id in ids:
+        db_entry = by_id.get(card_id)
+        if db_entry:
+            details = json.dumps(extract_card_details(db_entry), ensure_ascii=False, sort_keys=True)
+            card_hashes[str(card_id)] = hashlib.md5(details.encode('utf-8')).hexdigest()
+        else:
+            card_hashes[str(card_id)] = ''
+
+    ids_hash = hashlib.md5(json.dumps(ids).encode('utf-8')).hexdigest()
+    return {'idsHash': ids_hash, 'cards': card_hashes}
+
+
+# ====== 多进程构建 ======
+# 子进程共享的只读卡牌数据库（由进程池 initializer 设置；fork 平台上直接写时复制共享）
+_worker_by_id = None
+
+
+def _init_build_worker(by_id):
+    global _worker_by_id
+    _worker_by_id = by_id
+
+
+def _build_pack_job(job):
+    """
+    子进程中构建单个卡包，job 为 (卡包文件路径, 是否文本分片, 抽卡参数)，返回 (结果, 错误信息)
+
+    任何异常都作为该卡包的构建失败返回，不抛出子进程：
+    否则一个格式有误的卡包（KeyError / TypeError 等）会中止整个进程池，已完成卡包的结果和构建清单都会丢失。
+    """
+    pack_file, split_text, draw_params = job
+    try:
+        return build_pack(pack_file, _worker_by_id, split_text=split_text, draw_params=draw_params), None
+    except Exception as e:
+        return None, f'{type(e).__name__}: {e}'
+
+
+def run_build_jobs(pack_files, by_id, jobs=1, split_text=False, draw_params=None):
+    """
+    构建多个卡包文件，返回与 pack_files 顺序一致的 [(结果, 错误信息), ...]
+    draw_params 为与 pack_files 一一对应的抽卡参数列表（省略时不生成抽卡查找表）
+
+    jobs > 1 时使用进程池并行构建：卡牌数据库只加载一次，
+    Linux/macOS（fork）下子进程直接共享父进程内存，Windows（spawn）下每个子进程接收一份副本。
+    每个卡包由单个进程独立读写，输出与串行构建逐字节一致。
+    """
+    draw_params = draw_params or [None] * len(pack_files)
+    build_jobs = [(f, split_text, params) for f, params in zip(pack_files, draw_params)]
+    if jobs <= 1 or len(pack_files) <= 1:
+        _init_build_worker(by_id)
+        return [_build_pack_job(job) for job in build_jobs]
+
+    import multiprocessing
+
+    if 'fork' in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context('fork')
+        # fork 前设置全局变量，子进程继承后无需再序列化数据库
+        _init_build_worker(by_id)
+        pool = ctx.Pool(min(jobs, len(pack_files)))
+    else:
+        ctx = multiprocessing.get_context()
+        pool = ctx.Pool(min(jobs, len(pack_files)), initializer=_init_build_worker, initargs=(by_id,))
+
+    print(f'\n🚀 使用 {min(jobs, len(pack_files))} 个进程并行构建 {len(pack_files)} 个卡包 ...')
+    with pool:
+        return pool.map(_build_pack_job, build_jobs)
+
+
+def cmd_build(target_pack=None, force=False, jobs=1, changed_ids=None, split_text=None):
     """
     构建卡包数据（主命令）
+
+    增量构建：卡包的 cardIds、引用到的 cards.json 记录、卡包文件本身、输出模式、抽卡参数都没有变化时跳过；
+    force=True 时忽略清单，全部重新构建；jobs > 1 时多进程并行构建。
+    changed_ids: 可选，变更的卡牌密码集合（来自 update_cards_db.py 的差异记录），只构建引用了这些卡的卡包
+    split_text: 文本分片模式（精简名单 + 按需加载的效果文本），None 时使用 packs.json 的 splitText
     """
-    # 加载全量卡牌数据库
-    by_id, by_cid = load_cards_db()
+    # 构建前校验全部卡包配置：这些问题在网页上不会报错，只会让开包悄悄走兜底分支
+    if not run_validation():
+        print('❌ 卡包配置有错误，请修正后再构建（python build_pack_data.py --validate 可单独校验）')
+        sys.exit(1)
 
     # 加载 OCG 卡包配置
     with open(OCG_PACKS_PATH, 'r', encoding='utf-8') as f:
         packs_config = json.load(f)
 
     packs = packs_config.get('packs', [])
+    if split_text is None:
+        split_text = bool(packs_config.get('splitText', False))
+    print(f'📝 输出模式: {"文本分片" if split_text else "完整输出"}')
 
     if target_pack:
         # 只构建指定卡包
@@ -189,10 +585,33 @@ def cmd_build(target_pack=None):
             print(f'   可用的卡包: {", ".join(p["packId"] for p in packs_config["packs"])}')
             sys.exit(1)
 
+    if changed_ids is not None:
+        # 只保留引用了变更卡牌的卡包
+        affected = [p for p in packs if collect_pack_card_ids([p]) & changed_ids]
+        print(f'🔎 变更卡牌 {len(changed_ids)} 张，受影响的卡包 {len(affected)}/{len(packs)} 个')
+        packs = affected
+        if not packs:
+            print('✅ 没有卡包引用变更的卡牌，无需重建')
+            return
+
+    # 只加载本次构建的卡包用到的卡牌
+    by_id, _ = load_cards_db(only_ids=collect_pack_card_ids(packs))
+
+    manifest = load_build_manifest()
+    if force:
+        print('⚡ 强制构建模式，忽略增量构建清单')
+
     total_found = 0
     total_missing = 0
     all_missing = []
-
+    rebuilt_count = 0
+    skipped_count = 0
+    failed_count = 0
+    total_full_bytes = 0
+    total_roster_bytes = 0
+
+    # 第 1 步：检查哪些卡包需要重建
+    pending = []  # (pack, card_file, file_path, hashes)
     for pack in packs:
         card_file = pack.get('cardFile')
         if not card_file:
@@ -202,42 +621,118 @@ def cmd_build(target_pack=None):
         file_path = os.path.join(OCG_CARDS_DIR, card_file)
         if not os.path.exists(file_path):
             print(f'  ⚠️ {pack["packId"]}: 文件不存在 {file_path}，跳过')
+            skipped_count += 1
+            continue
+
+        try:
+            hashes = compute_pack_hashes(file_path, by_id)
+            hashes['splitText'] = split_text
+            hashes['drawParams'] = get_draw_params(pack, packs_config)
+            previous = manifest['packs'].get(card_file)
+            if (not force and previous
+                    and previous.get('idsHash') == hashes['idsHash']
+                    and previous.get('cards') == hashes['cards']
+                    and previous.get('splitText', False) == split_text
+                    and previous.get('drawParams') == hashes['drawParams']
+                    and (not split_text or os.path.exists(text_shard_path(file_path)))
+                    and previous.get('fileHash') == hash_file(file_path)):
+                print(f'\n⏭️ 未变化，跳过: {pack["packName"]} ({pack["packId"]})')
+                skipped_count += 1
+                continue
+        except (OSError, ValueError) as e:
+            print(f'\n❌ {pack["packId"]}: 读取失败 - {e}')
+            failed_count += 1
             continue
 
+        pending.append((pack, card_file, file_path, hashes))
+
+    # 第 2 步：构建（jobs > 1 时多进程并行）
+    results = run_build_jobs([item[2] for item in pending], by_id, jobs, split_text,
+                             [item[3]['drawParams'] for item in pending])
+
+    # 第 3 步：按卡包顺序输出结果并更新清单
+    for (pack, card_file, file_path, hashes), (result, error) in zip(pending, results):
         print(f'\n📦 处理卡包: {pack["packName"]} ({pack["packId"]})')
         print(f'   文件: {card_file}')
 
-        found, missing, missing_ids = build_pack(file_path, by_id)
+        if error:
+            print(f'   ❌ 构建失败 - {error}')
+            failed_count += 1
+            continue
+
+        found, missing, missing_ids, sizes = result
+        hashes['fileHash'] = hash_file(file_path)
+        manifest['packs'][card_file] = hashes
+        rebuilt_count += 1
 
         total_found += found
         total_missing += missing
         all_missing.extend(missing_ids)
 
         print(f'   ✅ 找到: {found} 张')
+        if sizes:
+            total_full_bytes += sizes['full']
+            total_roster_bytes += sizes['roster']
+            print(f'   📉 精简名单 {sizes["roster"] / 1024:.1f} KB + 文本分片 {sizes["text"] / 1024:.1f} KB'
+                  f'（完整输出 {sizes["full"] / 1024:.1f} KB，打开卡包少下载 {(sizes["full"] - sizes["roster"]) / 1024:.1f} KB'
+                  f' / {(1 - sizes["roster"] / sizes["full"]) * 100:.0f}%）')
         if missing > 0:
             print(f'   ⚠️ 缺失: {missing} 张')
             for mid in missing_ids:
                 print(f'      - ID: {mid}')
 
+    save_build_manifest(manifest)
+
     # 汇总
     print(f'\n{"=" * 50}')
     print(f'📊 构建完成汇总:')
-    print(f'   处理卡包: {len(packs)} 个')
+    print(f'   处理卡包: {len(packs)} 个（重建 {rebuilt_count} / 跳过 {skipped_count} / 失败 {failed_count}）')
     print(f'   成功注入: {total_found} 张卡牌')
+    if total_full_bytes:
+        print(f'   文本分片: 卡包文件共 {total_full_bytes / 1024:.1f} KB → {total_roster_bytes / 1024:.1f} KB'
+              f'（节省 {(total_full_bytes - total_roster_bytes) / 1024:.1f} KB）')
     if total_missing > 0:
         print(f'   ⚠️ 缺失: {total_missing} 张（在 cards.json 中找不到）')
         print(f'   缺失 ID: {all_missing}')
         print(f'   💡 提示: 这些卡可能是最新发售的，需要更新 cards.json')
+    elif failed_count > 0:
+        print(f'   ⚠️ 有 {failed_count} 个卡包构建失败，请检查上方日志')
     else:
         print(f'   🎉 所有卡牌数据完整，无缺失！')
 
+    # 第 4 步：为配置了本地卡图的卡包生成预览网格图集（图集有自己的增量检查，未变化的卡包同样检查）
+    build_pack_atlases(packs)
+
+
+def build_pack_atlases(packs):
+    """调用 tools/build_image_atlas.py 为配置了 imageMapFile + localImagesDir 的卡包生成图集"""
+    atlas_packs = [p for p in packs if p.get('imageMapFile') and p.get('localImagesDir')]
+    if not atlas_packs:
+        return
+    sys.path.insert(0, TOOLS_DIR)
+    import build_image_atlas
+    print(f'\n🧩 预览网格图集:')
+    build_image_atlas.build_atlases(atlas_packs)
+
+
+def run_validation():
+    """调用 tools/validate_packs.py 校验全部卡包配置并打印报告，没有错误时返回 True"""
+    sys.path.insert(0, TOOLS_DIR)
+    import validate_packs
+    return validate_packs.run()
+
+
+def load_changed_ids(diff_path):
+    """读取 update_cards_db.py 生成的差异记录，返回变更的卡牌密码集合"""
+    with open(diff_path, 'r', encoding='utf-8') as f:
+        diff = json.load(f)
+    return {int(p) for p in diff.get('changedPasswords', [])}
+
 
 def cmd_check(target_pack=None):
     """
     检查哪些卡在 cards.json 中找不到（不修改文件）
     """
-    by_id, _ = load_cards_db()
-
     with open(OCG_PACKS_PATH, 'r', encoding='utf-8') as f:
         packs_config = json.load(f)
 
@@ -245,6 +740,8 @@ def cmd_check(target_pack=None):
     if target_pack:
         packs = [p for p in packs if p.get('packId') == target_pack]
 
+    by_id, _ = load_cards_db(only_ids=collect_pack_card_ids(packs))
+
     for pack in packs:
         card_file = pack.get('cardFile')
         if not card_file:
@@ -255,7 +752,7 @@ def cmd_check(target_pack=None):
             continue
 
         print(f'\n📦 检查卡包: {pack["packName"]}')
-        found, missing, missing_ids = build_pack(file_path, by_id, dry_run=True)
+        found, missing, missing_ids, _ = build_pack(file_path, by_id, dry_run=True)
         print(f'   找到: {found}, 缺失: {missing}')
         for mid in missing_ids:
             print(f'   ❌ 缺失 ID: {mid}')
@@ -280,23 +777,56 @@ def cmd_info():
 
 
 def main():
-    if len(sys.argv) < 2:
+    args = sys.argv[1:]
+    force = '--force' in args
+    args = [a for a in args if a != '--force']
+
+    jobs = 1
+    if '--jobs' in args:
+        idx = args.index('--jobs')
+        if idx + 1 < len(args) and args[idx + 1].isdigit():
+            jobs = int(args[idx + 1])
+            del args[idx:idx + 2]
+        else:
+            jobs = os.cpu_count() or 1
+            del args[idx]
+
+    # 不指定时由 cmd_build 读取 packs.json 的 splitText
+    split_text = None
+    if '--split-text' in args:
+        split_text = True
+    elif '--no-split-text' in args:
+        split_text = False
+    args = [a for a in args if a not in ('--split-text', '--no-split-text')]
+
+    changed_ids = None
+    if '--changed' in args:
+        idx = args.index('--changed')
+        if idx + 1 >= len(args):
+            print('❌ 请指定差异记录文件，例: python build_pack_data.py --changed data/common/diffs/cards_diff_xxx.json')
+            sys.exit(1)
+        changed_ids = load_changed_ids(args[idx + 1])
+        del args[idx:idx + 2]
+
+    if not args:
         # 默认：构建所有卡包
-        cmd_build()
+        cmd_build(force=force, jobs=jobs, changed_ids=changed_ids, split_text=split_text)
         return
 
-    arg = sys.argv[1]
+    arg = args[0]
 
     if arg == '--check':
-        target = sys.argv[2] if len(sys.argv) > 2 else None
+        target = args[1] if len(args) > 1 else None
         cmd_check(target)
     elif arg == '--info':
         cmd_info()
+    elif arg == '--validate':
+        sys.exit(0 if run_validation() else 1)
     elif arg == '--help' or arg == '-h':
         print(__doc__)
     else:
         # 构建指定卡包
-        cmd_build(arg)
+        cmd_build(arg, force=force, jobs=jobs, changed_ids=changed_ids, split_text=split_text)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+cards_index.py — cards.json 流式读取 + 二进制索引
+
+【功能说明】
+cards.json（12~15MB）每次全量解析都很慢。本模块提供：
+  1. iter_cards_json(): 流式逐条解析 cards.json
+  2. 二进制索引 cards.idx: 与 cards.json 放在同一目录，可用 mmap 直接映射，
+     按卡牌密码或 cid 二分查找（O(log n)），无需解析其余 1 万多张卡
+
+【索引文件格式】（小端序）
+  文件头:   magic(8) + md5(32, ASCII) + cards.json 大小(u64) + cards.json 修改时间(u64, ns)
+            + 记录数(u32) + cid 条目数(u32)
+  密码表:   按密码升序排列的 (password u32, cid u32, offset u32, length u32)
+  cid 表:   按 cid 升序排列的 (cid u32, 密码表下标 u32)
+  记录区:   每张卡的精简 JSON（UTF-8，字段同 slim_card_entry()），由 offset/length 定位
+
+【过期检测】
+  文件头记录生成索引时 cards.json 的 MD5、大小和修改时间。
+  open_index() 发现大小和修改时间与当前 cards.json 一致时直接使用索引（不计算 MD5）；
+  不一致时重新计算 MD5，MD5 也不一致或索引不存在时自动重建。
+
+【使用方法】
+  python cards_index.py              # 重建索引
+  python cards_index.py <密码>       # 按密码查询一张卡（测试用）
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+
+# ====== 路径配置 ======
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+COMMON_DIR = os.path.join(SCRIPT_DIR, 'data', 'common')
+CARDS_JSON_PATH = os.path.join(COMMON_DIR, 'cards.json')
+CARDS_INDEX_PATH = os.path.join(COMMON_DIR, 'cards.idx')
+
+# ====== 索引格式 ======
+INDEX_MAGIC = b'YGOIDX02'
+HEADER = struct.Struct('<8s32sQQII')
+SOURCE_STAT = struct.Struct('<QQ')  # 文件头中的 cards.json 大小、修改时间（紧跟在 md5 之后）
+SOURCE_STAT_OFFSET = 8 + 32
+ENTRY = struct.Struct('<IIII')    # password, cid, offset, length
+CID_ENTRY = struct.Struct('<II')  # cid, 密码表下标
+
+
+# ====== 流式加载配置 ======
+# 每次从 cards.json 读取的字节数（流式解析，不一次性读入整个文件）
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# build_pack_data.extract_card_details() 实际用到的字段（其余字段在加载时直接丢弃，节省内存）
+CARD_TOP_FIELDS = ('cid', 'id', 'cn_name', 'jp_name', 'en_name', 'jp_ruby')
+CARD_TEXT_FIELDS = ('desc', 'pdesc', 'types')
+CARD_DATA_FIELDS = ('atk', 'def', 'level', 'race', 'attribute', 'type', 'ot')
+
+
+def iter_cards_json(path=CARDS_JSON_PATH, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    流式解析 cards.json，逐条产出 (cid字符串, 卡牌数据)
+
+    cards.json 顶层是 { "cid": {...}, ... } 的大对象，
+    这里按块读取文件，每次只解码一条记录，内存中最多同时存在一个数据块 + 一张卡。
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = ''
+        pos = 0
+        eof = False
+
+        def fill():
+            # 读取下一块数据，丢弃已解析的部分
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        def skip_ws():
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in ' \t\r\n':
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return
+                fill()
+
+        def decode():
+            # 解码一个完整的 JSON 值，数据块不够时继续读取
+            nonlocal pos
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    pos = end
+                    return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    fill()
+
+        def expect(char):
+            nonlocal pos
+            skip_ws()
+            if pos >= len(buf) or buf[pos] != char:
+                raise ValueError(f'cards.json 格式错误：缺少 {char!r}')
+            pos += 1
+
+        fill()
+        expect('{')
+        skip_ws()
+        if pos < len(buf) and buf[pos] == '}':
+            return
+
+        while True:
+            skip_ws()
+            key = decode()
+            expect(':')
+            skip_ws()
+            value = decode()
+            yield key, value
+
+            skip_ws()
+            if pos < len(buf) and buf[pos] == ',':
+                pos += 1
+                continue
+            expect('}')
+            return
+
+
+def slim_card_entry(card):
+    """
+    只保留 extract_card_details() 用到的字段（保持原有的嵌套结构）
+    """
+    text = card.get('text') or {}
+    data = card.get('data') or {}
+    slim = {k: card[k] for k in CARD_TOP_FIELDS if k in card}
+    slim['text'] = {k: text[k] for k in CARD_TEXT_FIELDS if k in text}
+    slim['data'] = {k: data[k] for k in CARD_DATA_FIELDS if k in data}
+    return slim
+
+
+def compute_file_md5(path):
+    """计算文件的 MD5（分块读取）"""
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(8192), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def get_source_stat(cards_path=CARDS_JSON_PATH):
+    """cards.json 的 (大小, 修改时间 ns)，不存在时返回 None"""
+    try:
+        st = os.stat(cards_path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def get_cards_md5(cards_path=CARDS_JSON_PATH, index_path=CARDS_INDEX_PATH):
+    """
+    获取当前 cards.json 的 MD5：索引文件头记录的大小和修改时间与 cards.json 一致时直接使用索引中的 MD5，
+    否则现场计算。cards.json 不存在时返回 None
+    """
+    stat = get_source_stat(cards_path)
+    if stat is None:
+        return None
+    try:
+        with CardIndex(index_path) as index:
+            if index.source_stat == stat:
+                return index.md5
+    except (ValueError, struct.error, OSError):
+        pass
+    return compute_file_md5(cards_path)
+
+
+def write_index(cards, md5, index_path=CARDS_INDEX_PATH, source_stat=(0, 0)):
+    """
+    根据卡牌记录写出二进制索引
+
+    参数:
+      cards: 可迭代的 (cid字符串, 卡牌数据)，如 iter_cards_json() 或 dict.items()
+      md5: 对应 cards.json 的 MD5
+      index_path: 索引输出路径
+      source_stat: 对应 cards.json 的 (大小, 修改时间 ns)，见 get_source_stat()
+
+    返回: 写入的记录数
+    """
+    entries = []   # (password, cid, 记录字节)
+    for _, card in cards:
+        slim = slim_card_entry(card)
+        password = int(slim.get('id') or 0)
+        cid = int(slim.get('cid') or 0)
+        if not password and not cid:
+            continue
+        record = json.dumps(slim, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        entries.append((password, cid, record))
+
+    entries.sort(key=lambda e: (e[0], e[1]))
+
+    table = bytearray()
+    store = bytearray()
+    cid_rows = []
+    for i, (password, cid, record) in enumerate(entries):
+        table += ENTRY.pack(password, cid, len(store), len(record))
+        store += record
+        if cid:
+            cid_rows.append((cid, i))
+    cid_rows.sort()
+
+    cid_table = bytearray()
+    for cid, i in cid_rows:
+        cid_table += CID_ENTRY.pack(cid, i)
+
+    header = HEADER.pack(INDEX_MAGIC, md5.encode('ascii'), *source_stat, len(entries), len(cid_rows))
+
+    # 先写临时文件再替换，避免中途中断留下损坏的索引
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(table)
+        f.write(cid_table)
+        f.write(store)
+    os.replace(tmp_path, index_path)
+    return len(entries)
+
+
+def build_index(cards_path=CARDS_JSON_PATH, index_path=CARDS_INDEX_PATH, md5=None):
+    """
+    流式解析 cards.json 并重建索引，返回写入的记录数
+    """
+    # 先记下大小和修改时间再读取，读取期间文件被替换时下次会重新计算 MD5
+    source_stat = get_source_stat(cards_path)
+    if md5 is None:
+        md5 = compute_file_md5(cards_path)
+    return write_index(iter_cards_json(cards_path), md5, index_path, source_stat)
+
+
+def update_source_stat(index_path, source_stat):
+    """cards.json 内容没变（MD5 一致）但大小 / 修改时间变了时，只更新索引文件头中的记录"""
+    with open(index_path, 'r+b') as f:
+        f.seek(SOURCE_STAT_OFFSET)
+        f.write(SOURCE_STAT.pack(*source_stat))
+
+
+class CardIndex:
+    """
+    只读的二进制卡牌索引（mmap 映射，按需解码单条记录）
+
+    用法:
+      with open_index() as index:
+          card = index.get_by_id(83445539)
+    """
+
+    def __init__(self, index_path=CARDS_INDEX_PATH):
+        self.path = index_path
+        self._file = open(index_path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法 mmap
+            self._file.close()
+            raise ValueError(f'索引文件为空: {index_path}')
+
+        magic, md5, source_size, source_mtime_ns, count, cid_count = HEADER.unpack_from(self._mm, 0)
+        if magic != INDEX_MAGIC:
+            self.close()
+            raise ValueError(f'索引文件格式不正确: {index_path}')
+
+        self.md5 = md5.rstrip(b'\0').decode('ascii')
+        self.source_stat = (source_size, source_mtime_ns)
+        self.count = count
+        self.cid_count = cid_count
+        self._table_start = HEADER.size
+        self._cid_start = self._table_start + count * ENTRY.size
+        self._store_start = self._cid_start + cid_count * CID_ENTRY.size
+
+    def close(self):
+        if getattr(self, '_mm', None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def _entry(self, i):
+        return ENTRY.unpack_from(self._mm, self._table_start + i * ENTRY.size)
+
+    def _record(self, i):
+        _, _, offset, length = self._entry(i)
+        start = self._store_start + offset
+        return json.loads(self._mm[start:start + length].decode('utf-8'))
+
+    def _find_password(self, password):
+        # 二分查找密码表，返回下标或 None
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entry(mid)[0] < password:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._entry(lo)[0] == password:
+            return lo
+        return None
+
+    def _find_cid(self, cid):
+        # 二分查找 cid 表，返回对应的密码表下标或 None
+        lo, hi = 0, self.cid_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if CID_ENTRY.unpack_from(self._mm, self._cid_start + mid * CID_ENTRY.size)[0] < cid:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.cid_count:
+            found_cid, i = CID_ENTRY.unpack_from(self._mm, self._cid_start + lo * CID_ENTRY.size)
+            if found_cid == cid:
+                return i
+        return None
+
+    def get_by_id(self, password):
+        """按卡牌密码查找，返回精简卡牌数据或 None"""
+        password = int(password)
+        if password <= 0:
+            return None
+        i = self._find_password(password)
+        return self._record(i) if i is not None else None
+
+    def get_by_cid(self, cid):
+        """按 cid 查找，返回精简卡牌数据或 None"""
+        i = self._find_cid(int(cid))
+        return self._record(i) if i is not None else None
+
+    def iter_records(self):
+        """按密码顺序遍历所有记录"""
+        for i in range(self.count):
+            yield self._record(i)
+
+
+def open_index(cards_path=CARDS_JSON_PATH, index_path=CARDS_INDEX_PATH, rebuild=True):
+    """
+    打开与当前 cards.json 匹配的索引
+
+    索引记录的 cards.json 大小和修改时间与当前文件一致时直接打开；不一致时重新计算 MD5，
+    MD5 一致则只更新文件头中的记录。索引不存在、格式错误或 MD5 与 cards.json 不一致时：
+      - rebuild=True: 自动重建后打开
+      - rebuild=False: 返回 None
+    cards.json 不存在时返回 None
+    """
+    source_stat = get_source_stat(cards_path)
+    if source_stat is None:
+        return None
+
+    md5 = None
+    if os.path.exists(index_path):
+        try:
+            index = CardIndex(index_path)
+        except (ValueError, struct.error, OSError):
+            index = None
+        if index is not None:
+            if index.source_stat == source_stat:
+                return index
+            index.close()
+            md5 = compute_file_md5(cards_path)
+            if index.md5 == md5:
+                update_source_stat(index_path, source_stat)
+                return CardIndex(index_path)
+
+    if not rebuild or not os.path.exists(cards_path):
+        return None
+
+    print('🗂️ 卡牌索引不存在或已过期，正在重建 cards.idx ...')
+    start = time.time()
+    count = build_index(cards_path, index_path, md5)
+    print(f'   ✅ 索引重建完成：{count} 条记录（耗时 {time.time() - start:.2f}s）')
+    return CardIndex(index_path)
+
+
+def main():
+    args = sys.argv[1:]
+
+    if args and args[0] in ('--help', '-h'):
+        print(__doc__)
+        return
+
+    if not args:
+        if not os.path.exists(CARDS_JSON_PATH):
+            print(f'❌ 未找到 {CARDS_JSON_PATH}，请先运行 python update_cards_db.py')
+            return
+        start = time.time()
+        count = build_index()
+        size_kb = os.path.getsize(CARDS_INDEX_PATH) / 1024
+        print(f'✅ 索引已写入: {CARDS_INDEX_PATH}')
+        print(f'   {count} 条记录，{size_kb:.0f} KB（耗时 {time.time() - start:.2f}s）')
+        return
+
+    index = open_index()
+    if index is None:
+        print(f'❌ 未找到 {CARDS_JSON_PATH}，请先运行 python update_cards_db.py')
+        return
+    with index:
+        card = index.get_by_id(args[0])
+        if card is None:
+            print(f'❌ 索引中没有密码 {args[0]}')
+        else:
+            print(json.dumps(card, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -30,9 +30,18 @@
 
   6. 更新卡包列表文件 (data/ocg/pack_list.json + data/tcg/pack_list.json):
      python fetch_packs.py gen-list
+
+  7. 批量同步 OCG 卡包（只下载一次列表页，并发抓取详情页，一次性写入）:
+     python fetch_packs.py sync --since 2025-01-01 --until 2025-12-31
+     python fetch_packs.py sync --category booster --min-cards 60 --limit 20
+     python fetch_packs.py sync --since 2024-01-01 --dry-run     # 只预览筛选结果
+     可选参数: --min-cards N（默认 10，过滤附录卡）、--jobs N（并发数，默认 4）、
+              --overwrite（覆盖 packs.json 中已有的卡包，默认跳过）
+     分类（--category）来自 pack_references/konami_official_products/，只覆盖已收录的商品
+
+  所有命令都可以加 --offline：只使用 .http_cache/ 中缓存的页面，不访问网络
 """
 
-import urllib.request
 import re
 import json
 import sys
@@ -40,27 +49,126 @@ import time
 import os
 from datetime import datetime
 
+from fetcher import get_fetcher, apply_offline_flag
+
 # ===== 配置 =====
 YGOCDB_BASE = "https://ygocdb.com"
-REQUEST_INTERVAL = 0.35  # 请求间隔（秒），遵守 API 限流规范
+# 请求限流由 fetcher.py 统一处理（ygocdb.com 按 300ms 间隔），无需手动 sleep
 # 拆分后的独立路径：OCG 和 TCG 分别存储
 OCG_PACKS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "ocg", "packs.json")
 TCG_PACKS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "tcg", "packs.json")
 OCG_CARDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "ocg", "cards")  # OCG 独立卡牌文件目录
 OCG_PACK_LIST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "ocg", "pack_list.json")
 TCG_PACK_LIST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "tcg", "pack_list.json")
-USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+# KONAMI 官方商品参考数据（用于按分类筛选卡包）
+KONAMI_PRODUCTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pack_references", "konami_official_products")
+KONAMI_CATEGORY_FILES = {
+    "booster": "basic_packs.json",
+    "structure": "structure_decks.json",
+    "concept": "concept_packs.json",
+    "special": "special_packs.json",
+}
+SYNC_MAX_WORKERS = 4  # sync 命令默认的并发抓取数（仍受 fetcher 限流约束）
 
 
 def fetch_html(url):
-    """获取网页 HTML 内容"""
-    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
-    try:
-        resp = urllib.request.urlopen(req, timeout=30)
-        return resp.read().decode("utf-8")
-    except Exception as e:
-        print(f"  ❌ 请求失败: {url} - {e}")
-        return None
+    """获取网页 HTML 内容（经过 fetcher 的连接池和限流）"""
+    return get_fetcher().get_text(url)
+
+
+# ===== 页面解析 =====
+# 两个页面各用一个合并的正则单遍扫描：只匹配需要的标记，其余内容由正则引擎直接跳过，
+# 扫描过程中维护当前区域/当前卡牌的状态，每解析完一条记录就产出
+
+# /packs 列表页：区域标记（id="ocg" / id="tcg"）和卡包条目
+# 格式: <li class="pack">
+#          <span>日期</span><span>编码</span><span>数量</span>
+#          <a href="/pack/{id}">包名</a>
+#        </li>
+_PACK_LIST_TOKEN_RE = re.compile(
+    r'id="(?P<region>ocg|tcg)"'
+    r'|<li\s+class="pack">\s*'
+    r'<span>(?P<date>[^<]*)</span>\s*'      # 发售日期
+    r'<span>(?P<code>[^<]*)</span>\s*'      # 卡包编码
+    r'<span>(?P<count>[^<]*)</span>\s*'     # 收录张数
+    r'<a\s+href="/pack/(?P<pid>\d+)"[^>]*>'  # packId
+    r'(?P<name>[^<]*)</a>'                   # 卡包名称
+)
+
+# /pack/{id} 详情页：每张卡的区域以 <div class="row card result"> 开始，区域内依次取
+# 密码 <a href="/card/83445539">、中文名 <span lang="zh-Hans">、日文名 <span lang="ja-Jpan">、
+# cid <span class="cid text-muted">
+_PACK_CARDS_TOKEN_RE = re.compile(
+    r'<(?:div\s+class="row card (?P<start>result)"'
+    r'|a\s+href="/card/(?P<id>\d+)"'
+    r'|span\s+(?:lang="(?:zh-Hans">(?P<cn>[^<]*)|ja-Jpan">(?P<jp>[^<]*))'
+    r'|class="cid text-muted">(?P<cid>\d+)))'
+)
+
+
+def iter_pack_list(html, region="ocg"):
+    """
+    逐个产出 /packs 页面中指定区域（'ocg' 或 'tcg'）的卡包条目（单遍扫描）
+    region 为 None 时产出两个区域的全部条目，并附带 "region" 字段
+    """
+    current_region = None
+    regions_seen = set()
+    for m in _PACK_LIST_TOKEN_RE.finditer(html):
+        if m.group("region"):
+            current_region = m.group("region")
+            regions_seen.add(current_region)
+            continue
+        if current_region is None or (region is not None and current_region != region):
+            continue
+        card_count = m.group("count").strip()
+        pack = {
+            "packId": m.group("pid"),
+            "packCode": m.group("code").strip(),
+            "packName": m.group("name").strip(),
+            "releaseDate": m.group("date").strip(),
+            "cardCount": int(card_count) if card_count.isdigit() else 0
+        }
+        if region is None:
+            pack["region"] = current_region
+        yield pack
+    if region is not None and region not in regions_seen:
+        print(f"  ❌ 未找到 {region.upper()} 区域")
+
+
+def iter_pack_cards(html):
+    """
+    逐个产出 /pack/{id} 详情页中的卡牌记录（单遍扫描）
+
+    findall 在 C 层一次扫描取出全部标记（每个标记一个元组，不创建 Match 对象），
+    再按顺序组装卡牌；每个字段取该卡区域内第一个非空值
+    """
+    card = None
+    for start, card_id, cn, jp, cid in _PACK_CARDS_TOKEN_RE.findall(html):
+        if start:
+            if card and "id" in card:
+                yield _card_record(card)
+            card = {}
+        elif card is None:
+            continue  # 第一张卡之前的内容
+        elif card_id:
+            card.setdefault("id", card_id)
+        elif cn:
+            card.setdefault("name_cn", cn)
+        elif jp:
+            card.setdefault("name_jp", jp)
+        elif cid:
+            card.setdefault("cid", cid)
+    if card and "id" in card:  # 没有密码的区块跳过
+        yield _card_record(card)
+
+
+def _card_record(card):
+    return {
+        "id": int(card["id"]),
+        "name_cn": card.get("name_cn", "").strip(),
+        "name_jp": card.get("name_jp", "").strip(),
+        "cid": int(card.get("cid", 0)),
+    }
 
 
 def parse_pack_list(html, region="ocg"):
@@ -79,52 +187,7 @@ def parse_pack_list(html, region="ocg"):
         ...
     ]
     """
-    # 定位 OCG/TCG 区域
-    if region == "ocg":
-        # OCG 区域: 从 id="ocg" 到 id="tcg"
-        match = re.search(r'id="ocg">(.*?)(?=<div[^>]*id="tcg")', html, re.DOTALL)
-    else:
-        # TCG 区域: 从 id="tcg" 到结尾
-        match = re.search(r'id="tcg">(.*?)(?=</div>\s*</div>\s*</div>\s*$|$)', html, re.DOTALL)
-    
-    if not match:
-        print(f"  ❌ 未找到 {region.upper()} 区域")
-        return []
-    
-    region_html = match.group(1)
-    
-    # 解析每个卡包条目
-    # 格式: <li class="pack">
-    #          <span>日期</span><span>编码</span><span>数量</span>
-    #          <a href="/pack/{id}">包名</a>
-    #        </li>
-    packs = []
-    pack_pattern = re.compile(
-        r'<li\s+class="pack">\s*'
-        r'<span>([^<]*)</span>\s*'          # 发售日期
-        r'<span>([^<]*)</span>\s*'          # 卡包编码
-        r'<span>([^<]*)</span>\s*'          # 收录张数
-        r'<a\s+href="/pack/(\d+)"[^>]*>'   # packId
-        r'([^<]*)</a>',                     # 卡包名称
-        re.DOTALL
-    )
-    
-    for m in pack_pattern.finditer(region_html):
-        release_date = m.group(1).strip()
-        pack_code = m.group(2).strip()
-        card_count = m.group(3).strip()
-        pack_id = m.group(4).strip()
-        pack_name = m.group(5).strip()
-        
-        packs.append({
-            "packId": pack_id,
-            "packCode": pack_code,
-            "packName": pack_name,
-            "releaseDate": release_date,
-            "cardCount": int(card_count) if card_count.isdigit() else 0
-        })
-    
-    return packs
+    return list(iter_pack_list(html, region))
 
 
 def parse_pack_cards(html):
@@ -141,36 +204,7 @@ def parse_pack_cards(html):
         ...
     ]
     """
-    cards = []
-    
-    # 每张卡的区域以 <div class="row card result"> 开始
-    card_blocks = re.split(r'<div\s+class="row card result">', html)
-    
-    for block in card_blocks[1:]:  # 跳过第一个（不是卡牌区块）
-        card = {}
-        
-        # 提取密码: <a href="/card/83445539">
-        pwd_match = re.search(r'<a\s+href="/card/(\d+)"', block)
-        if pwd_match:
-            card["id"] = int(pwd_match.group(1))
-        else:
-            continue  # 没有密码则跳过
-        
-        # 提取中文名: <span lang="zh-Hans">暗冥共鸣者</span>
-        cn_match = re.search(r'<span\s+lang="zh-Hans">([^<]*)</span>', block)
-        card["name_cn"] = cn_match.group(1).strip() if cn_match else ""
-        
-        # 提取日文名: <span lang="ja-Jpan">xxx</span>
-        jp_match = re.search(r'<span\s+lang="ja-Jpan">([^<]*)</span>', block)
-        card["name_jp"] = jp_match.group(1).strip() if jp_match else ""
-        
-        # 提取 cid: <span class="cid text-muted">22510</span>
-        cid_match = re.search(r'<span\s+class="cid text-muted">(\d+)</span>', block)
-        card["cid"] = int(cid_match.group(1)) if cid_match else 0
-        
-        cards.append(card)
-    
-    return cards
+    return list(iter_pack_cards(html))
 
 
 def format_cards_json(cards):
@@ -248,34 +282,32 @@ def write_card_file(pack_id, pack_code, pack_info, card_entries):
     return card_file_name
 
 
-def write_to_ocg_packs(pack_config, card_entries, pack_info):
+def merge_ocg_pack_configs(pack_configs):
     """
-    将卡包元信息写入 data/ocg/packs.json 的 packs 数组
-    并将卡牌列表写入独立文件 data/ocg/cards/{packId}.json
-    如果同 packCode 的卡包已存在则更新，否则插入到数组开头
+    将多个卡包元信息一次性合并到 data/ocg/packs.json（只读写文件一次）
+    同 packCode / packId 的卡包已存在则更新，否则插入到数组开头
+    pack_configs 按从新到旧排列，插入后保持同样的顺序
     """
-    # 1. 写入独立卡牌文件
-    write_card_file(pack_config["packId"], pack_config["packCode"], pack_info, card_entries)
-    
-    # 2. 更新 packs.json 元信息（不含 cardIds）
     with open(OCG_PACKS_PATH, "r", encoding="utf-8-sig") as f:
         data = json.load(f)
     
     ocg_packs = data["packs"]
     
-    # 查找是否已有同编码的卡包
-    existing_idx = None
-    for i, p in enumerate(ocg_packs):
-        if p.get("packCode") == pack_config["packCode"] or p.get("packId") == pack_config["packId"]:
-            existing_idx = i
-            break
+    # 倒序处理：最旧的先插入开头，最新的最后插入，保证最终从新到旧
+    for pack_config in reversed(pack_configs):
+        # 查找是否已有同编码的卡包
+        existing_idx = None
+        for i, p in enumerate(ocg_packs):
+            if p.get("packCode") == pack_config["packCode"] or p.get("packId") == pack_config["packId"]:
+                existing_idx = i
+                break
     
-    if existing_idx is not None:
-        print(f"  ♻️ 更新已有卡包: {pack_config['packName']} (位置 {existing_idx})")
-        ocg_packs[existing_idx] = pack_config
-    else:
-        print(f"  ✨ 新增卡包: {pack_config['packName']}")
-        ocg_packs.insert(0, pack_config)
+        if existing_idx is not None:
+            print(f"  ♻️ 更新已有卡包: {pack_config['packName']} (位置 {existing_idx})")
+            ocg_packs[existing_idx] = pack_config
+        else:
+            print(f"  ✨ 新增卡包: {pack_config['packName']}")
+            ocg_packs.insert(0, pack_config)
     
     with open(OCG_PACKS_PATH, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
@@ -284,6 +316,19 @@ def write_to_ocg_packs(pack_config, card_entries, pack_info):
     print(f"  ✅ 元信息已写入 {OCG_PACKS_PATH}")
 
 
+def write_to_ocg_packs(pack_config, card_entries, pack_info):
+    """
+    将卡包元信息写入 data/ocg/packs.json 的 packs 数组
+    并将卡牌列表写入独立文件 data/ocg/cards/{packId}.json
+    如果同 packCode 的卡包已存在则更新，否则插入到数组开头
+    """
+    # 1. 写入独立卡牌文件
+    write_card_file(pack_config["packId"], pack_config["packCode"], pack_info, card_entries)
+    
+    # 2. 更新 packs.json 元信息（不含 cardIds）
+    merge_ocg_pack_configs([pack_config])
+
+
 def cmd_list(region, limit=20):
     """列出卡包"""
     print(f"\n📦 正在获取 {region.upper()} 卡包列表...")
@@ -310,25 +355,26 @@ def cmd_list(region, limit=20):
     print(f"\n💡 提示: 使用 'python fetch_packs.py fetch <YGOCDB_ID>' 来获取指定卡包的卡牌列表")
 
 
-def cmd_fetch(pack_id, write=False):
-    """获取指定卡包的卡牌收录"""
-    # 先获取卡包基本信息
-    print(f"\n📦 正在获取卡包列表以查找包信息...")
-    list_html = fetch_html(f"{YGOCDB_BASE}/packs")
-    if not list_html:
-        return
-    
-    # 在 OCG 和 TCG 中查找
-    pack_info = None
-    for region in ["ocg", "tcg"]:
-        packs = parse_pack_list(list_html, region)
-        for p in packs:
-            if p["packId"] == pack_id:
-                pack_info = p
-                pack_info["region"] = region
-                break
-        if pack_info:
-            break
+def find_pack_info(list_html, pack_id):
+    """在 /packs 页面中按 YGOCDB_ID 查找卡包信息（OCG 和 TCG 都查），找不到返回 None"""
+    for p in iter_pack_list(list_html, region=None):
+        if p["packId"] == pack_id:
+            return p
+    return None
+
+
+def cmd_fetch(pack_id, write=False, pack_info=None):
+    """
+    获取指定卡包的卡牌收录
+    pack_info: 可选，调用方已从 /packs 页面解析出的卡包信息（避免重复下载列表页）
+    """
+    if pack_info is None:
+        # 先获取卡包基本信息
+        print(f"\n📦 正在获取卡包列表以查找包信息...")
+        list_html = fetch_html(f"{YGOCDB_BASE}/packs")
+        if not list_html:
+            return
+        pack_info = find_pack_info(list_html, pack_id)
     
     if not pack_info:
         print(f"  ❌ 未找到 YGOCDB_ID={pack_id} 的卡包")
@@ -338,7 +384,6 @@ def cmd_fetch(pack_id, write=False):
     print(f"     编码: {pack_info['packCode']} | 日期: {pack_info['releaseDate']} | 区域: {pack_info['region'].upper()} | 收录: {pack_info['cardCount']}张")
     
     # 获取卡牌详情
-    time.sleep(REQUEST_INTERVAL)
     print(f"\n🃏 正在获取卡牌列表...")
     detail_html = fetch_html(f"{YGOCDB_BASE}/pack/{pack_id}")
     if not detail_html:
@@ -400,9 +445,128 @@ def cmd_latest(region, write=False):
     print(f"  📋 最新卡包: {latest['packName']}")
     print(f"     编码: {latest['packCode']} | 日期: {latest['releaseDate']} | 收录: {latest['cardCount']}张")
     
-    # 获取卡牌详情
-    time.sleep(REQUEST_INTERVAL)
-    cmd_fetch(latest["packId"], write=write)
+    # 获取卡牌详情（直接传入已解析的卡包信息，不再重复下载列表页）
+    latest["region"] = region
+    cmd_fetch(latest["packId"], write=write, pack_info=latest)
+
+
+def load_category_index():
+    """
+    从 pack_references/konami_official_products/ 读取卡包分类
+    返回: { 卡包编码(大写): 分类 }，分类取值与 packs.json 的 category 一致（booster/structure/concept/special）
+    """
+    index = {}
+    for category, file_name in KONAMI_CATEGORY_FILES.items():
+        path = os.path.join(KONAMI_PRODUCTS_DIR, file_name)
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for product in data.get("products", []):
+            code = product.get("packCode", "").strip().upper()
+            if code:
+                index[code] = category
+    return index
+
+
+def select_sync_packs(packs, since=None, until=None, min_cards=10, category=None, limit=None):
+    """
+    按发售日期范围、收录张数、分类筛选卡包（packs 为 parse_pack_list 的结果，从新到旧）
+    同一编码出现多次时（如本体包和 +1 辅助包），只保留收录张数最多的一个
+    """
+    category_index = load_category_index() if category else {}
+    
+    selected = {}
+    for p in packs:
+        if since and p["releaseDate"] < since:
+            continue
+        if until and p["releaseDate"] > until:
+            continue
+        if p["cardCount"] < min_cards:
+            continue
+        if category and category_index.get(p["packCode"].upper()) != category:
+            continue
+        code = p["packCode"].upper()
+        if code not in selected or p["cardCount"] > selected[code]["cardCount"]:
+            selected[code] = p
+    
+    # 保持原有的从新到旧顺序
+    result = [p for p in packs if selected.get(p["packCode"].upper()) is p]
+    if limit:
+        result = result[:limit]
+    return result
+
+
+def cmd_sync(since=None, until=None, min_cards=10, category=None, limit=None,
+             overwrite=False, dry_run=False, max_workers=SYNC_MAX_WORKERS):
+    """
+    批量同步 OCG 卡包：只下载一次 /packs 列表页，筛选后并发抓取详情页，
+    一次性写入所有卡牌文件并更新 packs.json
+    """
+    print("\n📦 正在获取 OCG 卡包列表...")
+    html = fetch_html(f"{YGOCDB_BASE}/packs")
+    if not html:
+        return
+    
+    packs = parse_pack_list(html, "ocg")
+    selected = select_sync_packs(packs, since, until, min_cards, category, limit)
+    
+    # 默认跳过 packs.json 中已有的卡包（这些卡包通常已手动补充了稀有度等数据）
+    with open(OCG_PACKS_PATH, "r", encoding="utf-8-sig") as f:
+        existing = json.load(f).get("packs", [])
+    existing_codes = {p.get("packCode", "").upper() for p in existing}
+    existing_ids = {p.get("ygocdbPackId") for p in existing if p.get("ygocdbPackId")}
+    if not overwrite:
+        skipped = [p for p in selected if p["packCode"].upper() in existing_codes or p["packId"] in existing_ids]
+        selected = [p for p in selected if p not in skipped]
+        for p in skipped:
+            print(f"  ⏭️ 已存在，跳过: {p['packCode']} {p['packName']}（使用 --overwrite 覆盖）")
+    
+    print(f"  共 {len(packs)} 个 OCG 卡包，筛选后需要同步 {len(selected)} 个\n")
+    if not selected:
+        return
+    
+    for p in selected:
+        print(f"  {p['releaseDate']:<12}  {p['packCode']:<8}  {p['cardCount']:>4}  {p['packName']}")
+    
+    if dry_run:
+        print("\n💡 预览模式（--dry-run），未写入任何文件")
+        return
+    
+    # 并发抓取详情页（每个请求仍遵守 ygocdb.com 的限流）
+    print(f"\n🃏 正在抓取 {len(selected)} 个卡包的卡牌列表（并发 {max_workers}）...")
+    start = time.time()
+    fetcher = get_fetcher()
+    
+    def fetch_cards(pack_info):
+        detail_html = fetcher.get_text(f"{YGOCDB_BASE}/pack/{pack_info['packId']}")
+        return parse_pack_cards(detail_html) if detail_html else None
+    
+    results = fetcher.fetch_many(selected, fetch_cards, max_workers=max_workers)
+    print(f"  ⏱️ 抓取完成，耗时 {time.time() - start:.1f}s")
+    
+    # 写入卡牌文件，最后一次性更新 packs.json
+    pack_configs = []
+    failed = []
+    for pack_info, cards in zip(selected, results):
+        if not cards:
+            print(f"  ❌ {pack_info['packCode']}: 未获取到卡牌")
+            failed.append(pack_info)
+            continue
+        pack_info["region"] = "ocg"
+        card_entries = format_cards_json(cards)
+        pack_config = generate_pack_config(pack_info, card_entries)
+        write_card_file(pack_config["packId"], pack_config["packCode"], pack_info, card_entries)
+        pack_configs.append(pack_config)
+    
+    if pack_configs:
+        merge_ocg_pack_configs(pack_configs)
+    
+    print(f"\n{'=' * 50}")
+    print(f"📊 同步完成: 成功 {len(pack_configs)} 个 / 失败 {len(failed)} 个")
+    if failed:
+        print(f"   失败的卡包: {', '.join(p['packId'] for p in failed)}（可用 fetch <ID> --write 单独重试）")
+    print("💡 提示: 运行 python build_pack_data.py 为新卡包注入卡牌详情")
 
 
 def cmd_gen_list():
@@ -461,7 +625,7 @@ def cmd_gen_list():
 
 
 def main():
-    args = sys.argv[1:]
+    args = apply_offline_flag(sys.argv[1:])
     
     if not args:
         print(__doc__)
@@ -494,6 +658,26 @@ def main():
     elif command == "gen-list":
         cmd_gen_list()
     
+    elif command == "sync":
+        def option(name, default=None):
+            if name in args:
+                idx = args.index(name)
+                if idx + 1 < len(args):
+                    return args[idx + 1]
+            return default
+        
+        limit = option("--limit")
+        cmd_sync(
+            since=option("--since"),
+            until=option("--until"),
+            min_cards=int(option("--min-cards", 10)),
+            category=option("--category"),
+            limit=int(limit) if limit else None,
+            overwrite="--overwrite" in args,
+            dry_run="--dry-run" in args,
+            max_workers=int(option("--jobs", SYNC_MAX_WORKERS)),
+        )
+    
     else:
         print(f"❌ 未知命令: {command}")
         print(__doc__)
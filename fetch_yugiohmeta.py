@@ -13,6 +13,12 @@
 
 【输出文件】
   data/tcg/yugiohmeta_map.json — TCG 卡图映射表
+  data/tcg/yugiohmeta_map.journal.jsonl — 构建过程中的追加日志（每查到一张卡追加一行，
+      运行结束时合并进映射表并删除；中途中断后重新运行会先回放日志，从中断处继续）
+  data/tcg/yugiohmeta_failed.json — 查询失败记录（原因 + 时间），按指数退避安排重试，
+      未到重试时间的密码不会再次查询
+  data/tcg/ygoprodeck_set_index.json — 卡包名 → 卡牌密码索引（由 YGOProDeck 全量卡牌数据生成），
+      build / build-all 优先从本地索引获取卡包收录，不再逐个卡包请求 YGOProDeck
 
 【使用方法】
   1. 为指定卡包构建映射（通过 setCode）:
@@ -21,6 +27,10 @@
   
   2. 为所有已配置的 TCG 卡包构建映射:
      python fetch_yugiohmeta.py build-all
+
+     build / build-all 可加 --jobs N 设置并发查询数（默认 4，1 为串行）；
+     总请求速率仍受 fetcher.py 的按域名限流约束
+     build / build-all 可加 --retry-failed：忽略重试时间，重新查询所有失败过的密码
   
   3. 查看已有映射表信息:
      python fetch_yugiohmeta.py info
@@ -28,55 +38,82 @@
   4. 测试单张卡的映射:
      python fetch_yugiohmeta.py test 89631141
 
+  5. 手动把追加日志合并进映射表:
+     python fetch_yugiohmeta.py compact
+
+  6. 刷新本地卡包索引（一次请求下载 YGOProDeck 全量卡牌数据；build-all 在索引缺失或过期时会自动刷新）:
+     python fetch_yugiohmeta.py index
+     python fetch_yugiohmeta.py index --from cardinfo.json   # 使用本地保存的全量数据
+
+  所有命令都可以加 --offline：只使用 .http_cache/ 中缓存的 API 响应，不访问网络
+
 【可用卡图尺寸】
   w100 (~5KB), w140 (~10KB), w200 (~17KB), w260 (~28KB), w360 (~47KB), w420 (~59KB)
 
 【注意事项】
   - yugiohmeta API 不支持批量查询，每张卡需要单独请求
-  - 请保持合理的请求间隔，避免被限流
+  - 请求间隔由 fetcher.py 统一限流，并发只用于重叠网络延迟，不会超过限流速率
   - 映射表是增量更新的，不会覆盖已有的映射
 """
 
-import urllib.request
+import urllib.parse
 import json
 import sys
-import time
 import os
+import time
 from datetime import datetime
 
+from fetcher import get_fetcher, apply_offline_flag, HOST_RATE_LIMITS
+
 # ===== 配置 =====
 YUGIOHMETA_API = "https://www.yugiohmeta.com/api/v1"
 S3_CDN_BASE = "https://s3.duellinksmeta.com/cards"
-REQUEST_INTERVAL = 0.5  # 请求间隔（秒），保守设置避免被限流
-USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+# 请求限流由 fetcher.py 统一处理（yugiohmeta 500ms 间隔 / ygoprodeck 20 req/s），无需手动 sleep
 
 # 文件路径
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 TCG_PACKS_PATH = os.path.join(SCRIPT_DIR, "data", "tcg", "packs.json")
 MAP_OUTPUT_PATH = os.path.join(SCRIPT_DIR, "data", "tcg", "yugiohmeta_map.json")
+MAP_JOURNAL_PATH = os.path.join(SCRIPT_DIR, "data", "tcg", "yugiohmeta_map.journal.jsonl")
+FAILED_PATH = os.path.join(SCRIPT_DIR, "data", "tcg", "yugiohmeta_failed.json")
+SET_INDEX_PATH = os.path.join(SCRIPT_DIR, "data", "tcg", "ygoprodeck_set_index.json")
+SET_INDEX_MAX_AGE = 7 * 24 * 3600  # build-all 时本地卡包索引超过此时间（秒）自动刷新
 
 # YGOProDeck API（用于获取卡包中所有卡牌的密码列表）
 YGOPRODECK_API = "https://db.ygoprodeck.com/api/v7"
-YGOPRODECK_INTERVAL = 0.35  # YGOProDeck 限流间隔
+
+MAP_MAX_WORKERS = 4  # 并发查询 yugiohmeta 的默认线程数（仍受 fetcher 限流约束）
+
+# 查询失败原因
+FAIL_HTTP_ERROR = "http_error"            # 请求失败（网络错误 / HTTP 错误 / 重试耗尽）
+FAIL_EMPTY = "empty"                      # API 返回空结果（yugiohmeta 没有收录这张卡）
+FAIL_NO_STANDARD_ART = "no_standard_art"  # 有结果但没有可用的卡图 _id
+
+# 失败后的重试间隔：首次间隔 × 2^(失败次数-1)，不超过 FAILED_RETRY_MAX
+FAILED_RETRY_BASE = {
+    FAIL_HTTP_ERROR: 3600,             # 临时错误：1 小时后重试
+    FAIL_EMPTY: 24 * 3600,             # 未收录：1 天后重试（新卡通常几天内补上）
+    FAIL_NO_STANDARD_ART: 24 * 3600,
+}
+FAILED_RETRY_MAX = 30 * 24 * 3600
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 
 def api_request(url):
-    """发送 API 请求，返回 JSON 数据"""
-    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
-    try:
-        resp = urllib.request.urlopen(req, timeout=30)
-        data = json.loads(resp.read().decode("utf-8"))
-        return data
-    except urllib.error.HTTPError as e:
-        print(f"  ❌ HTTP 错误: {e.code} - {url}")
-        return None
-    except Exception as e:
-        print(f"  ❌ 请求失败: {url} - {e}")
-        return None
+    """发送 API 请求，返回 JSON 数据（经过 fetcher 的连接池和限流）"""
+    return get_fetcher().get_json(url)
 
 
 def load_map():
-    """加载已有的映射表"""
+    """加载已有的映射表，并回放尚未合并的追加日志"""
+    map_data = _load_map_file()
+    replayed = replay_journal(map_data)
+    if replayed:
+        print(f"  🔁 从追加日志恢复 {replayed} 条未合并的记录: {MAP_JOURNAL_PATH}")
+    return map_data
+
+
+def _load_map_file():
     if os.path.exists(MAP_OUTPUT_PATH):
         with open(MAP_OUTPUT_PATH, "r", encoding="utf-8") as f:
             return json.load(f)
@@ -95,24 +132,126 @@ def load_map():
     }
 
 
-def save_map(map_data):
-    """保存映射表到文件"""
-    map_data["_更新时间"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+def save_map(map_data, failures=None):
+    """
+    保存映射表到文件（合并追加日志）
+    先写临时文件再原子替换，替换成功后才删除日志，任何时刻中断都不会丢失已查到的映射
+    failures: 查询失败记录，传入时一并保存（日志中也包含失败记录，需在删除日志前保存）
+    """
+    if failures is not None:
+        save_failures(failures)
+    map_data["_更新时间"] = datetime.now().strftime(TIME_FORMAT)
     map_data["stats"]["totalCards"] = len(map_data["cards"])
 
     os.makedirs(os.path.dirname(MAP_OUTPUT_PATH), exist_ok=True)
-    with open(MAP_OUTPUT_PATH, "w", encoding="utf-8") as f:
+    tmp_path = MAP_OUTPUT_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
         json.dump(map_data, f, ensure_ascii=False, indent=2)
         f.write("\n")
+    os.replace(tmp_path, MAP_OUTPUT_PATH)
+    if os.path.exists(MAP_JOURNAL_PATH):
+        os.remove(MAP_JOURNAL_PATH)
     print(f"\n  ✅ 映射表已保存: {MAP_OUTPUT_PATH}")
     print(f"     共 {map_data['stats']['totalCards']} 张卡的映射")
 
 
-def get_passwords_from_ygoprodeck(set_code):
+# ===== 追加日志 =====
+# 每行一条 JSON 记录：
+#   {"password": "89631141", "result": {...}}  查到的一张卡的映射
+#   {"pack": "Maze of Muertos"}                  一个卡包处理完成
+#   {"failed": "89631141", "info": {...}}       一次查询失败（见 record_failure）
+# 写入成本与映射表大小无关；最后一行写到一半时中断，回放时会被忽略，下次打开日志时截断
+
+def open_journal():
+    """
+    以追加模式打开日志文件
+    上次中断时最后一行可能只写了一半，先截断到最后一个换行符，
+    否则下一条记录会接在半行后面，回放时连同这条新记录一起被丢弃
+    """
+    os.makedirs(os.path.dirname(MAP_JOURNAL_PATH), exist_ok=True)
+    if os.path.exists(MAP_JOURNAL_PATH):
+        truncate_partial_line(MAP_JOURNAL_PATH)
+    return open(MAP_JOURNAL_PATH, "a", encoding="utf-8")
+
+
+def truncate_partial_line(path, block_size=4096):
+    """文件不以换行符结尾时，截断到最后一个换行符之后（从末尾按块向前查找），返回截掉的字节数"""
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return 0
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return 0
+        keep = 0
+        end = size
+        while end > 0:
+            start = max(0, end - block_size)
+            f.seek(start)
+            idx = f.read(end - start).rfind(b"\n")
+            if idx >= 0:
+                keep = start + idx + 1
+                break
+            end = start
+        f.truncate(keep)
+    print(f"  ⚠️ 追加日志最后一行不完整（上次中断时写了一半），已截断 {size - keep} 字节")
+    return size - keep
+
+
+def append_journal(journal, record):
+    """追加一条记录并立即落盘"""
+    journal.write(json.dumps(record, ensure_ascii=False) + "\n")
+    journal.flush()
+
+
+def iter_journal(warn=True):
+    """逐条读取日志记录；warn=True 时报告无法解析而跳过的行数"""
+    if not os.path.exists(MAP_JOURNAL_PATH):
+        return
+    skipped = 0
+    with open(MAP_JOURNAL_PATH, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                skipped += 1  # 中断时写了一半的行
+    if skipped and warn:
+        print(f"  ⚠️ 追加日志中有 {skipped} 行无法解析（中断时写了一半），已跳过")
+
+
+def replay_journal(map_data):
+    """把日志中的映射记录应用到 map_data，返回应用的记录数"""
+    count = 0
+    for record in iter_journal():
+        if "password" in record:
+            map_data["cards"][record["password"]] = record["result"]
+        elif "pack" in record:
+            _add_pack_to_stats(map_data, record["pack"])
+        else:
+            continue
+        count += 1
+    return count
+
+
+def _add_pack_to_stats(map_data, set_code):
+    if set_code not in map_data["stats"]["packList"]:
+        map_data["stats"]["packList"].append(set_code)
+        map_data["stats"]["totalPacks"] = len(map_data["stats"]["packList"])
+
+
+def get_passwords_from_ygoprodeck(set_code, set_index=None):
     """
     从 YGOProDeck API 获取指定卡包中所有卡牌的密码列表
+    set_index: 本地卡包索引（load_set_index() 的返回值），包含该卡包时直接使用，不发请求
     返回: [(password, cardName), ...]
     """
+    if set_index:
+        cards = lookup_set_index(set_index, set_code)
+        if cards is not None:
+            print(f"  📚 本地卡包索引: [{set_code}] {len(cards)} 张卡牌")
+            return cards
+        print(f"  ⚠️ 本地卡包索引中没有 [{set_code}]，改为请求 YGOProDeck")
+
     print(f"  📡 正在从 YGOProDeck 获取卡包 [{set_code}] 的卡牌列表...")
     url = f"{YGOPRODECK_API}/cardinfo.php?cardset={urllib.parse.quote(set_code)}"
     data = api_request(url)
@@ -132,6 +271,148 @@ def get_passwords_from_ygoprodeck(set_code):
     return cards
 
 
+# ===== 本地卡包索引 =====
+# 格式（紧凑 JSON）：
+#   "names": { password: 英文卡名 }
+#   "sets":  { 卡包名: [password, ...] }   卡包名即 TCG packs.json 中的 setCode
+
+def build_set_index(dump):
+    """从 YGOProDeck 全量卡牌数据（cardinfo.php 的返回值）生成卡包索引"""
+    names = {}
+    sets = {}
+    for card in dump.get("data", []):
+        password = card.get("id")
+        if not password:
+            continue
+        password = str(password)
+        names[password] = card.get("name", "")
+        for card_set in card.get("card_sets") or []:
+            set_name = card_set.get("set_name")
+            if not set_name:
+                continue
+            members = sets.setdefault(set_name, [])
+            # 同一张卡在一个卡包中可能有多个稀有度版本，只记录一次
+            if not members or members[-1] != password:
+                members.append(password)
+    return {
+        "_说明": "YGOProDeck 卡包名 → 卡牌密码索引（fetch_yugiohmeta.py 自动生成，勿手动编辑）",
+        "_更新时间": datetime.now().strftime(TIME_FORMAT),
+        "names": names,
+        "sets": sets,
+    }
+
+
+def refresh_set_index(source_path=None):
+    """
+    刷新本地卡包索引：从本地文件（source_path）或 YGOProDeck 全量接口（一次请求）读取
+    返回索引，失败返回 None
+    """
+    if source_path:
+        print(f"  📂 正在读取全量卡牌数据: {source_path}")
+        with open(source_path, "r", encoding="utf-8") as f:
+            dump = json.load(f)
+    else:
+        print(f"  📡 正在从 YGOProDeck 下载全量卡牌数据（一次请求）...")
+        dump = api_request(f"{YGOPRODECK_API}/cardinfo.php")
+        if not dump or "data" not in dump:
+            print(f"  ❌ 下载全量卡牌数据失败")
+            return None
+
+    index = build_set_index(dump)
+    os.makedirs(os.path.dirname(SET_INDEX_PATH), exist_ok=True)
+    tmp_path = SET_INDEX_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, SET_INDEX_PATH)
+    print(f"  ✅ 卡包索引已保存: {SET_INDEX_PATH}")
+    print(f"     {len(index['sets'])} 个卡包 / {len(index['names'])} 张卡 "
+          f"({os.path.getsize(SET_INDEX_PATH) / 1024:.0f} KB)")
+    return index
+
+
+def load_set_index(max_age=None):
+    """
+    加载本地卡包索引；不存在、或 max_age（秒）不为 None 且索引已过期时返回 None
+    """
+    if not os.path.exists(SET_INDEX_PATH):
+        return None
+    if max_age is not None and time.time() - os.path.getmtime(SET_INDEX_PATH) > max_age:
+        return None
+    with open(SET_INDEX_PATH, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    # 卡包名不区分大小写（与 YGOProDeck cardset 参数一致）
+    index["_lower"] = {name.lower(): name for name in index["sets"]}
+    return index
+
+
+def lookup_set_index(set_index, set_code):
+    """在本地索引中查找卡包收录，返回 [(password, cardName), ...]；没有该卡包返回 None"""
+    set_name = set_index["_lower"].get(set_code.lower())
+    if set_name is None:
+        return None
+    names = set_index["names"]
+    return [(password, names.get(password, "")) for password in set_index["sets"][set_name]]
+
+
+# ===== 查询失败记录 =====
+
+def load_failures():
+    """
+    加载查询失败记录（包括追加日志中尚未合并的部分）
+    返回: { password: {"reason", "attempts", "lastTried", "nextRetry"} }
+    """
+    failures = {}
+    if os.path.exists(FAILED_PATH):
+        with open(FAILED_PATH, "r", encoding="utf-8") as f:
+            failures = json.load(f).get("failed", {})
+    for record in iter_journal(warn=False):  # 无法解析的行已在 load_map() 回放时报告
+        if "failed" in record:
+            failures[record["failed"]] = record["info"]
+        elif "password" in record:
+            failures.pop(record["password"], None)
+    return failures
+
+
+def save_failures(failures):
+    """保存查询失败记录"""
+    data = {
+        "_说明": "YugiohMeta 查询失败记录 —— 未到 nextRetry 的密码在 build / build-all 时跳过（--retry-failed 强制重试）",
+        "_更新时间": datetime.now().strftime(TIME_FORMAT),
+        "failed": dict(sorted(failures.items())),
+    }
+    os.makedirs(os.path.dirname(FAILED_PATH), exist_ok=True)
+    tmp_path = FAILED_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, FAILED_PATH)
+
+
+def record_failure(failures, password, reason):
+    """记录一次查询失败，按失败次数指数退避计算下次重试时间，返回记录内容"""
+    attempts = failures.get(password, {}).get("attempts", 0) + 1
+    delay = min(FAILED_RETRY_BASE.get(reason, FAILED_RETRY_BASE[FAIL_EMPTY]) * 2 ** (attempts - 1),
+                FAILED_RETRY_MAX)
+    now = datetime.now()
+    info = {
+        "reason": reason,
+        "attempts": attempts,
+        "lastTried": now.strftime(TIME_FORMAT),
+        "nextRetry": datetime.fromtimestamp(now.timestamp() + delay).strftime(TIME_FORMAT),
+    }
+    failures[password] = info
+    return info
+
+
+def is_retry_due(info, now=None):
+    """失败记录是否已到重试时间"""
+    now = now or datetime.now()
+    try:
+        return now >= datetime.strptime(info.get("nextRetry", ""), TIME_FORMAT)
+    except ValueError:
+        return True
+
+
 def query_yugiohmeta(password):
     """
     查询 yugiohmeta API，获取指定密码的卡图映射信息
@@ -141,11 +422,21 @@ def query_yugiohmeta(password):
         "alts": { "卡包名": "_id", ... }  # 异画版映射
     } 或 None
     """
+    return lookup_yugiohmeta(password)[0]
+
+
+def lookup_yugiohmeta(password):
+    """
+    同 query_yugiohmeta，额外返回失败原因
+    返回: (结果, None) 或 (None, FAIL_* 失败原因)
+    """
     url = f"{YUGIOHMETA_API}/cards?konamiID={password}"
     data = api_request(url)
 
-    if not data or len(data) == 0:
-        return None
+    if data is None:
+        return None, FAIL_HTTP_ERROR
+    if not data or not isinstance(data, list):
+        return None, FAIL_EMPTY
 
     result = {
         "id": None,
@@ -174,72 +465,100 @@ def query_yugiohmeta(password):
         result["id"] = data[0].get("_id", "")
         result["name"] = data[0].get("name", "")
 
-    return result
+    if not result["id"]:
+        return None, FAIL_NO_STANDARD_ART
+    return result, None
 
 
-def build_map_for_pack(set_code, map_data):
+def build_map_for_pack(set_code, map_data, max_workers=MAP_MAX_WORKERS, journal=None,
+                       failures=None, retry_failed=False, set_index=None):
     """
     为指定 TCG 卡包构建映射
+    max_workers: 并发查询数，查询结果按完成顺序逐个写入 map_data["cards"]
+    journal: 追加日志文件（open_journal() 的返回值），每查到一张卡就追加一行
+    failures: 查询失败记录（load_failures() 的返回值），未到重试时间的密码跳过；
+              retry_failed=True 时忽略重试时间
+    set_index: 本地卡包索引，包含该卡包时不再请求 YGOProDeck
     """
     print(f"\n{'='*60}")
     print(f"📦 正在为卡包 [{set_code}] 构建映射...")
     print(f"{'='*60}")
 
     # 1. 从 YGOProDeck 获取卡牌密码列表
-    cards = get_passwords_from_ygoprodeck(set_code)
+    cards = get_passwords_from_ygoprodeck(set_code, set_index)
     if not cards:
         print(f"  ⚠️ 卡包 [{set_code}] 没有获取到卡牌，跳过")
         return 0
 
-    time.sleep(YGOPRODECK_INTERVAL)
-
-    # 2. 逐个查询 yugiohmeta
-    new_count = 0
+    # 2. 并发查询 yugiohmeta（跳过已有映射的卡、以及未到重试时间的失败记录）
+    if failures is None:
+        failures = {}
+    now = datetime.now()
+    pending = []
     skip_count = 0
-    fail_count = 0
-
-    for i, (password, name) in enumerate(cards, 1):
-        # 检查是否已有映射
+    known_fail_count = 0
+    for password, name in cards:
         if password in map_data["cards"]:
             skip_count += 1
-            continue
-
-        # 查询 yugiohmeta
-        time.sleep(REQUEST_INTERVAL)
-        result = query_yugiohmeta(password)
+        elif password in failures and not retry_failed and not is_retry_due(failures[password], now):
+            known_fail_count += 1
+        else:
+            pending.append((password, name))
+    new_count = 0
+    fail_count = 0
 
-        if result and result["id"]:
+    start = time.time()
+    fetcher = get_fetcher()
+    for done, ((password, name), (result, reason)) in enumerate(
+            fetcher.iter_many(pending, lambda card: lookup_yugiohmeta(card[0]), max_workers), 1):
+        if result:
             map_data["cards"][password] = result
+            failures.pop(password, None)
+            if journal:
+                append_journal(journal, {"password": password, "result": result})
             new_count += 1
             status = "✅"
+            detail = result["id"][:12] + "..."
         else:
+            info = record_failure(failures, password, reason)
+            if journal:
+                append_journal(journal, {"failed": password, "info": info})
             fail_count += 1
             status = "❌"
+            detail = f"NOT FOUND ({reason}，第 {info['attempts']} 次，{info['nextRetry']} 后重试)"
 
-        # 进度显示
-        progress = f"[{i}/{len(cards)}]"
-        print(f"  {status} {progress} {password} → {result['id'][:12] + '...' if result and result['id'] else 'NOT FOUND'} | {name}")
+        # 进度显示（按完成顺序）
+        progress = f"[{done}/{len(pending)}]"
+        print(f"  {status} {progress} {password} → {detail} | {name}")
+    elapsed = time.time() - start
 
     # 更新卡包列表统计
-    if set_code not in map_data["stats"]["packList"]:
-        map_data["stats"]["packList"].append(set_code)
-        map_data["stats"]["totalPacks"] = len(map_data["stats"]["packList"])
+    _add_pack_to_stats(map_data, set_code)
+    if journal:
+        append_journal(journal, {"pack": set_code})
 
     print(f"\n  📊 卡包 [{set_code}] 完成:")
-    print(f"     新增: {new_count} | 跳过(已有): {skip_count} | 失败: {fail_count}")
+    print(f"     新增: {new_count} | 跳过(已有): {skip_count} | 跳过(已知失败): {known_fail_count} | 失败: {fail_count}")
+    if pending and elapsed > 0:
+        print(f"     耗时: {elapsed:.1f}s | 吞吐: {len(pending) / elapsed:.2f} req/s, "
+              f"{len(pending) / elapsed * 60:.0f} 张/分钟 (并发 {max_workers})")
 
     return new_count
 
 
-def cmd_build(set_code):
+def cmd_build(set_code, max_workers=MAP_MAX_WORKERS, retry_failed=False):
     """为指定卡包构建映射"""
     map_data = load_map()
-    new_count = build_map_for_pack(set_code, map_data)
-    save_map(map_data)
+    failures = load_failures()
+    set_index = load_set_index()
+    with open_journal() as journal:
+        new_count = build_map_for_pack(set_code, map_data, max_workers, journal, failures,
+                                       retry_failed, set_index)
+    save_map(map_data, failures)
     return new_count
 
 
-def cmd_build_all():
+def cmd_build_all(max_workers=MAP_MAX_WORKERS, retry_failed=False):
     """为所有已配置的 TCG 卡包构建映射"""
     # 读取 TCG 卡包配置
     if not os.path.exists(TCG_PACKS_PATH):
@@ -255,31 +574,41 @@ def cmd_build_all():
         return
 
     print(f"\n🚀 开始为 {len(packs)} 个 TCG 卡包构建 YugiohMeta 映射...")
-    print(f"   请求间隔: {REQUEST_INTERVAL}s (yugiohmeta) / {YGOPRODECK_INTERVAL}s (ygoprodeck)")
+    meta_rate = HOST_RATE_LIMITS["www.yugiohmeta.com"][0]
+    deck_rate = HOST_RATE_LIMITS["db.ygoprodeck.com"][0]
+    print(f"   限流: {meta_rate:g} req/s (yugiohmeta) / {deck_rate:g} req/s (ygoprodeck) | 并发: {max_workers}")
+
+    # 本地卡包索引缺失或过期时刷新一次，之后所有卡包都从本地索引获取收录
+    set_index = load_set_index(max_age=SET_INDEX_MAX_AGE)
+    if set_index is None and refresh_set_index():
+        set_index = load_set_index()
 
     map_data = load_map()
+    failures = load_failures()
     total_new = 0
+    start = time.time()
 
-    for i, pack in enumerate(packs, 1):
-        set_code = pack.get("setCode", "")
-        pack_name = pack.get("packName", "")
-        if not set_code:
-            print(f"\n  ⚠️ 跳过无 setCode 的卡包: {pack_name}")
-            continue
-
-        print(f"\n{'─'*60}")
-        print(f"  [{i}/{len(packs)}] {pack_name} (setCode: {set_code})")
-        new_count = build_map_for_pack(set_code, map_data)
-        total_new += new_count
+    # 查到的映射逐条追加到日志（中途中断也不会丢失），全部完成后一次性合并进映射表
+    with open_journal() as journal:
+        for i, pack in enumerate(packs, 1):
+            set_code = pack.get("setCode", "")
+            pack_name = pack.get("packName", "")
+            if not set_code:
+                print(f"\n  ⚠️ 跳过无 setCode 的卡包: {pack_name}")
+                continue
 
-        # 每个卡包完成后保存（防止中途中断丢失数据）
-        save_map(map_data)
+            print(f"\n{'─'*60}")
+            print(f"  [{i}/{len(packs)}] {pack_name} (setCode: {set_code})")
+            new_count = build_map_for_pack(set_code, map_data, max_workers, journal,
+                                           failures, retry_failed, set_index)
+            total_new += new_count
 
-        if i < len(packs):
-            time.sleep(YGOPRODECK_INTERVAL)
+    save_map(map_data, failures)
 
     print(f"\n{'='*60}")
-    print(f"🎉 全部完成！新增映射: {total_new} 张卡")
+    elapsed = time.time() - start
+    print(f"🎉 全部完成！新增映射: {total_new} 张卡，耗时 {elapsed:.1f}s"
+          f"（{total_new / elapsed * 60 if elapsed > 0 else 0:.0f} 张/分钟）")
     print(f"   映射表总计: {map_data['stats']['totalCards']} 张卡 / {map_data['stats']['totalPacks']} 个卡包")
 
 
@@ -310,7 +639,7 @@ def cmd_test(password):
 
 def cmd_info():
     """显示映射表信息"""
-    if not os.path.exists(MAP_OUTPUT_PATH):
+    if not os.path.exists(MAP_OUTPUT_PATH) and not os.path.exists(MAP_JOURNAL_PATH):
         print(f"  ⚠️ 映射表文件不存在: {MAP_OUTPUT_PATH}")
         print(f"  💡 运行 'python fetch_yugiohmeta.py build-all' 来生成映射表")
         return
@@ -320,7 +649,7 @@ def cmd_info():
     print(f"{'─'*40}")
     print(f"  文件路径: {MAP_OUTPUT_PATH}")
     print(f"  更新时间: {map_data.get('_更新时间', '未知')}")
-    print(f"  总卡牌数: {map_data['stats']['totalCards']}")
+    print(f"  总卡牌数: {len(map_data['cards'])}")
     print(f"  总卡包数: {map_data['stats']['totalPacks']}")
 
     if map_data["stats"]["packList"]:
@@ -332,12 +661,41 @@ def cmd_info():
     alt_count = sum(1 for v in map_data["cards"].values() if v.get("alts"))
     print(f"\n  有异画版的卡: {alt_count}")
 
+    # 查询失败记录
+    failures = load_failures()
+    if failures:
+        reasons = {}
+        for info in failures.values():
+            reasons[info.get("reason", "?")] = reasons.get(info.get("reason", "?"), 0) + 1
+        due = sum(1 for info in failures.values() if is_retry_due(info))
+        print(f"\n  查询失败记录: {len(failures)} 个密码（已到重试时间: {due}）")
+        for reason, count in sorted(reasons.items()):
+            print(f"    {reason}: {count}")
+
+
+def cmd_compact():
+    """把追加日志合并进映射表"""
+    if not os.path.exists(MAP_JOURNAL_PATH):
+        print(f"  ✅ 没有需要合并的追加日志")
+        return
+    save_map(load_map(), load_failures())
+
 
 def main():
-    # 需要 urllib.parse
-    import urllib.parse
+    args = apply_offline_flag(sys.argv[1:])
+
+    # --jobs N：并发查询数
+    max_workers = MAP_MAX_WORKERS
+    if "--jobs" in args:
+        idx = args.index("--jobs")
+        if idx + 1 < len(args) and args[idx + 1].isdigit():
+            max_workers = max(1, int(args[idx + 1]))
+            del args[idx:idx + 2]
+        else:
+            del args[idx]
 
-    args = sys.argv[1:]
+    retry_failed = "--retry-failed" in args
+    args = [a for a in args if a != "--retry-failed"]
 
     if not args:
         print(__doc__)
@@ -350,10 +708,10 @@ def main():
             print("❌ 请指定卡包 setCode，例: python fetch_yugiohmeta.py build \"Maze of Muertos\"")
             return
         set_code = args[1]
-        cmd_build(set_code)
+        cmd_build(set_code, max_workers, retry_failed)
 
     elif command == "build-all":
-        cmd_build_all()
+        cmd_build_all(max_workers, retry_failed)
 
     elif command == "test":
         if len(args) < 2:
@@ -364,12 +722,23 @@ def main():
     elif command == "info":
         cmd_info()
 
+    elif command == "compact":
+        cmd_compact()
+
+    elif command == "index":
+        source_path = None
+        if "--from" in args:
+            idx = args.index("--from")
+            if idx + 1 >= len(args):
+                print("❌ 请指定全量卡牌数据文件，例: python fetch_yugiohmeta.py index --from cardinfo.json")
+                return
+            source_path = args[idx + 1]
+        refresh_set_index(source_path)
+
     else:
         print(f"❌ 未知命令: {command}")
         print(__doc__)
 
 
 if __name__ == "__main__":
-    # 在文件顶部导入会在某些环境下失败，这里确保可用
-    import urllib.parse
     main()
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+fetcher.py — 工具脚本共用的 HTTP 请求层
+
+【功能说明】
+  fetch_packs.py / fetch_yugiohmeta.py / tools/*.py 统一通过本模块发请求：
+  1. 按域名复用 HTTP 长连接（连接池），不再每次请求都重新握手
+  2. 按域名的令牌桶限流，遵守 docs/ARCHITECTURE.md 中的 API 限流规范
+  3. 遇到 403 / 429 / 5xx 自动退避重试（2s × 尝试次数，服务器返回 Retry-After 时以其为准）
+  4. fetch_many() / iter_many() 在限流范围内并发请求，替代逐个串行 + time.sleep
+  5. 磁盘缓存（.http_cache/）：按 URL 保存响应和 ETag / Last-Modified，
+     有效期内直接使用缓存，过期后发送条件请求（304 时沿用缓存），总大小超限时按 LRU 淘汰
+  6. 离线模式：只从缓存读取，不访问网络（脚本中使用 --offline 参数开启）
+
+【使用方法】
+  from fetcher import get_fetcher
+
+  fetcher = get_fetcher()
+  html = fetcher.get_text('https://ygocdb.com/packs')
+  data = fetcher.get_json('https://db.ygoprodeck.com/api/v7/cardinfo.php?id=89631141')
+  results = fetcher.fetch_many(urls, fetcher.get_json, max_workers=4)
+"""
+
+import gzip
+import hashlib
+import http.client
+import json
+import os
+import threading
+import time
+import urllib.parse
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed
+from concurrent.futures import wait as wait_futures
+
+
+# ===== 配置 =====
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+REQUEST_TIMEOUT = 30  # 单次请求超时（秒）
+MAX_RETRIES = 3       # 403/429/5xx/网络错误的最大重试次数
+BACKOFF_BASE = 2      # 退避间隔基数（秒），第 n 次重试等待 n × BACKOFF_BASE 秒
+MAX_REDIRECTS = 5
+RETRY_STATUSES = (403, 429, 500, 502, 503, 504)  # 视为临时错误、需要退避重试的状态码
+
+# 各域名的限流规则：(每秒请求数, 突发容量)
+# 参见 docs/ARCHITECTURE.md「外部 API 限流规范」
+HOST_RATE_LIMITS = {
+    "ygocdb.com": (1 / 0.3, 1),            # YGOCDB：无明确限制，保守按 300ms 间隔
+    "db.ygoprodeck.com": (20, 20),         # YGOProDeck：20 req/s
+    "www.yugiohmeta.com": (1 / 0.5, 1),    # YugiohMeta：保守按 500ms 间隔
+    "s3.duellinksmeta.com": (1 / 0.3, 1),  # CDN 图源：300ms
+}
+DEFAULT_RATE_LIMIT = (1 / 0.3, 1)          # 未配置的域名默认 300ms 间隔
+
+# ===== 磁盘缓存配置 =====
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".http_cache")
+CACHE_MAX_BYTES = 200 * 1024 * 1024  # 缓存总大小上限，超出后按最近最少使用淘汰
+CACHE_EVICT_RATIO = 0.9              # 淘汰时一次删到上限的 90%，避免接近上限后每次写入都要淘汰
+
+# 各域名的缓存有效期（秒）：有效期内不发请求，过期后发送条件请求验证
+HOST_CACHE_TTL = {
+    "ygocdb.com": 6 * 3600,                  # 卡包列表/详情页：6 小时
+    "db.ygoprodeck.com": 24 * 3600,          # 卡包收录：1 天
+    "www.yugiohmeta.com": 24 * 3600,         # 卡图映射：1 天
+    "s3.duellinksmeta.com": 30 * 24 * 3600,  # 卡图：按 ObjectId 命名，内容不会变化
+}
+DEFAULT_CACHE_TTL = 3600
+
+
+class FetchError(Exception):
+    """请求失败（网络错误或重试耗尽）"""
+
+
+class Response:
+    """HTTP 响应（body 已完整读取并解压）"""
+
+    def __init__(self, url, status, headers, body):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+    def text(self, encoding="utf-8"):
+        return self.body.decode(encoding)
+
+    def json(self):
+        return json.loads(self.body.decode("utf-8"))
+
+
+class TokenBucket:
+    """
+    令牌桶限流器（线程安全）
+    rate: 每秒补充的令牌数；capacity: 桶容量（允许的突发请求数）
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """取一个令牌，桶空时阻塞等待"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HttpCache:
+    """
+    按 URL 存储的磁盘缓存（线程安全）
+
+    每个 URL 对应两个文件：{sha1}.body（响应内容）和 {sha1}.json（URL、ETag、Last-Modified、保存时间）
+    命中时更新文件修改时间，淘汰时优先删除最久未使用的条目
+    缓存总大小在首次写入时扫描一次，之后随写入增量维护，只有超过上限时才扫描目录淘汰
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, ttl=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl = dict(HOST_CACHE_TTL)
+        if ttl:
+            self.ttl.update(ttl)
+        self._total_bytes = None  # .body 文件总字节数（None 表示尚未扫描）
+        self._lock = threading.Lock()
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".body", base + ".json"
+
+    def lookup(self, url):
+        """
+        查找缓存，返回 (meta, body, 是否在有效期内)；没有缓存返回 None
+        """
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+
+        # 记录访问时间（LRU 淘汰依据）
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+
+        host = urllib.parse.urlsplit(url).hostname
+        ttl = self.ttl.get(host, DEFAULT_CACHE_TTL)
+        fresh = time.time() - meta.get("storedAt", 0) < ttl
+        return meta, body, fresh
+
+    def store(self, url, resp):
+        """保存 200 响应及其校验信息"""
+        body_path, meta_path = self._paths(url)
+        meta = {
+            "url": url,
+            "etag": resp.headers.get("ETag", ""),
+            "lastModified": resp.headers.get("Last-Modified", ""),
+            "contentType": resp.headers.get("Content-Type", ""),
+            "storedAt": time.time(),
+        }
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            try:
+                old_size = os.path.getsize(body_path)
+            except OSError:
+                old_size = 0
+            self._write(body_path, resp.body)
+            self._write(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+            self._total_bytes += len(resp.body) - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def refresh(self, url, meta):
+        """条件请求返回 304 时，重置保存时间"""
+        _, meta_path = self._paths(url)
+        meta = dict(meta, storedAt=time.time())
+        with self._lock:
+            self._write(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+    def _write(self, path, data):
+        # 先写临时文件再替换，避免中断留下半个文件
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _entries(self):
+        """扫描缓存目录，返回 [(最近访问时间, 字节数, .body 路径), ...]"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".body"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict(self):
+        # 按最近访问时间从旧到新删除，直到总大小降到上限的 CACHE_EVICT_RATIO
+        # （重新扫描目录，顺便校正其他进程写入造成的计数偏差）
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * CACHE_EVICT_RATIO
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                for victim in (path, path[:-len(".body")] + ".json"):
+                    try:
+                        os.remove(victim)
+                    except OSError:
+                        pass
+                total -= size
+                if total <= target:
+                    break
+        self._total_bytes = total
+
+
+class Fetcher:
+    """
+    带连接池和限流的 HTTP 客户端（线程安全，可在多个线程中共用一个实例）
+    """
+
+    def __init__(self, user_agent=USER_AGENT, timeout=REQUEST_TIMEOUT, rate_limits=None,
+                 cache=None, offline=False):
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.cache = cache      # HttpCache 实例，None 表示不使用缓存
+        self.offline = offline  # True 时只读缓存，不访问网络
+        self.rate_limits = dict(HOST_RATE_LIMITS)
+        if rate_limits:
+            self.rate_limits.update(rate_limits)
+        self._buckets = {}
+        self._pools = {}  # (scheme, host, port) → [空闲连接]
+        self._lock = threading.Lock()
+
+    # ---------- 限流 / 连接池 ----------
+
+    def _bucket(self, host):
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, capacity = self.rate_limits.get(host, DEFAULT_RATE_LIMIT)
+                bucket = self._buckets[host] = TokenBucket(rate, capacity)
+            return bucket
+
+    def _get_conn(self, key):
+        with self._lock:
+            idle = self._pools.setdefault(key, [])
+            if idle:
+                return idle.pop()
+        scheme, host, port = key
+        conn_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return conn_cls(host, port, timeout=self.timeout)
+
+    def _put_conn(self, key, conn):
+        with self._lock:
+            self._pools.setdefault(key, []).append(conn)
+
+    def close(self):
+        """关闭所有空闲连接"""
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for idle in pools.values():
+            for conn in idle:
+                conn.close()
+
+    # ---------- 请求 ----------
+
+    def _request_once(self, url, headers):
+        """发送一次请求（不重试、不跟随重定向）"""
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        self._bucket(parts.hostname).acquire()
+
+        conn = self._get_conn(key)
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            self._put_conn(key, conn)
+
+        encoding = resp.getheader("Content-Encoding", "").lower()
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "deflate":
+            body = zlib.decompress(body)
+        return Response(url, resp.status, resp.headers, body)
+
+    def get(self, url, headers=None, cache=True):
+        """
+        GET 请求：优先使用磁盘缓存，否则自动限流、跟随重定向、403/429/5xx/网络错误退避重试
+        返回 Response（包括 4xx/5xx 响应）；重试耗尽仍无响应、或离线模式下缓存未命中时抛出 FetchError
+        自定义 headers 的请求（如 Range）不经过缓存；cache=False 时既不读也不写缓存
+        （调用方自己保存结果的大文件，如镜像到本地的卡图，避免在 .http_cache/ 中再存一份）
+        """
+        cache = self.cache if cache and not headers else None
+        cached = cache.lookup(url) if cache else None
+        if cached:
+            meta, body, fresh = cached
+            if fresh or self.offline:
+                return Response(url, 200, {"Content-Type": meta.get("contentType", "")}, body)
+        if self.offline:
+            if cache:
+                raise FetchError(f"{url} - 离线模式下缓存中没有该地址")
+            raise FetchError(f"{url} - 离线模式下不访问网络（该请求不使用缓存）")
+
+        req_headers = {
+            "User-Agent": self.user_agent,
+            "Accept-Encoding": "gzip, deflate",
+        }
+        if headers:
+            req_headers.update(headers)
+        if cached:
+            # 缓存已过期：带上校验信息发送条件请求
+            if cached[0].get("etag"):
+                req_headers["If-None-Match"] = cached[0]["etag"]
+            if cached[0].get("lastModified"):
+                req_headers["If-Modified-Since"] = cached[0]["lastModified"]
+
+        resp = self._get_with_retry(url, req_headers)
+
+        if cache:
+            if resp.status == 304 and cached:
+                cache.refresh(url, cached[0])
+                return Response(url, 200, {"Content-Type": cached[0].get("contentType", "")}, cached[1])
+            if resp.status == 200:
+                cache.store(url, resp)
+        return resp
+
+    def _get_with_retry(self, url, req_headers):
+        """发送请求：跟随重定向，403/429/5xx/网络错误退避重试"""
+
+        redirects = 0
+        attempt = 0
+        while True:
+            try:
+                resp = self._request_once(url, req_headers)
+            except (http.client.HTTPException, OSError) as e:
+                attempt += 1
+                if attempt > MAX_RETRIES:
+                    raise FetchError(f"{url} - {e}") from e
+                time.sleep(BACKOFF_BASE * attempt)
+                continue
+
+            if resp.status in (301, 302, 303, 307, 308) and resp.headers.get("Location"):
+                redirects += 1
+                if redirects > MAX_REDIRECTS:
+                    raise FetchError(f"{url} - 重定向次数过多")
+                url = urllib.parse.urljoin(url, resp.headers["Location"])
+                continue
+
+            if resp.status in RETRY_STATUSES and attempt < MAX_RETRIES:
+                attempt += 1
+                retry_after = resp.headers.get("Retry-After", "")
+                wait = int(retry_after) if retry_after.isdigit() else BACKOFF_BASE * attempt
+                print(f"  ⏳ HTTP {resp.status}，{wait}s 后重试 ({attempt}/{MAX_RETRIES}): {url}")
+                time.sleep(wait)
+                continue
+
+            return resp
+
+    def get_bytes(self, url):
+        """获取二进制内容，失败时打印错误并返回 None"""
+        try:
+            resp = self.get(url)
+        except FetchError as e:
+            print(f"  ❌ 请求失败: {e}")
+            return None
+        if not resp.ok:
+            print(f"  ❌ HTTP 错误: {resp.status} - {url}")
+            return None
+        return resp.body
+
+    def get_text(self, url, encoding="utf-8"):
+        """获取文本内容（如网页 HTML），失败时打印错误并返回 None"""
+        body = self.get_bytes(url)
+        return body.decode(encoding) if body is not None else None
+
+    def get_json(self, url):
+        """获取 JSON 数据，失败时打印错误并返回 None"""
+        body = self.get_bytes(url)
+        if body is None:
+            return None
+        try:
+            return json.loads(body.decode("utf-8"))
+        except ValueError as e:
+            print(f"  ❌ JSON 解析失败: {url} - {e}")
+            return None
+
+    def fetch_many(self, items, func, max_workers=4):
+        """
+        并发执行 func(item)，返回与 items 顺序一致的结果列表
+        每个请求仍经过按域名的限流，max_workers 只限制同时进行中的请求数
+        """
+        items = list(items)
+        if max_workers <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(func, items))
+
+    def iter_many(self, items, func, max_workers=4):
+        """
+        并发执行 func(item)，按完成顺序逐个产出 (item, 结果)，调用方可以边收到边处理
+        同时进行中的任务不超过 max_workers 个（不会一次性提交全部任务）
+        """
+        items = iter(items)
+        if max_workers <= 1:
+            for item in items:
+                yield item, func(item)
+            return
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = {}
+            for item in items:
+                pending[pool.submit(func, item)] = item
+                if len(pending) >= max_workers:
+                    done, _ = wait_futures(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield pending.pop(future), future.result()
+            for future in as_completed(pending):
+                yield pending[future], future.result()
+
+
+_default_fetcher = None
+_default_lock = threading.Lock()
+
+
+def get_fetcher():
+    """获取全局共用的 Fetcher 实例（同一进程内共享连接池、限流器和磁盘缓存）"""
+    global _default_fetcher
+    with _default_lock:
+        if _default_fetcher is None:
+            _default_fetcher = Fetcher(cache=HttpCache())
+        return _default_fetcher
+
+
+def set_offline(offline=True):
+    """开启/关闭全局离线模式（只从缓存读取）"""
+    fetcher = get_fetcher()
+    fetcher.offline = offline
+    if offline:
+        print("📴 离线模式：只使用 .http_cache/ 中的缓存，不访问网络")
+
+
+def apply_offline_flag(args):
+    """
+    处理命令行中的 --offline 参数：存在时开启离线模式，并返回去掉该参数后的列表
+    """
+    if "--offline" in args:
+        set_offline(True)
+        return [a for a in args if a != "--offline"]
+    return args
@@ -739,6 +739,14 @@ async function getOCGCardSetData(packConfig, onProgress) {
                     // 如果配置了本地图片目录，附加到 imageMap 供 getCardImageUrl 优先使用本地图片
                     if (imageMap && packConfig.localImagesDir) {
                         imageMap._localDir = packConfig.localImagesDir;
+                        // 本地派生尺寸（由 tools/build_image_derivatives.py 生成并写入映射表），供 srcset 使用
+                        if (mapData.localImages && mapData.localImages.widths) {
+                            imageMap._localWidths = mapData.localImages.widths;
+                        }
+                        // 预览网格图集（由 tools/build_image_atlas.py 生成）只记下文件名，打开卡牌预览时才由 loadCardAtlas 加载
+                        if (mapData.atlas) {
+                            imageMap._atlasFile = mapData.atlas;
+                        }
                     }
                     console.log(`🗺️ 已加载卡图映射表 [${packConfig.imageMapFile}]，共 ${Object.keys(imageMap).length} 条${packConfig.localImagesDir ? '（本地图片优先）' : ''}`);
                 }
@@ -747,6 +755,21 @@ async function getOCGCardSetData(packConfig, onProgress) {
             }
         }
 
+        // 加载卡图仓库清单（如果配置了 imageManifest，由 tools/build_image_store.py 生成，优先于 localImagesDir）
+        if (packConfig.imageManifest) {
+            try {
+                const manifestResp = await fetch(packConfig.imageManifest);
+                if (manifestResp.ok) {
+                    const manifest = await manifestResp.json();
+                    imageMap = imageMap || {};
+                    imageMap._store = { dir: manifest.storeDir, cards: manifest.cards || {} };
+                    console.log(`🗃️ 已加载卡图仓库清单 [${packConfig.imageManifest}]，共 ${Object.keys(imageMap._store.cards).length} 条`);
+                }
+            } catch (e) {
+                console.warn(`⚠️ 卡图仓库清单 [${packConfig.imageManifest}] 加载失败，使用映射表图源:`, e);
+            }
+        }
+
         const cards = buildOCGCardsFromLocalData(packConfig, imageMap);
 
         // 构建辅助包卡池（如果存在）
@@ -774,17 +797,27 @@ async function getOCGCardSetData(packConfig, onProgress) {
 }
 
 /**
- * 获取卡图URL —— 优先使用映射表（S3 CDN），回退到默认 YGOCDB CDN
+ * 获取卡图URL —— 优先使用卡图仓库清单，其次映射表（本地图片 / S3 CDN），回退到默认 YGOCDB CDN
  * 支持按稀有度获取不同版本的卡图（如 LOCH 卡包中 OF 超框卡版本使用超框卡图）
  * 
  * @param {number|string} cardId - 卡片密码（password）
- * @param {object|null} imageMap - 卡图映射表（password → {metaId, name, altMetaId?}），null 时使用默认图源
+ * @param {object|null} imageMap - 卡图映射表（password → {metaId, name, altMetaId?}），null 时使用默认图源；
+ *                                 _store 为卡图仓库清单（{dir, cards: password → {small, large, alt?}}）
  * @param {string} size - 图片尺寸：'small' = 列表用（200px）, 'large' = 大图（420px）
  * @param {string} [rarityCode] - 可选，稀有度代码（如 'UR-OF'、'GMR-OF'），用于查找该稀有度的替代卡图
  * @returns {string} 图片URL
  */
 function getCardImageUrl(cardId, imageMap, size, rarityCode) {
     const pw = String(cardId);
+    // 卡图仓库（内容寻址，相同图片只存一份）
+    if (imageMap && imageMap._store && imageMap._store.cards[pw]) {
+        const entry = imageMap._store.cards[pw];
+        const variant = (rarityCode && entry.alt && entry.alt[rarityCode]) || entry;
+        const hash = size === 'large' ? variant.large : variant.small;
+        if (hash) {
+            return `${imageMap._store.dir}/${hash}.webp`;
+        }
+    }
     // 如果映射表中有该卡的 metaId，使用映射表图源
     if (imageMap && imageMap[pw] && imageMap[pw].metaId) {
         // 优先检查该稀有度是否有替代卡图（如 LOCH 的 OF 超框卡版本使用超框卡图）
@@ -805,6 +838,85 @@ function getCardImageUrl(cardId, imageMap, size, rarityCode) {
     return `${API_CONFIG.YGOCDB.IMAGE_URL}/${cardId}.jpg`;
 }
 
+/**
+ * 获取卡图在预览网格图集中的 CSS 背景样式 —— 仅当卡包生成了图集（映射表 atlas）时可用
+ * 使用百分比定位，图集格子会随元素宽高自动缩放
+ * 
+ * @param {number|string} cardId - 卡片密码（password）
+ * @param {object|null} imageMap - 卡图映射表
+ * @param {string} [rarityCode] - 可选，稀有度代码，有替代卡图时使用对应格子
+ * @returns {string} style 属性值，不可用时返回空字符串
+ */
+function getCardAtlasStyle(cardId, imageMap, rarityCode) {
+    if (!imageMap || !imageMap._atlas || !imageMap._localDir) {
+        return '';
+    }
+    const entry = imageMap._atlas.cards[String(cardId)];
+    if (!entry) {
+        return '';
+    }
+    const pos = (rarityCode && entry[rarityCode]) || entry['default'];
+    const sheet = imageMap._atlas.sheets[pos[0]];
+    const x = sheet.columns > 1 ? pos[1] / (sheet.columns - 1) * 100 : 0;
+    const y = sheet.rows > 1 ? pos[2] / (sheet.rows - 1) * 100 : 0;
+    return `background-image:url('${imageMap._localDir}/${sheet.file}');` +
+        `background-size:${sheet.columns * 100}% ${sheet.rows * 100}%;` +
+        `background-position:${x.toFixed(4)}% ${y.toFixed(4)}%;`;
+}
+
+/**
+ * 按需加载卡包的预览网格图集描述（atlas.json），只在打开卡牌预览时调用
+ * 加载结果缓存在 imageMap._atlas 上；加载失败时预览网格逐张加载卡图
+ * 
+ * @param {object|null} imageMap - 卡图映射表
+ * @returns {Promise<object|null>} 图集描述，不可用时返回 null
+ */
+async function loadCardAtlas(imageMap) {
+    if (!imageMap || !imageMap._atlasFile || !imageMap._localDir) {
+        return null;
+    }
+    if (imageMap._atlas === undefined) {
+        imageMap._atlas = null;
+        try {
+            const atlasResp = await fetch(`${imageMap._localDir}/${imageMap._atlasFile}`);
+            if (atlasResp.ok) {
+                imageMap._atlas = await atlasResp.json();
+                console.log(`🧩 已加载预览网格图集 [${imageMap._atlasFile}]，共 ${imageMap._atlas.sheets.length} 张`);
+            }
+        } catch (e) {
+            console.warn(`⚠️ 预览网格图集 [${imageMap._atlasFile}] 加载失败，逐张加载卡图:`, e);
+        }
+    }
+    return imageMap._atlas;
+}
+
+/**
+ * 获取卡图的 srcset —— 仅当卡包本地图片目录中生成了派生尺寸（映射表 localImages）时可用
+ * 浏览器根据 <img sizes> 和屏幕像素密度选择最小的合适图片，不再访问远程 CDN
+ * 
+ * @param {number|string} cardId - 卡片密码（password）
+ * @param {object|null} imageMap - 卡图映射表
+ * @param {string} [rarityCode] - 可选，稀有度代码，用于查找该稀有度的替代卡图
+ * @returns {string} srcset 字符串，不可用时返回空字符串
+ */
+function getCardImageSrcset(cardId, imageMap, rarityCode) {
+    const pw = String(cardId);
+    if (!imageMap || !imageMap._localDir || !imageMap._localWidths || !imageMap[pw] || !imageMap[pw].metaId) {
+        return '';
+    }
+    // 卡图仓库中的卡只有小图/大图两个尺寸，直接使用 src
+    if (imageMap._store && imageMap._store.cards[pw]) {
+        return '';
+    }
+    let metaId = imageMap[pw].metaId;
+    if (rarityCode && imageMap[pw].altMetaId && imageMap[pw].altMetaId[rarityCode]) {
+        metaId = imageMap[pw].altMetaId[rarityCode];
+    }
+    return imageMap._localWidths.map(function (w) {
+        return `${imageMap._localDir}/${metaId}_w${w}.webp ${w}w`;
+    }).join(', ');
+}
+
 /**
  * 从本地 cardData 构建 OCG 卡牌数组（零 API 调用）
  * 
@@ -821,6 +933,7 @@ function buildOCGCardsFromLocalData(packConfig, imageMap) {
         'R': 'Rare', 'NR': 'Normal Rare', 'N': 'Common'
     };
     const packCode = packConfig.packCode || '';
+    const textShardUrl = getTextShardUrl(packConfig);
     const cards = [];
 
     (packConfig.cardIds || []).forEach(function (cardDef, index) {
@@ -881,13 +994,63 @@ function buildOCGCardsFromLocalData(packConfig, imageMap) {
             imageUrl: getCardImageUrl(cardDef.id, imageMap, 'small'),
             imageLargeUrl: getCardImageUrl(cardDef.id, imageMap, 'large'),
             dataSource: 'local',
-            _imageMap: imageMap  // 保存映射表引用，用于开包时按稀有度动态获取对应卡图
+            _imageMap: imageMap,  // 保存映射表引用，用于开包时按稀有度动态获取对应卡图
+            _textShard: textShardUrl  // 文本分片模式下 desc 为空，由 loadCardText 按需加载
         });
     });
 
     return cards;
 }
 
+// ====== 卡牌文本分片（packs.json 的 splitText，由 build_pack_data.py 生成） ======
+
+// 文本分片 URL → Promise<{ 密码: { desc, pdesc, jp_ruby } }>，同一分片只请求一次
+const textShardCache = {};
+
+/**
+ * 获取卡包文本分片的 URL，卡包不是文本分片模式时返回 null
+ */
+function getTextShardUrl(packConfig) {
+    return packConfig.textShard ? `data/ocg/cards/${packConfig.textShard}` : null;
+}
+
+/**
+ * 按需加载卡牌的效果文本（查看卡牌详情时调用）
+ * 文本分片模式下卡牌列表不含 desc / pdesc，首次调用时加载整个卡包的文本分片并缓存；
+ * 非分片模式或已加载过的卡牌直接返回
+ * 
+ * @param {object} card - 卡牌对象（buildOCGCardsFromLocalData 的输出）
+ * @returns {object} 补全 desc / pdesc 后的同一卡牌对象
+ */
+async function loadCardText(card) {
+    if (!card || !card._textShard || card.desc) {
+        return card;
+    }
+    const url = card._textShard;
+    if (!textShardCache[url]) {
+        textShardCache[url] = fetch(url).then(function (resp) {
+            if (!resp.ok) {
+                throw new Error(`HTTP ${resp.status}`);
+            }
+            return resp.json();
+        }).then(function (shard) {
+            console.log(`📝 已加载卡牌文本分片 [${url}]`);
+            return shard.cards || {};
+        }).catch(function (e) {
+            console.warn(`⚠️ 卡牌文本分片 [${url}] 加载失败:`, e);
+            delete textShardCache[url];
+            return {};
+        });
+    }
+    const texts = await textShardCache[url];
+    const text = texts[String(card.id)];
+    if (text) {
+        card.desc = text.desc || '';
+        card.pdesc = text.pdesc || '';
+    }
+    return card;
+}
+
 /**
  * 从本地 supplementPack 数据构建辅助包卡牌数组
  * 辅助包卡池独立于主卡池，开整盒时随机抽1张
@@ -907,6 +1070,7 @@ function buildSupplementCardsFromLocalData(packConfig) {
         'R': 'Rare', 'NR': 'Normal Rare', 'N': 'Common'
     };
 
+    const textShardUrl = getTextShardUrl(packConfig);
     const cards = [];
     supp.cards.forEach(function (cardDef) {
         if (!cardDef.id) return;  // 跳过无 ID 的卡
@@ -942,7 +1106,8 @@ function buildSupplementCardsFromLocalData(packConfig) {
             imageUrl: `${API_CONFIG.YGOCDB.IMAGE_URL}/${cardDef.id}.jpg`,
             imageLargeUrl: `${API_CONFIG.YGOCDB.IMAGE_URL}/${cardDef.id}.jpg`,
             dataSource: 'local',
-            _isSupplement: true  // 标记为辅助包卡片
+            _isSupplement: true,  // 标记为辅助包卡片
+            _textShard: textShardUrl
         });
     });
 
@@ -1593,6 +1758,10 @@ window.TCG_API = {
     // 批量预加载卡图
     preloadCardImages: preloadCardImages,
 
+    // 按需加载卡牌效果文本（文本分片模式）
+    loadCardText: loadCardText,
+    loadCardAtlas: loadCardAtlas,
+
     // 缓存管理
     getCacheStatus: getCacheStatus,
     clearAllCache: clearAllCache,
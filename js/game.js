@@ -22,6 +22,7 @@ let changelogData = null;    // 更新日志数据
 let currentPack = null;      // 当前选中的卡包配置
 let currentPackCards = null;  // 当前选中卡包的卡牌数据（来自 API 缓存）
 let currentSupplementCards = null;  // 当前卡包的辅助包卡池（仅开盒时使用）
+let currentPreviewCards = null;  // 卡牌预览弹窗当前显示的卡片（点击卡图查看详情时查找）
 let currentGameMode = 'ocg';  // 当前游戏模式：'ocg' 或 'tcg'，默认 OCG
 let tcgModeEnabled = false;    // TCG 测试模式是否已开启（通过开发者工具开启）
 let currentPackCategory = 'recent';  // 当前选中的卡包分类（recent/booster/structure/concept/special）
@@ -445,6 +446,22 @@ function bindGameEvents() {
     bindEvent('card-preview-modal', 'click', function (e) {
         if (e.target === document.getElementById('card-preview-modal')) hideCardPreview();
     });
+
+    // 卡片预览：点击卡图查看大图和效果文本
+    bindEvent('card-preview-content', 'click', function (e) {
+        const item = e.target.closest('.preview-card-item');
+        if (!item) return;
+        const card = findCardById(currentPreviewCards, item.dataset.cardId);
+        if (!card) return;
+        const rarity = item.dataset.rarity;
+        const largeUrl = card._imageMap
+            ? getCardImageUrl(card.id, card._imageMap, 'large', rarity)
+            : (card.imageLargeUrl || card.imageUrl);
+        const srcset = card._imageMap ? getCardImageSrcset(card.id, card._imageMap, rarity) : '';
+        const foreignName = card.nameOriginal && card.nameOriginal !== card.nameCN ? card.nameOriginal : '';
+        openCardImageViewer(largeUrl, card.nameCN || card.name, foreignName, srcset);
+        showViewerCardText(card);
+    });
 }
 
 // ============================================
@@ -480,8 +497,8 @@ function bindCardImageViewer() {
 
         if (!largeUrl) return;
 
-        // 设置大图和名称
-        viewerImage.src = largeUrl;
+        // 设置大图和名称（本地有派生尺寸时沿用缩略图的 srcset，按查看器尺寸选图）
+        setViewerImageSource(viewerImage, largeUrl, img.getAttribute('srcset'));
         viewerImage.alt = cardName;
 
         // 构建显示名称（中文名 + 外文名）
@@ -490,6 +507,7 @@ function bindCardImageViewer() {
             displayName += `<br><span style="font-size:0.8em;opacity:0.7;">${foreignName}</span>`;
         }
         viewerName.innerHTML = displayName;
+        showViewerCardText(findCardById(currentPackCards, img.getAttribute('data-card-id')));
 
         // 打开查看器（带过渡动画）
         viewer.classList.add('active');
@@ -510,7 +528,7 @@ function bindCardImageViewer() {
 
             if (!largeUrl) return;
 
-            viewerImage.src = largeUrl;
+            setViewerImageSource(viewerImage, largeUrl, img.getAttribute('srcset'));
             viewerImage.alt = cardName;
 
             let displayName = cardName;
@@ -518,6 +536,7 @@ function bindCardImageViewer() {
                 displayName += `<br><span style="font-size:0.8em;opacity:0.7;">${foreignName}</span>`;
             }
             viewerName.innerHTML = displayName;
+            showViewerCardText(findCardById(currentSupplementCards, img.getAttribute('data-card-id')));
 
             viewer.classList.add('active');
         });
@@ -553,6 +572,25 @@ function bindCardImageViewer() {
     });
 }
 
+/**
+ * 设置查看器大图：有 srcset 时浏览器按查看器显示宽度（最宽 95vw、最高 75vh）选择本地最合适的尺寸，
+ * src（_w420 大图）作为不支持 srcset 时的回退；没有 srcset 时清除上一张卡留下的 srcset
+ * 
+ * @param {HTMLImageElement} viewerImage - 查看器中的图片元素
+ * @param {string} src - 大图 URL
+ * @param {string} [srcset] - getCardImageSrcset 生成的 srcset（可选）
+ */
+function setViewerImageSource(viewerImage, src, srcset) {
+    if (srcset) {
+        viewerImage.srcset = srcset;
+        viewerImage.sizes = 'min(95vw, 52vh)';
+    } else {
+        viewerImage.removeAttribute('srcset');
+        viewerImage.removeAttribute('sizes');
+    }
+    viewerImage.src = src;
+}
+
 /**
  * 打开卡片图片查看器（通用方法）
  * 可从开包结果或开发者工具中调用
@@ -560,15 +598,16 @@ function bindCardImageViewer() {
  * @param {string} imgSrc - 图片 URL
  * @param {string} [cardName] - 卡片名称（可选）
  * @param {string} [subText] - 副标题文字（可选，如 CDN 源名称）
+ * @param {string} [srcset] - 本地派生尺寸的 srcset（可选）
  */
-function openCardImageViewer(imgSrc, cardName, subText) {
+function openCardImageViewer(imgSrc, cardName, subText, srcset) {
     var viewer = document.getElementById('card-image-viewer');
     var viewerImage = viewer.querySelector('.viewer-image');
     var viewerName = viewer.querySelector('.viewer-card-name');
 
     if (!imgSrc) return;
 
-    viewerImage.src = imgSrc;
+    setViewerImageSource(viewerImage, imgSrc, srcset);
     viewerImage.alt = cardName || '卡牌大图';
 
     // 构建显示名称
@@ -577,11 +616,45 @@ function openCardImageViewer(imgSrc, cardName, subText) {
         displayName += (displayName ? '<br>' : '') + '<span style="font-size:0.8em;opacity:0.7;">' + subText + '</span>';
     }
     viewerName.innerHTML = displayName;
+    showViewerCardText(null);
 
     // 打开查看器（带过渡动画）
     viewer.classList.add('active');
 }
 
+/**
+ * 在卡牌列表中按密码查找卡牌
+ * 
+ * @param {Array|null} cards - 卡牌数组
+ * @param {number|string} cardId - 卡片密码
+ * @returns {object|null} 找到的卡牌对象
+ */
+function findCardById(cards, cardId) {
+    if (!cards || !cardId) return null;
+    return cards.find(function (c) { return String(c.id) === String(cardId); }) || null;
+}
+
+/**
+ * 在查看器中显示卡牌效果文本
+ * 文本分片模式下卡牌列表不含效果文本，由 TCG_API.loadCardText 按需加载整个卡包的文本分片
+ * 
+ * @param {object|null} card - 卡牌对象，为空时只清空文本
+ */
+async function showViewerCardText(card) {
+    const descEl = document.querySelector('#card-image-viewer .viewer-card-desc');
+    if (!descEl) return;
+    descEl.textContent = '';
+    descEl.dataset.cardId = card ? String(card.id) : '';
+    if (!card) return;
+
+    await TCG_API.loadCardText(card);
+    // 加载期间查看器可能已切换到其他卡牌
+    if (descEl.dataset.cardId !== String(card.id)) return;
+    descEl.textContent = card.pdesc
+        ? '【灵摆效果】' + card.pdesc + '\n【怪兽效果】' + (card.desc || '')
+        : (card.desc || '');
+}
+
 /** 关闭卡片图片查看器（带过渡动画） */
 function closeCardImageViewer() {
     const viewer = document.getElementById('card-image-viewer');
@@ -591,6 +664,7 @@ function closeCardImageViewer() {
     setTimeout(function () {
         const img = viewer.querySelector('.viewer-image');
         if (!viewer.classList.contains('active')) {
+            img.removeAttribute('srcset');
             img.src = '';
         }
     }, 400);
@@ -930,6 +1004,14 @@ async function selectPack(pack) {
             if (cardFileData.supplementPack) {
                 pack.supplementPack = cardFileData.supplementPack;
             }
+            // 文本分片模式（build_pack_data.py --split-text）：效果文本按需加载
+            if (cardFileData.textShard) {
+                pack.textShard = cardFileData.textShard;
+            }
+            // 抽卡查找表（build_pack_data.py 生成）：开包时每个卡位 O(1) 抽取
+            if (cardFileData.drawTables) {
+                pack.drawTables = cardFileData.drawTables;
+            }
             console.log(`📄 已加载独立卡牌文件 [${pack.cardFile}]，共 ${pack.cardIds.length} 张卡`);
         }
 
@@ -1277,6 +1359,124 @@ function drawCards(pack, cards) {
     return drawCards_Legacy(pack, cards);
 }
 
+// ============================================
+// 抽卡查找表（build_pack_data.py 为 ocg_default 卡包预生成的 drawTables）
+// ============================================
+
+const DRAW_TABLE_MAX_TRIES = 16;  // 抽到已选编号时最多重抽的次数，超过后改为在剩余卡中扫描
+
+/**
+ * cardIds 中 (密码, rarityVersions) 序列的 32 位 FNV-1a 哈希（8 位十六进制），与 build_pack_data.py 的 cards_hash 一致
+ * 哈希的字符串为 "密码:版本/版本|密码:版本|..."，没有 rarityVersions 的卡按 N 计
+ */
+function hashCardDefs(cardDefs) {
+    const text = cardDefs.map(function (cardDef) {
+        return cardDef.id + ':' + (cardDef.rarityVersions || ['N']).join('/');
+    }).join('|');
+    let h = 0x811c9dc5;
+    for (let i = 0; i < text.length; i++) {
+        h ^= text.charCodeAt(i);
+        h = Math.imul(h, 0x01000193) >>> 0;
+    }
+    return h.toString(16).padStart(8, '0');
+}
+
+/**
+ * 取出卡包的抽卡查找表
+ * 卡牌数量、cardsHash 或 nrWeightRatio 与当前配置不一致时（修改卡包文件或 packs.json 后未重新构建）返回 null，
+ * 抽卡退回逐张扫描；旧版本构建的查找表没有 cardsHash，同样视为过期
+ */
+function getDrawTables(pack, cards, nrWeightRatio) {
+    const tables = pack.drawTables;
+    if (!tables || tables.cardCount !== cards.length || !pack.cardIds) {
+        return null;
+    }
+    // 同一份 cardIds 只计算一次哈希（开整盒时每包都会调用）
+    if (tables._checkedCardIds !== pack.cardIds) {
+        tables._checkedCardIds = pack.cardIds;
+        tables._cardsHashMatched = tables.cardsHash === hashCardDefs(pack.cardIds);
+    }
+    if (!tables._cardsHashMatched) {
+        return null;
+    }
+    if (tables.nPool && tables.nPool.nrWeightRatio !== nrWeightRatio) {
+        return null;
+    }
+    return tables;
+}
+
+/**
+ * 查找表中的下标池 → 卡牌数组（group 为 'pools' 或 'versionPools'）
+ * 按 cards 数组缓存，同一卡包反复开包时不再重新映射
+ */
+function getTableCards(tables, cards, group, key) {
+    if (tables._cards !== cards) {
+        tables._cards = cards;
+        tables._cache = {};
+    }
+    const cacheKey = group + ':' + key;
+    if (!tables._cache[cacheKey]) {
+        tables._cache[cacheKey] = ((tables[group] || {})[key] || []).map(function (idx) { return cards[idx]; });
+    }
+    return tables._cache[cacheKey];
+}
+
+/** 查找表中所有非 N 卡（对应 poolByRarity 的全部卡） */
+function getTableNonNCards(tables, cards) {
+    return Object.keys(tables.pools).filter(function (code) { return code !== 'N'; })
+        .reduce(function (acc, code) { return acc.concat(getTableCards(tables, cards, 'pools', code)); }, []);
+}
+
+/** 查找表中的 N 卡池，格式与 drawCards_OCG 的 nPool 相同（逐张扫描时使用） */
+function getTableNPool(tables, cards) {
+    return getTableCards(tables, cards, 'pools', 'N').map(function (card) {
+        return { card: card, isNR: (card.rarityVersions || ['N']).indexOf('NR') >= 0 };
+    });
+}
+
+/** Walker 别名表抽样：O(1) 按权重抽取一个位置 */
+function aliasPick(table) {
+    const i = Math.floor(Math.random() * table.prob.length);
+    return Math.random() < table.prob[i] ? i : table.alias[i];
+}
+
+/**
+ * 从 pool 中抽一张编号未被使用的卡（pickIndex 返回抽中的位置），抽到已用编号时重抽
+ * 重抽与"在剩余卡中抽取"同分布；连续重复 DRAW_TABLE_MAX_TRIES 次时返回 null
+ */
+function pickUnusedByRetry(pool, usedSet, pickIndex) {
+    for (let attempt = 0; attempt < DRAW_TABLE_MAX_TRIES; attempt++) {
+        const card = pool[pickIndex()];
+        if (!usedSet.has(card.setNumber || card.id)) {
+            return card;
+        }
+    }
+    return null;
+}
+
+/** 在 pool 中等概率抽一张编号未被使用的卡，全部已使用时返回 null */
+function pickUnusedUniform(pool, usedSet) {
+    if (pool.length === 0) return null;
+    const card = pickUnusedByRetry(pool, usedSet, function () { return Math.floor(Math.random() * pool.length); });
+    if (card) return card;
+    const available = pool.filter(function (c) {
+        return !usedSet.has(c.setNumber || c.id);
+    });
+    return available.length > 0 ? available[Math.floor(Math.random() * available.length)] : null;
+}
+
+/**
+ * 查找表模式下从 N 卡池按权重（NR 为 nrWeightRatio）抽一张编号未被使用的卡，返回 { card, isNR }
+ * N 卡池为空时返回 null；连续抽到已选编号（卡池几乎抽完）时返回 undefined，由调用方在剩余卡中扫描
+ */
+function pickNCardByTable(tables, cards, usedSet) {
+    if (!tables.nPool) return null;
+    const pool = getTableCards(tables, cards, 'pools', 'N');
+    const card = pickUnusedByRetry(pool, usedSet, function () { return aliasPick(tables.nPool); });
+    if (!card) return undefined;
+    return { card: card, isNR: (card.rarityVersions || ['N']).indexOf('NR') >= 0 };
+}
+
 // ============================================
 // OCG 默认方案：4N + 1非N + 多版本稀有度
 // ============================================
@@ -1304,26 +1504,31 @@ function drawCards_OCG(pack, cards) {
     // NR 卡的权重比例（相对于普通 N 卡，默认 0.2 即 20%）
     const nrWeightRatio = pack.nrWeightRatio || 0.2;
 
+    // 抽卡查找表：有则直接按下标取卡，每个卡位 O(1)，不再每包遍历整个卡池
+    const tables = getDrawTables(pack, cards, nrWeightRatio);
+
     // --- 分池逻辑 ---
     // N池：rarityVersions[0] === 'N' 的卡（NR 卡也属于 N 卡卡池，但选中概率更低）
     // 非N池按稀有度分类：{ 'R': [...], 'SR': [...], 'UR': [...] }
     const nPool = [];       // N卡池（含 NR 卡，NR 卡会被标记）
     const poolByRarity = {};  // { 'R': [...], 'SR': [...], 'UR': [...] }
 
-    cards.forEach(function (card) {
-        const code = (card.rarityVersions || ['N'])[0];
-        if (code === 'N') {
-            // 判断是否为 NR 卡：rarityVersions 中包含 'NR' 的 N 卡
-            const versions = card.rarityVersions || ['N'];
-            const isNR = versions.indexOf('NR') >= 0;
-            nPool.push({ card: card, isNR: isNR });
-        } else {
-            if (!poolByRarity[code]) {
-                poolByRarity[code] = [];
+    if (!tables) {
+        cards.forEach(function (card) {
+            const code = (card.rarityVersions || ['N'])[0];
+            if (code === 'N') {
+                // 判断是否为 NR 卡：rarityVersions 中包含 'NR' 的 N 卡
+                const versions = card.rarityVersions || ['N'];
+                const isNR = versions.indexOf('NR') >= 0;
+                nPool.push({ card: card, isNR: isNR });
+            } else {
+                if (!poolByRarity[code]) {
+                    poolByRarity[code] = [];
+                }
+                poolByRarity[code].push(card);
             }
-            poolByRarity[code].push(card);
-        }
-    });
+        });
+    }
 
     // 计算需要抽几张N卡（总数 - 1张非N位）
     const nCount = pack.cardsPerPack - 1;
@@ -1355,7 +1560,11 @@ function drawCards_OCG(pack, cards) {
     }
 
     for (let n = 0; n < nCount; n++) {
-        const picked = weightedPickFromNPool(nPool, usedSetNumbers);
+        let picked = tables ? pickNCardByTable(tables, cards, usedSetNumbers) : weightedPickFromNPool(nPool, usedSetNumbers);
+        if (picked === undefined) {
+            // 查找表连续抽到已选编号（卡池几乎抽完）：在剩余卡中按权重扫描
+            picked = weightedPickFromNPool(getTableNPool(tables, cards), usedSetNumbers);
+        }
         if (picked) {
             const setNum = picked.card.setNumber || picked.card.id;
             usedSetNumbers.add(setNum);
@@ -1370,7 +1579,7 @@ function drawCards_OCG(pack, cards) {
 
     // N池不够时兜底：从R池补充
     if (results.length < nCount) {
-        const rPool = poolByRarity['R'] || [];
+        const rPool = tables ? getTableCards(tables, cards, 'pools', 'R') : (poolByRarity['R'] || []);
         const shuffledR = shuffleArray([...rPool]);
         for (let i = 0; i < shuffledR.length && results.length < nCount; i++) {
             const card = shuffledR[i];
@@ -1420,6 +1629,9 @@ function drawCards_OCG(pack, cards) {
 
     // 查找 rarityVersions 中包含目标稀有度的所有卡
     function findCardsForTargetRarity(target) {
+        if (tables) {
+            return getTableCards(tables, cards, 'versionPools', target);
+        }
         const result = [];
         cards.forEach(function (card) {
         const versions = card.rarityVersions || ['N'];
@@ -1431,27 +1643,22 @@ function drawCards_OCG(pack, cards) {
     }
 
     const candidates = findCardsForTargetRarity(targetRarity);
-    // 过滤掉已被N位选中的编号
-    const available = candidates.filter(function(card) {
-        return !usedSetNumbers.has(card.setNumber || card.id);
-    });
+    // 跳过已被N位选中的编号
+    const available = pickUnusedUniform(candidates, usedSetNumbers);
 
-    if (available.length > 0) {
-        const picked = available[Math.floor(Math.random() * available.length)];
-        rareCard = { ...picked, rarityVersions: [targetRarity] };
+    if (available) {
+        rareCard = { ...available, rarityVersions: [targetRarity] };
     } else if (candidates.length > 0) {
         // 所有候选卡都与N位重复了，允许重复（极低概率）
         const picked = candidates[Math.floor(Math.random() * candidates.length)];
         rareCard = { ...picked, rarityVersions: [targetRarity] };
     } else {
         // 找不到目标稀有度的卡（数据问题兜底），从所有非N池中随机选
-        const allNonN = Object.values(poolByRarity).reduce(function(acc, arr) { return acc.concat(arr); }, []);
-        const fallback = allNonN.filter(function(card) {
-            return !usedSetNumbers.has(card.setNumber || card.id);
-        });
-        if (fallback.length > 0) {
-            const picked = fallback[Math.floor(Math.random() * fallback.length)];
-            rareCard = resolveCardVersion(picked, versionOdds);
+        const allNonN = tables ? getTableNonNCards(tables, cards)
+            : Object.values(poolByRarity).reduce(function(acc, arr) { return acc.concat(arr); }, []);
+        const picked = pickUnusedUniform(allNonN, usedSetNumbers);
+        if (picked) {
+            rareCard = resolveCardVersion(picked, versionOdds, tables && tables.versionAlias);
         }
     }
 
@@ -1492,6 +1699,8 @@ function drawCardsBox_OCG(pack, cards) {
     const pserChance = pack.boxPSERChance || 0.25;  // 原盒PSER概率（默认25%）
     // NR 卡的权重比例（相对于普通 N 卡，默认 0.2 即 20%）
     const nrWeightRatio = pack.nrWeightRatio || 0.2;
+    // 抽卡查找表：有则直接按下标取卡，一盒 150 张卡不再各自遍历整个卡池
+    const tables = getDrawTables(pack, cards, nrWeightRatio);
     
     // 获取多版本稀有度概率配置
     const modeConfig = getCurrentModeConfig();
@@ -1537,26 +1746,31 @@ function drawCardsBox_OCG(pack, cards) {
     const nPool = [];       // N卡池（含 NR 卡，NR 卡会被标记）
     const poolByRarity = {}; // { 'SR': [...], 'UR': [...], ... }
     
-    cards.forEach(function (card) {
-        const baseCode = (card.rarityVersions || ['N'])[0];
-        if (baseCode === 'N') {
-            // 判断是否为 NR 卡：rarityVersions 中包含 'NR' 的 N 卡
-            const versions = card.rarityVersions || ['N'];
-            const isNR = versions.indexOf('NR') >= 0;
-            nPool.push({ card: card, isNR: isNR });
-        } else {
-            if (!poolByRarity[baseCode]) {
-                poolByRarity[baseCode] = [];
+    if (!tables) {
+        cards.forEach(function (card) {
+            const baseCode = (card.rarityVersions || ['N'])[0];
+            if (baseCode === 'N') {
+                // 判断是否为 NR 卡：rarityVersions 中包含 'NR' 的 N 卡
+                const versions = card.rarityVersions || ['N'];
+                const isNR = versions.indexOf('NR') >= 0;
+                nPool.push({ card: card, isNR: isNR });
+            } else {
+                if (!poolByRarity[baseCode]) {
+                    poolByRarity[baseCode] = [];
+                }
+                poolByRarity[baseCode].push(card);
             }
-            poolByRarity[baseCode].push(card);
-        }
-    });
+        });
+    }
     
     // 构建 "可以出某种目标稀有度的卡" 的查找函数
     // 例如目标是SER → 找所有 rarityVersions 包含 SER 的卡
     // 例如目标是PSER → 找所有 rarityVersions 包含 PSER 的卡
     // 注意：NR 不在非N位出现，NR 只在 N 卡位以低概率出现
     function findCardsForTargetRarity(targetRarity) {
+        if (tables) {
+            return getTableCards(tables, cards, 'versionPools', targetRarity);
+        }
         const result = [];
         cards.forEach(function (card) {
             const versions = card.rarityVersions || ['N'];
@@ -1596,13 +1810,14 @@ function drawCardsBox_OCG(pack, cards) {
                 rareCard = { ...picked, rarityVersions: [targetRarity] };
             } else {
                 // 兜底：从对应基础稀有度池中选，走 versionOdds 随机
-                const basePool = poolByRarity[targetRarity] || [];
+                const basePool = tables ? getTableCards(tables, cards, 'pools', targetRarity) : (poolByRarity[targetRarity] || []);
                 // 如果基础池也没有，从全部非N池中随机选
                 const fallbackPool = basePool.length > 0 ? basePool : 
-                    Object.values(poolByRarity).reduce(function(acc, arr) { return acc.concat(arr); }, []);
+                    (tables ? getTableNonNCards(tables, cards)
+                        : Object.values(poolByRarity).reduce(function(acc, arr) { return acc.concat(arr); }, []));
                 if (fallbackPool.length > 0) {
                     const picked = fallbackPool[Math.floor(Math.random() * fallbackPool.length)];
-                    rareCard = resolveCardVersion(picked, versionOdds);
+                    rareCard = resolveCardVersion(picked, versionOdds, tables && tables.versionAlias);
                 }
             }
         }
@@ -1633,7 +1848,11 @@ function drawCardsBox_OCG(pack, cards) {
         
         let nDrawn = 0;
         for (let n = 0; n < nCount; n++) {
-            const picked = weightedPickFromNPoolBox(nPool, usedSetNumbers);
+            let picked = tables ? pickNCardByTable(tables, cards, usedSetNumbers) : weightedPickFromNPoolBox(nPool, usedSetNumbers);
+            if (picked === undefined) {
+                // 查找表连续抽到已选编号（卡池几乎抽完）：在剩余卡中按权重扫描
+                picked = weightedPickFromNPoolBox(getTableNPool(tables, cards), usedSetNumbers);
+            }
             if (picked) {
                 const setNum = picked.card.setNumber || picked.card.id;
                 usedSetNumbers.add(setNum);
@@ -2009,9 +2228,10 @@ function drawCardsBox_LOCH(pack, cards) {
  * 
  * @param {Object} card - 原始卡牌数据
  * @param {Object} versionOdds - 各稀有度的概率权重
+ * @param {Object} [versionAlias] - 抽卡查找表中的版本别名表（可选，权重与 versionOdds 一致时 O(1) 抽取）
  * @returns {Object} 带最终稀有度的卡牌副本
  */
-function resolveCardVersion(card, versionOdds) {
+function resolveCardVersion(card, versionOdds, versionAlias) {
     const versions = card.rarityVersions;
     const result = { ...card };
 
@@ -2020,6 +2240,13 @@ function resolveCardVersion(card, versionOdds) {
         return result;
     }
 
+    // 查找表模式：构建时的版本权重与当前 versionOdds 一致才使用
+    const table = versionAlias && versionAlias[versions.join('/')];
+    if (table && table.weights.every(function (w, i) { return w === (versionOdds[versions[i]] || 1); })) {
+        result.rarityVersions = [versions[aliasPick(table)]];
+        return result;
+    }
+
     // 收集各版本的权重
     const weights = [];
     let totalWeight = 0;
@@ -2247,9 +2474,12 @@ async function showResults(cards, bonusCards) {
             const largeUrl = card.imageLargeUrl || card.imageUrl;
             const cardName = card.nameCN || card.name;
             const foreignName = card.nameOriginal || '';
+            // 本地有派生尺寸时用 srcset（卡图高 120px，显示宽约 82px），放大查看时沿用同一 srcset
+            const srcset = card._imageMap ? getCardImageSrcset(card.id, card._imageMap, rarityCode) : '';
+            const srcsetAttr = srcset ? ` srcset="${srcset}" sizes="82px"` : '';
             // 使用 API 提供的卡图，添加 clickable 类和 data 属性供放大查看
-            imageHtml = `<img class="card-image clickable" src="${card.imageUrl}" alt="${cardName}" loading="lazy" 
-                              data-large-url="${largeUrl}" data-card-name="${cardName}" data-card-foreign="${foreignName}"
+            imageHtml = `<img class="card-image clickable" src="${card.imageUrl}"${srcsetAttr} alt="${cardName}" loading="lazy" 
+                              data-large-url="${largeUrl}" data-card-id="${card.id}" data-card-name="${cardName}" data-card-foreign="${foreignName}"
                               onerror="this.style.display='none';this.classList.remove('clickable');this.nextElementSibling.style.display='block';">
                          <span class="card-icon" style="display:none;">${getCardIcon(rarityCode)}</span>`;
         } else {
@@ -2304,8 +2534,10 @@ async function showResults(cards, bonusCards) {
                     const largeUrl = card.imageLargeUrl || card.imageUrl;
                     const cardName = card.nameCN || card.name;
                     const foreignName = card.nameOriginal || '';
-                    imageHtml = `<img class="card-image clickable" src="${card.imageUrl}" alt="${cardName}" loading="lazy" 
-                                      data-large-url="${largeUrl}" data-card-name="${cardName}" data-card-foreign="${foreignName}"
+                    const srcset = card._imageMap ? getCardImageSrcset(card.id, card._imageMap, rarityCode) : '';
+                    const srcsetAttr = srcset ? ` srcset="${srcset}" sizes="82px"` : '';
+                    imageHtml = `<img class="card-image clickable" src="${card.imageUrl}"${srcsetAttr} alt="${cardName}" loading="lazy" 
+                                      data-large-url="${largeUrl}" data-card-id="${card.id}" data-card-name="${cardName}" data-card-foreign="${foreignName}"
                                       onerror="this.style.display='none';this.classList.remove('clickable');this.nextElementSibling.style.display='block';">
                                  <span class="card-icon" style="display:none;">${getCardIcon(rarityCode)}</span>`;
                 } else {
@@ -3423,6 +3655,12 @@ async function showCardPreview(pack) {
             if (cardFileData.supplementPack) {
                 targetPack.supplementPack = cardFileData.supplementPack;
             }
+            if (cardFileData.textShard) {
+                targetPack.textShard = cardFileData.textShard;
+            }
+            if (cardFileData.drawTables) {
+                targetPack.drawTables = cardFileData.drawTables;
+            }
             console.log('📄 [预览] 已加载独立卡牌文件 [' + targetPack.cardFile + ']，共 ' + targetPack.cardIds.length + ' 张卡');
         }
 
@@ -3431,6 +3669,13 @@ async function showCardPreview(pack) {
             updateLoadingText('正在加载卡片数据... (' + loaded + '/' + total + ')');
         });
 
+        // 预览网格图集只在这里按需加载（开包流程不需要图集）
+        var previewImageMap = setData.cards.length > 0 ? setData.cards[0]._imageMap : null;
+        if (previewImageMap && previewImageMap._atlasFile) {
+            updateLoadingText('正在加载预览网格图集...');
+            await TCG_API.loadCardAtlas(previewImageMap);
+        }
+
         // 用加载到的卡片数据渲染预览（含辅助包卡片）
         hideLoadingState();
         renderCardPreview('id', setData.cards, targetPack, setData.supplementCards || []);
@@ -3465,6 +3710,7 @@ function renderCardPreview(sortBy, cards, pack, supplementCards) {
     const previewCards = cards || currentPackCards;
     const previewPack = pack || currentPack;
     const previewSupp = supplementCards || [];
+    currentPreviewCards = previewCards.concat(previewSupp);
 
     if (!previewCards || previewCards.length === 0) {
         contentEl.innerHTML = '<p style="text-align:center;color:var(--text-secondary);padding:40px 0;">暂无卡片数据</p>';
@@ -3749,9 +3995,17 @@ const rarityWeight = RARITY_ORDER_ASC;
 
         // 卡图
         let imageHtml;
-        if (card.imageUrl) {
+        const atlasStyle = card._imageMap ? getCardAtlasStyle(card.id, card._imageMap, card._expandedRarity) : '';
+        if (atlasStyle) {
+            // 预览网格图集：整个网格共用几张图集，按坐标显示对应格子
+            imageHtml = `<div class="preview-card-image preview-card-sprite ${!isOwned ? 'not-owned' : ''}" 
+                              style="${atlasStyle}" role="img" aria-label="${displayName}"></div>`;
+        } else if (card.imageUrl) {
+            // 本地有派生尺寸时用 srcset 让浏览器按网格宽度（弹窗最宽 650px、3 列）选择最小的合适图片
+            const srcset = card._imageMap ? getCardImageSrcset(card.id, card._imageMap, card._expandedRarity) : '';
+            const srcsetAttr = srcset ? ` srcset="${srcset}" sizes="(max-width: 650px) 30vw, 200px"` : '';
             imageHtml = `<img class="preview-card-image ${!isOwned ? 'not-owned' : ''}" 
-                              src="${card.imageUrl}" alt="${displayName}" loading="lazy"
+                              src="${card.imageUrl}"${srcsetAttr} alt="${displayName}" loading="lazy"
                               onerror="this.style.display='none';this.nextElementSibling.style.display='flex';">
                          <div class="preview-card-placeholder" style="display:none;">🃏</div>`;
         } else {
@@ -3969,7 +4223,10 @@ const rarityWeight = RARITY_ORDER_ASC;
                     if (!viewer) return;
                     const img = viewer.querySelector('.viewer-image');
                     const nameEl = viewer.querySelector('.viewer-card-name');
-                    if (img) img.src = imgUrl;
+                    if (img) {
+                        const srcset = card._imageMap ? getCardImageSrcset(card.id, card._imageMap, clickedRarity) : '';
+                        setViewerImageSource(img, imgUrl, srcset);
+                    }
                     if (nameEl) {
                         const displayName = card.nameCN || card.name || '';
                         const foreignName = card.nameOriginal || '';
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tools/build_release.py 发布文件筛选测试
+
+运行: python -m unittest discover tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "tools"))
+
+import build_release  # noqa: E402
+
+
+class ExcludeTest(unittest.TestCase):
+
+    def test_local_build_files_excluded(self):
+        for rel_path in ("data/common/cards.json", "data/common/cards.json.bak", "data/common/.cards_md5",
+                         "data/common/cards.zip.part", "data/common/cards.zip.part.json",
+                         "data/tcg/ygoprodeck_set_index.json", "data/tcg/yugiohmeta_failed.json",
+                         "data/tcg/yugiohmeta_map.journal.jsonl", "data/tcg/yugiohmeta_map.json.tmp",
+                         "data/ocg/images/loch/.mirror_manifest.json", "data/ocg/packs.json.bak"):
+            self.assertTrue(build_release.is_excluded(rel_path), rel_path)
+
+    def test_site_files_kept(self):
+        for rel_path in ("data/ocg/packs.json", "data/tcg/yugiohmeta_map.json", "data/common/rarities.json",
+                         "data/ocg/images/loch/atlas.json", "data/ocg/cards/text/ocg_blzd.json", "js/api.js"):
+            self.assertFalse(build_release.is_excluded(rel_path), rel_path)
+
+    def test_repo_site_files(self):
+        files = set(build_release.iter_site_files())
+        self.assertIn("index.html", files)
+        self.assertIn("data/ocg/packs.json", files)
+        self.assertFalse([f for f in files if build_release.is_excluded(f)])
+
+
+class LargeFileTest(unittest.TestCase):
+
+    def test_find_large_files(self):
+        with tempfile.TemporaryDirectory() as out_dir:
+            os.makedirs(os.path.join(out_dir, "data"))
+            for name, size in (("index.html", 10), ("data/a.webp", 300), ("data/b.json", 200)):
+                with open(os.path.join(out_dir, name), "wb") as f:
+                    f.write(b"x" * size)
+            self.assertEqual(build_release.find_large_files(out_dir, 200),
+                             [("data/a.webp", 300), ("data/b.json", 200)])
+
+
+if __name__ == "__main__":
+    unittest.main()
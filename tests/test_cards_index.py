@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+cards_index.py 索引过期检测测试
+
+索引文件头记录 cards.json 的 MD5、大小和修改时间：大小 / 修改时间一致时直接使用索引，
+不一致时重新计算 MD5。所有文件都写在临时目录，不会碰到 data/common。
+
+运行: python -m unittest discover tests
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cards_index  # noqa: E402
+
+
+def card(cid, name):
+    return {'cid': cid, 'id': 10000000 + cid, 'cn_name': name, 'text': {'desc': ''}, 'data': {}}
+
+
+class CardIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cards_path = os.path.join(self.tmp.name, 'cards.json')
+        self.index_path = os.path.join(self.tmp.name, 'cards.idx')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_cards(self, *names, mtime_ns=None):
+        data = {str(i + 1): card(i + 1, name) for i, name in enumerate(names)}
+        with open(self.cards_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        if mtime_ns is not None:
+            os.utime(self.cards_path, ns=(mtime_ns, mtime_ns))
+
+    def open_index(self):
+        return cards_index.open_index(self.cards_path, self.index_path)
+
+    def test_missing_cards_json(self):
+        self.assertIsNone(cards_index.get_cards_md5(self.cards_path, self.index_path))
+        self.assertIsNone(self.open_index())
+
+    def test_unchanged_file_skips_md5(self):
+        self.write_cards('甲', '乙')
+        with self.open_index() as index:
+            self.assertEqual(len(index), 2)
+        with mock.patch.object(cards_index, 'compute_file_md5') as compute:
+            with self.open_index() as index:
+                self.assertEqual(index.get_by_id(10000001)['cn_name'], '甲')
+            self.assertEqual(cards_index.get_cards_md5(self.cards_path, self.index_path), index.md5)
+        compute.assert_not_called()
+
+    def test_changed_file_rebuilds(self):
+        # 内容变了但大小相同：修改时间不同，重新计算 MD5 后重建
+        self.write_cards('甲', '乙', mtime_ns=1_000_000_000)
+        self.open_index().close()
+        self.write_cards('丙', '乙', mtime_ns=2_000_000_000)
+        with open(self.cards_path, 'rb') as f:
+            expected = hashlib.md5(f.read()).hexdigest()
+        self.assertEqual(cards_index.get_cards_md5(self.cards_path, self.index_path), expected)
+        with self.open_index() as index:
+            self.assertEqual(index.md5, expected)
+            self.assertEqual(index.get_by_id(10000001)['cn_name'], '丙')
+
+    def test_touched_file_updates_header(self):
+        # 内容没变、只有修改时间变了：不重建，只更新文件头中的记录
+        self.write_cards('甲', mtime_ns=1_000_000_000)
+        self.open_index().close()
+        os.utime(self.cards_path, ns=(3_000_000_000, 3_000_000_000))
+        with mock.patch.object(cards_index, 'build_index') as build:
+            with self.open_index() as index:
+                self.assertEqual(index.source_stat, cards_index.get_source_stat(self.cards_path))
+        build.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+fetch_packs.py 页面解析测试（tests/fixtures/ygocdb/ 中的列表页与 BLZD 详情页）
+
+运行: python -m unittest discover tests
+"""
+
+import json
+import os
+import sys
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(ROOT_DIR, "tests", "fixtures", "ygocdb")
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "tools"))
+
+import bench_pack_parser  # noqa: E402
+import fetch_packs  # noqa: E402
+
+
+def read(name):
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def load_json(*parts):
+    with open(os.path.join(ROOT_DIR, "data", *parts), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class PackListTest(unittest.TestCase):
+
+    def setUp(self):
+        self.html = read("packs.html")
+
+    def test_same_as_regex_parser(self):
+        for region in ("ocg", "tcg"):
+            self.assertEqual(fetch_packs.parse_pack_list(self.html, region),
+                             bench_pack_parser.regex_parse_pack_list(self.html, region))
+
+    def test_matches_pack_list(self):
+        for region in ("ocg", "tcg"):
+            expected = [(p["ygocdbId"], p["packCode"], p["cardCount"])
+                        for p in load_json(region, "pack_list.json")["packs"]]
+            packs = fetch_packs.parse_pack_list(self.html, region)
+            self.assertEqual([(p["packId"], p["packCode"], p["cardCount"]) for p in packs], expected)
+
+    def test_both_regions(self):
+        packs = list(fetch_packs.iter_pack_list(self.html, None))
+        self.assertEqual({p["region"] for p in packs}, {"ocg", "tcg"})
+
+
+class PackCardsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.html = read("pack_1000009559000.html")
+
+    def test_same_as_regex_parser(self):
+        self.assertEqual(fetch_packs.parse_pack_cards(self.html),
+                         bench_pack_parser.regex_parse_pack_cards(self.html))
+
+    def test_matches_pack_cards(self):
+        cards = fetch_packs.parse_pack_cards(self.html)
+        expected = load_json("ocg", "cards", "ocg_blzd.json")["cardIds"]
+        self.assertEqual([c["id"] for c in cards], [e["id"] for e in expected])
+
+    def test_only_card_elements(self):
+        # 只从对应元素取字段，卡名 / 效果文本中的其它内容不影响解析结果
+        html = ('<div class="row card result"><a href="/card/123"><img></a>'
+                '<h2><span lang="zh-Hans">SR</span></h2><h3><span lang="ja-Jpan">HERO</span></h3>'
+                '<h3>BLZD-JP999</h3><span class="cid text-muted">456</span>'
+                '<p>UR</p><div class="desc">GMR-OF SER</div></div>')
+        self.assertEqual(fetch_packs.parse_pack_cards(html),
+                         [{"id": 123, "name_cn": "SR", "name_jp": "HERO", "cid": 456}])
+
+
+if __name__ == "__main__":
+    unittest.main()
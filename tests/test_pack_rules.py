@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tools/pack_rules.py 共用规则测试（卡位展开、卡池分组、结果计数）
+
+运行: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "tools"))
+
+import pack_rules  # noqa: E402
+
+
+class SlotTest(unittest.TestCase):
+
+    def test_slot_count(self):
+        self.assertEqual([pack_rules.slot_count(v) for v in (3, 2.5, 0, -1, "3", True, None)],
+                         [3, 3, 0, 0, 0, 0, 0])
+
+    def test_box_slots(self):
+        dist = {"_说明": "x", "R": 2, "SER": 1, "XYZ": 5}
+        self.assertEqual(pack_rules.box_slots(dist, pack_rules.OCG_BOX_SLOT_KEYS), ["SER", "R", "R"])
+
+    def test_format_odds(self):
+        self.assertEqual(pack_rules.format_odds(1 / 2160), "≈1/2,160")
+        self.assertEqual(pack_rules.format_odds(0.5), "")
+
+
+class CardPoolsTest(unittest.TestCase):
+
+    def setUp(self):
+        config = pack_rules.load_ocg_config()
+        self.pools = pack_rules.CardPools(pack_rules.find_pack(config, "ocg_loch"), config)
+
+    def test_pools_match_cards(self):
+        pools = self.pools
+        for rarity, members in pools.base_pools.items():
+            self.assertEqual(members, [i for i, c in enumerate(pools.cards) if c["rarityVersions"][0] == rarity])
+        for rarity, members in pools.version_pools.items():
+            self.assertEqual(members, [i for i, c in enumerate(pools.cards) if rarity in c["rarityVersions"]])
+        self.assertEqual(pools.candidates("XYZ"), [])
+
+    def test_box_size(self):
+        self.assertEqual(self.pools.box_size(), len(self.pools.box_slots()))
+        self.assertEqual(self.pools.box_size(), self.pools.rules["packsPerBox"])
+
+
+class TallyTest(unittest.TestCase):
+
+    def test_add_and_merge(self):
+        tally = pack_rules.Tally()
+        tally.add([(0, "SR"), (1, "SR"), (2, "UR")], bonus=(0, "PSER"))
+        tally.add([(0, "SR")])
+        tally.merge(2, {"0:SR": 1}, {"SR": {0: 1, 1: 1}})
+        self.assertEqual(tally.units, 4)
+        self.assertEqual(tally.moments("SR"), (4, 6, 3, 0, 2))
+        self.assertEqual(tally.moments("UR"), (1, 1, 1, 0, 1))
+        self.assertEqual(sorted(tally.card_items()), [(0, "PSER", True, 1), (0, "SR", False, 3),
+                                                      (1, "SR", False, 1), (2, "UR", False, 1)])
+        self.assertEqual(tally.to_dict()["histogram"]["SR"], {"0": 1, "1": 2, "2": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+update_cards_db.py 下载 / 断点续传测试
+
+在本地起一个 http.server 提供 cards.zip（支持 Range / If-Range），
+模拟下载到一半断开连接，检查重新运行后续传得到的文件与源文件逐字节一致。
+所有文件都写在临时目录，不会碰到 data/common。
+
+运行: python -m unittest discover tests
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import update_cards_db  # noqa: E402
+
+
+def make_cards_json(count):
+    """生成 count 张卡的 cards.json 内容（字段与百鸽数据一致，文本不重复以免被压缩得太小）"""
+    cards = {}
+    for cid in range(1, count + 1):
+        cards[str(cid)] = {
+            'cid': cid,
+            'id': 10000000 + cid,
+            'cn_name': f'测试卡{cid}',
+            'jp_name': f'テストカード{cid}',
+            'text': {'types': '[怪兽|效果]', 'desc': hashlib.sha256(str(cid).encode()).hexdigest() * 4},
+            'data': {'atk': cid % 5000, 'def': cid % 3000, 'level': cid % 12 + 1},
+        }
+    return json.dumps(cards, ensure_ascii=False).encode('utf-8')
+
+
+def make_zip(cards_json):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_STORED) as zf:
+        zf.writestr('cards.json', cards_json)
+    return buf.getvalue()
+
+
+class ZipHandler(BaseHTTPRequestHandler):
+    """
+    提供 server.payload 的简易服务器：
+    - Range + If-Range 与当前 ETag 一致时返回 206，不一致时返回完整文件 200
+    - Range 起点超出文件大小时返回 416
+    - server.cut_after 不为 None 时，完整响应只发送前 cut_after 字节就断开（只生效一次）
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        payload = server.payload
+        server.requests.append(dict(self.headers))
+
+        start = 0
+        range_header = self.headers.get('Range')
+        if range_header and self.headers.get('If-Range') == server.etag:
+            start = int(range_header.split('=')[1].rstrip('-'))
+            if start >= len(payload):
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(payload)}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{len(payload) - 1}/{len(payload)}')
+        else:
+            self.send_response(200)
+
+        body = payload[start:]
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', server.etag)
+        self.end_headers()
+
+        if server.cut_after is not None:
+            cut, server.cut_after = server.cut_after, None
+            self.wfile.write(body[:cut])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+class DownloadResumeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest_dir = self.tmp.name
+        self.cards_json = make_cards_json(2000)
+        self.payload = make_zip(self.cards_json)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), ZipHandler)
+        self.server.payload = self.payload
+        self.server.etag = '"v1"'
+        self.server.cut_after = None
+        self.server.requests = []
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/cards.zip'
+        self.part_path = os.path.join(self.dest_dir, 'cards.zip.part')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def quiet(self, func, *args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(*args, **kwargs)
+
+    def read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_resume_after_interrupted_download(self):
+        cut = len(self.payload) // 3
+        self.server.cut_after = cut
+
+        self.assertIsNone(self.quiet(update_cards_db.download_zip, self.url, self.part_path))
+        self.assertEqual(self.read(self.part_path), self.payload[:cut])
+
+        zip_md5 = self.quiet(update_cards_db.download_zip, self.url, self.part_path)
+        self.assertEqual(self.server.requests[-1].get('Range'), f'bytes={cut}-')
+        self.assertEqual(self.server.requests[-1].get('If-Range'), '"v1"')
+        self.assertEqual(self.read(self.part_path), self.payload)
+        self.assertEqual(zip_md5, hashlib.md5(self.payload).hexdigest())
+
+    def test_remote_changed_restarts_download(self):
+        self.server.cut_after = len(self.payload) // 2
+        self.assertIsNone(self.quiet(update_cards_db.download_zip, self.url, self.part_path))
+
+        # 远程文件更新：ETag 不再匹配，If-Range 让服务器返回完整的新文件
+        new_payload = make_zip(make_cards_json(1500))
+        self.server.payload = new_payload
+        self.server.etag = '"v2"'
+
+        zip_md5 = self.quiet(update_cards_db.download_zip, self.url, self.part_path)
+        self.assertEqual(self.read(self.part_path), new_payload)
+        self.assertEqual(zip_md5, hashlib.md5(new_payload).hexdigest())
+
+    def test_complete_part_uses_416(self):
+        self.assertEqual(self.quiet(update_cards_db.download_zip, self.url, self.part_path),
+                         hashlib.md5(self.payload).hexdigest())
+
+        # 上次其实已经下载完整（只是没来得及解压）：续传请求得到 416，直接使用已有文件
+        zip_md5 = self.quiet(update_cards_db.download_zip, self.url, self.part_path)
+        self.assertEqual(self.server.requests[-1].get('Range'), f'bytes={len(self.payload)}-')
+        self.assertEqual(zip_md5, hashlib.md5(self.payload).hexdigest())
+        self.assertEqual(self.read(self.part_path), self.payload)
+
+    def test_download_and_extract_into_dest_dir(self):
+        self.server.cut_after = len(self.payload) // 2
+        ok, _, _ = self.quiet(update_cards_db.download_and_extract, self.url, self.dest_dir)
+        self.assertFalse(ok)
+        self.assertTrue(os.path.exists(self.part_path))
+
+        ok, new_md5, diff_path = self.quiet(update_cards_db.download_and_extract, self.url, self.dest_dir)
+        self.assertTrue(ok)
+        self.assertIsNone(diff_path)
+        cards_path = os.path.join(self.dest_dir, 'cards.json')
+        self.assertEqual(self.read(cards_path), self.cards_json)
+        self.assertEqual(new_md5, hashlib.md5(self.cards_json).hexdigest())
+        self.assertEqual(self.read(os.path.join(self.dest_dir, '.cards_md5')).decode(), new_md5)
+        self.assertTrue(os.path.exists(os.path.join(self.dest_dir, 'cards.idx')))
+        self.assertFalse(os.path.exists(self.part_path))
+
+        # 第二次更新：旧 cards.json 存在，生成差异记录并保留备份
+        self.server.payload = make_zip(make_cards_json(1999))
+        self.server.etag = '"v2"'
+        ok, _, diff_path = self.quiet(update_cards_db.download_and_extract, self.url, self.dest_dir)
+        self.assertTrue(ok)
+        self.assertEqual(os.path.dirname(diff_path), os.path.join(self.dest_dir, 'diffs'))
+        with open(diff_path, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['summary'], {'added': 0, 'removed': 1, 'changed': 0})
+        self.assertEqual(self.read(cards_path + '.bak'), self.cards_json)
+
+
+if __name__ == '__main__':
+    unittest.main()
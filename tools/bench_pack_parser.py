@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+YGOCDB 页面解析基准测试
+对比 fetch_packs.py 的单遍扫描解析（合并正则标记扫描 + 状态机，不是 HTMLParser）与原先的正则解析：
+耗时、解析结果是否一致。
+
+页面来源（按优先级）：
+  1. 命令行传入的已保存页面（.html 文件）
+  2. .http_cache/ 中缓存的 ygocdb.com/packs 与 /pack/{id} 页面（运行过 fetch_packs.py 后即有）
+  3. tests/fixtures/ygocdb/ 中的测试页面（列表页 + BLZD 详情页，--fixtures 时强制使用）
+  4. --synthetic：按 YGOCDB 页面结构生成的模拟页面
+
+用法：
+  cd YGOCardGame
+  python tools/bench_pack_parser.py
+  python tools/bench_pack_parser.py packs.html pack_blzd.html --repeat 20
+  python tools/bench_pack_parser.py --fixtures
+  python tools/bench_pack_parser.py --synthetic
+  python tools/bench_pack_parser.py --save-fixtures   # 把 .http_cache/ 中的列表页和一个详情页保存为测试页面
+"""
+
+import gc
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import fetch_packs
+from fetcher import CACHE_DIR, HttpCache
+
+DEFAULT_REPEAT = 10
+BATCH_SECONDS = 0.05     # 每次计时至少连续运行的时长（单页耗时不到 1ms，单次计时误差太大）
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests", "fixtures", "ygocdb")
+SYNTHETIC_PACKS = 1500   # 模拟列表页的卡包条目数
+SYNTHETIC_CARDS = 120    # 模拟详情页的卡牌数
+
+
+# ===== 原正则解析（基准，保持与替换前的 fetch_packs.py 一致） =====
+
+def regex_parse_pack_list(html, region="ocg"):
+    if region == "ocg":
+        match = re.search(r'id="ocg">(.*?)(?=<div[^>]*id="tcg")', html, re.DOTALL)
+    else:
+        match = re.search(r'id="tcg">(.*?)(?=</div>\s*</div>\s*</div>\s*$|$)', html, re.DOTALL)
+    if not match:
+        return []
+    pack_pattern = re.compile(
+        r'<li\s+class="pack">\s*'
+        r'<span>([^<]*)</span>\s*'
+        r'<span>([^<]*)</span>\s*'
+        r'<span>([^<]*)</span>\s*'
+        r'<a\s+href="/pack/(\d+)"[^>]*>'
+        r'([^<]*)</a>',
+        re.DOTALL
+    )
+    packs = []
+    for m in pack_pattern.finditer(match.group(1)):
+        card_count = m.group(3).strip()
+        packs.append({
+            "packId": m.group(4).strip(),
+            "packCode": m.group(2).strip(),
+            "packName": m.group(5).strip(),
+            "releaseDate": m.group(1).strip(),
+            "cardCount": int(card_count) if card_count.isdigit() else 0
+        })
+    return packs
+
+
+def regex_parse_pack_cards(html):
+    cards = []
+    for block in re.split(r'<div\s+class="row card result">', html)[1:]:
+        pwd_match = re.search(r'<a\s+href="/card/(\d+)"', block)
+        if not pwd_match:
+            continue
+        cn_match = re.search(r'<span\s+lang="zh-Hans">([^<]*)</span>', block)
+        jp_match = re.search(r'<span\s+lang="ja-Jpan">([^<]*)</span>', block)
+        cid_match = re.search(r'<span\s+class="cid text-muted">(\d+)</span>', block)
+        cards.append({
+            "id": int(pwd_match.group(1)),
+            "name_cn": cn_match.group(1).strip() if cn_match else "",
+            "name_jp": jp_match.group(1).strip() if jp_match else "",
+            "cid": int(cid_match.group(1)) if cid_match else 0,
+        })
+    return cards
+
+
+# ===== 页面来源 =====
+
+def is_list_page(html):
+    return 'class="pack"' in html
+
+
+def load_saved_pages(paths):
+    pages = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def load_fixture_pages():
+    paths = sorted(os.path.join(FIXTURES_DIR, name) for name in os.listdir(FIXTURES_DIR) if name.endswith(".html"))
+    return load_saved_pages(paths)
+
+
+def save_fixtures():
+    """把 .http_cache/ 中的 /packs 列表页和第一个 /pack/{id} 详情页写入 tests/fixtures/ygocdb/"""
+    saved = 0
+    have_detail = False
+    for url, html in load_cached_pages():
+        if is_list_page(html):
+            name = "packs.html"
+        elif have_detail:
+            continue
+        else:
+            name = f"pack_{url.rsplit('/', 1)[-1]}.html"
+            have_detail = True
+        with open(os.path.join(FIXTURES_DIR, name), "w", encoding="utf-8") as f:
+            f.write(html)
+        print(f"💾 {url} → tests/fixtures/ygocdb/{name}")
+        saved += 1
+    if not saved:
+        print("⚠️ .http_cache/ 中没有 YGOCDB 页面，请先运行 fetch_packs.py list ocg 和 fetch_packs.py fetch <packId>")
+
+
+def load_cached_pages():
+    """从 .http_cache/ 中取出 ygocdb.com 的列表页和详情页"""
+    pages = []
+    if not os.path.isdir(CACHE_DIR):
+        return pages
+    cache = HttpCache()
+    prefix = f"{fetch_packs.YGOCDB_BASE}/pack"
+    for name in sorted(os.listdir(CACHE_DIR)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(CACHE_DIR, name), "r", encoding="utf-8") as f:
+                url = json.load(f).get("url", "")
+        except (OSError, ValueError):
+            continue
+        if not url.startswith(prefix):
+            continue
+        cached = cache.lookup(url)
+        if cached:
+            pages.append((url, cached[1].decode("utf-8", "replace")))
+    return pages
+
+
+def synthetic_pages():
+    """按 YGOCDB 页面结构生成模拟的列表页和详情页"""
+    def li(i):
+        return (f'<li class="pack">\n  <span>2025-{i % 12 + 1:02d}-01</span><span>P{i:03d}</span>'
+                f'<span>{60 + i % 40}</span>\n  <a href="/pack/{1000000000000 + i}">パック {i} [PACK {i}]</a>\n</li>\n')
+    half = SYNTHETIC_PACKS // 2
+    list_html = ('<html><body><div class="container"><div class="tab" id="ocg"><ul>'
+                 + "".join(li(i) for i in range(half))
+                 + '</ul></div><div class="tab" id="tcg"><ul>'
+                 + "".join(li(i) for i in range(half, SYNTHETIC_PACKS))
+                 + '</ul></div></div></body></html>')
+
+    def card(i):
+        return (f'<div class="row card result"><div class="col-md-3"><a href="/card/{10000000 + i}">'
+                f'<img src="/pics/{10000000 + i}.jpg"></a></div><div class="col-md-9">'
+                f'<h2><span lang="zh-Hans">卡牌{i}</span></h2><h3><span lang="ja-Jpan">カード{i}</span></h3>'
+                f'<span class="cid text-muted">{20000 + i}</span><div class="desc">' + "效果文本。" * 40
+                + '</div></div></div>\n')
+    detail_html = ('<html><body><div class="container">'
+                   + "".join(card(i) for i in range(SYNTHETIC_CARDS))
+                   + '</div></body></html>')
+    return [("synthetic /packs", list_html), ("synthetic /pack", detail_html)]
+
+
+# ===== 基准测试 =====
+
+def best_time(func, repeat):
+    """
+    返回 (单次最快耗时, 结果)：每次计时连续运行 func 至少 BATCH_SECONDS 秒取平均，
+    共 repeat 次取最快值；计时期间关闭 GC（与 timeit 一致）
+    """
+    result = func()
+    start = time.perf_counter()
+    func()
+    number = max(1, int(BATCH_SECONDS / max(time.perf_counter() - start, 1e-9)))
+    best = None
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            elapsed = (time.perf_counter() - start) / number
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return best, result
+
+
+def bench_page(label, html, repeat):
+    if is_list_page(html):
+        def regex_func():
+            return regex_parse_pack_list(html, "ocg") + regex_parse_pack_list(html, "tcg")
+
+        def stream_func():
+            return fetch_packs.parse_pack_list(html, "ocg") + fetch_packs.parse_pack_list(html, "tcg")
+    else:
+        def regex_func():
+            return regex_parse_pack_cards(html)
+
+        def stream_func():
+            return fetch_packs.parse_pack_cards(html)
+
+    regex_time, regex_result = best_time(regex_func, repeat)
+    stream_time, stream_result = best_time(stream_func, repeat)
+    same = stream_result == regex_result
+
+    print(f"  {label}")
+    print(f"    大小 {len(html) / 1024:.0f} KB | 记录 {len(stream_result)} 条 | 结果一致: {'✅' if same else '❌'}")
+    print(f"    正则: {regex_time * 1000:8.2f} ms")
+    print(f"    单遍: {stream_time * 1000:8.2f} ms  ({regex_time / stream_time:.2f}x)")
+    return same, regex_time / stream_time
+
+
+def main():
+    args = sys.argv[1:]
+    repeat = DEFAULT_REPEAT
+    if "--repeat" in args:
+        idx = args.index("--repeat")
+        repeat = int(args[idx + 1])
+        del args[idx:idx + 2]
+    if "--save-fixtures" in args:
+        save_fixtures()
+        return
+    paths = [a for a in args if not a.startswith("--")]
+
+    if paths:
+        pages = load_saved_pages(paths)
+    elif "--synthetic" in args:
+        pages = synthetic_pages()
+    elif "--fixtures" in args:
+        pages = load_fixture_pages()
+    else:
+        pages = load_cached_pages()
+        if not pages:
+            print("💡 .http_cache/ 中没有 YGOCDB 页面，改用 tests/fixtures/ygocdb/ 中的测试页面（可先运行 fetch_packs.py 或传入已保存的 .html 文件）")
+            pages = load_fixture_pages()
+
+    print(f"⏱️ YGOCDB 页面解析基准（每项取 {repeat} 次中的最快值）\n")
+    all_same = True
+    slower = []
+    for label, html in pages:
+        same, speedup = bench_page(label, html, repeat)
+        all_same = all_same and same
+        if speedup < 1:
+            slower.append(label)
+    if slower:
+        print(f"\n⚠️ 以下页面单遍解析比正则慢: {', '.join(slower)}")
+    if not all_same:
+        print("\n⚠️ 有页面的解析结果与正则版本不一致，请检查页面结构是否变化")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+卡包预览网格图集（sprite sheet）构建工具
+把卡包 localImagesDir 中的 _w200 小图拼接成一张或几张图集 atlas_{n}.webp，
+并生成坐标表 atlas.json（密码 + 稀有度 → 图集编号、列、行）。
+前端打开卡包时只需加载几张图集即可画出整个预览网格，不再逐张请求 80+ 张小图。
+
+build_pack_data.py 构建卡包时会自动调用本工具（未安装 Pillow 时跳过）。
+
+【依赖】
+  需要 Pillow（pip install Pillow）
+
+【输出】
+  {localImagesDir}/atlas_0.webp, atlas_1.webp ...  每张最多 ATLAS_COLUMNS × ATLAS_MAX_ROWS 个卡图
+  {localImagesDir}/atlas.json                       坐标表，卡图映射表中的 "atlas" 字段指向它
+
+用法：
+  cd YGOCardGame
+  python tools/build_image_atlas.py               # 所有配置了本地图片的卡包
+  python tools/build_image_atlas.py ocg_loch      # 只处理指定卡包
+  python tools/build_image_atlas.py --force       # 源图没有变化也重新生成
+"""
+
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import mirror_images
+from mirror_images import ROOT_DIR, IMAGE_MAP_DIR
+
+# 配置
+TILE_SIZE = "_w200"
+TILE_WIDTH = 200
+TILE_HEIGHT = 292                # yugiohmeta _w200 卡图的标准尺寸（少数为 291，缩放到统一尺寸）
+ATLAS_COLUMNS = 10
+ATLAS_MAX_ROWS = 10              # 单张图集 2000×2920，低于移动端浏览器的纹理尺寸限制
+ATLAS_QUALITY = 75               # 图集总大小必须小于拼进去的小图之和，否则不如逐张加载
+ATLAS_METHOD = 6                 # WebP 压缩力度（0~6），越大越慢但文件越小
+ATLAS_INDEX_NAME = "atlas.json"
+ATLAS_DEFAULT_KEY = "default"    # 没有稀有度替代卡图时使用的键
+
+
+def collect_tiles(map_path):
+    """
+    读取卡图映射表，返回 (按首次出现顺序去重的 metaId 列表, {密码: {稀有度或 default: metaId}})
+    """
+    with open(map_path, "r", encoding="utf-8") as f:
+        cards = json.load(f).get("cards", {})
+    meta_ids = []
+    seen = set()
+    card_keys = {}
+
+    def add(meta_id):
+        if meta_id not in seen:
+            seen.add(meta_id)
+            meta_ids.append(meta_id)
+
+    for password, info in cards.items():
+        if not info.get("metaId"):
+            continue
+        add(info["metaId"])
+        keys = {ATLAS_DEFAULT_KEY: info["metaId"]}
+        for rarity, alt_id in (info.get("altMetaId") or {}).items():
+            if alt_id and alt_id != info["metaId"]:
+                add(alt_id)
+                keys[rarity] = alt_id
+        card_keys[password] = keys
+    return meta_ids, card_keys
+
+
+def source_hash(meta_ids, mirror_files):
+    """图集输入的指纹：卡图顺序 + 每张小图的内容哈希 + 布局参数"""
+    h = hashlib.sha256(f"{TILE_WIDTH}x{TILE_HEIGHT}/{ATLAS_COLUMNS}x{ATLAS_MAX_ROWS}/q{ATLAS_QUALITY}m{ATLAS_METHOD}".encode())
+    for meta_id in meta_ids:
+        entry = mirror_files.get(f"{meta_id}{TILE_SIZE}.webp") or {}
+        h.update(f"\n{meta_id}:{entry.get('sha256', '')}".encode())
+    return h.hexdigest()
+
+
+def is_atlas_current(image_dir, fingerprint):
+    path = os.path.join(image_dir, ATLAS_INDEX_NAME)
+    if not os.path.exists(path):
+        return False
+    with open(path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    if index.get("sourceHash") != fingerprint:
+        return False
+    return all(os.path.exists(os.path.join(image_dir, sheet["file"])) for sheet in index.get("sheets", []))
+
+
+def render_sheets(image_dir, meta_ids, mirror_files):
+    """
+    按顺序把小图贴到图集上，返回 (图集信息列表, {metaId: [图集编号, 列, 行]}, 缺失的 metaId 列表, 小图总字节数)
+    """
+    per_sheet = ATLAS_COLUMNS * ATLAS_MAX_ROWS
+    available = []
+    missing = []
+    for meta_id in meta_ids:
+        path = mirror_images.local_image_path(image_dir, f"{meta_id}{TILE_SIZE}.webp", mirror_files)
+        if path:
+            available.append((meta_id, path))
+        else:
+            missing.append(meta_id)
+
+    sheets = []
+    positions = {}
+    for sheet_idx, start in enumerate(range(0, len(available), per_sheet)):
+        chunk = available[start:start + per_sheet]
+        rows = (len(chunk) + ATLAS_COLUMNS - 1) // ATLAS_COLUMNS
+        columns = min(len(chunk), ATLAS_COLUMNS)
+        sheet = Image.new("RGB", (columns * TILE_WIDTH, rows * TILE_HEIGHT))
+        for i, (meta_id, path) in enumerate(chunk):
+            col, row = i % ATLAS_COLUMNS, i // ATLAS_COLUMNS
+            with Image.open(path) as tile:
+                tile = tile.convert("RGB")
+                if tile.size != (TILE_WIDTH, TILE_HEIGHT):
+                    tile = tile.resize((TILE_WIDTH, TILE_HEIGHT), Image.LANCZOS)
+                sheet.paste(tile, (col * TILE_WIDTH, row * TILE_HEIGHT))
+            positions[meta_id] = [sheet_idx, col, row]
+
+        filename = f"atlas_{sheet_idx}.webp"
+        out_path = os.path.join(image_dir, filename)
+        sheet.save(out_path + ".part", "WEBP", quality=ATLAS_QUALITY, method=ATLAS_METHOD)
+        os.replace(out_path + ".part", out_path)
+        sheets.append({"file": filename, "columns": columns, "rows": rows, "size": os.path.getsize(out_path)})
+    source_bytes = sum(os.path.getsize(path) for _, path in available)
+    return sheets, positions, missing, source_bytes
+
+
+def remove_stale_sheets(image_dir, sheet_count):
+    """删除卡图减少后多余的旧图集"""
+    for name in os.listdir(image_dir):
+        if name.startswith("atlas_") and name.endswith(".webp"):
+            idx = name[len("atlas_"):-len(".webp")]
+            if idx.isdigit() and int(idx) >= sheet_count:
+                os.remove(os.path.join(image_dir, name))
+
+
+def link_atlas_in_image_map(map_path):
+    """在卡图映射表中写入 "atlas" 字段（相对于 localImagesDir），前端据此加载坐标表"""
+    with open(map_path, "r", encoding="utf-8") as f:
+        text = f.read()
+    map_data = json.loads(text)
+    if map_data.get("atlas") == ATLAS_INDEX_NAME:
+        return False
+    map_data["atlas"] = ATLAS_INDEX_NAME
+    with open(map_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(map_data, ensure_ascii=False, indent=2))
+        if text.endswith("\n"):
+            f.write("\n")
+    return True
+
+
+def build_pack_atlas(pack, force=False):
+    """
+    为一个卡包生成图集和坐标表
+    返回 (状态, 说明)，状态为 "built" / "skipped" / "failed"
+    """
+    map_path = os.path.join(IMAGE_MAP_DIR, pack["imageMapFile"])
+    image_dir = os.path.join(ROOT_DIR, pack["localImagesDir"])
+    if not os.path.isdir(image_dir):
+        return "failed", f"本地图片目录不存在 {pack['localImagesDir']}（先运行 tools/mirror_images.py）"
+
+    meta_ids, card_keys = collect_tiles(map_path)
+    mirror_files = mirror_images.load_manifest(image_dir)["files"]
+    fingerprint = source_hash(meta_ids, mirror_files)
+    if not force and is_atlas_current(image_dir, fingerprint):
+        link_atlas_in_image_map(map_path)
+        return "skipped", "源图未变化"
+
+    sheets, positions, missing, source_bytes = render_sheets(image_dir, meta_ids, mirror_files)
+    remove_stale_sheets(image_dir, len(sheets))
+
+    cards = {}
+    for password, keys in card_keys.items():
+        entry = {key: positions[meta_id] for key, meta_id in keys.items() if meta_id in positions}
+        if ATLAS_DEFAULT_KEY in entry:
+            cards[password] = entry
+
+    index = {
+        "_说明": f"{pack['packId']} 预览网格图集坐标表（tools/build_image_atlas.py 自动生成）—— 密码 → 稀有度 → [图集编号, 列, 行]，"
+                 f"default 为默认卡图",
+        "_更新时间": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "sourceHash": fingerprint,
+        "tile": [TILE_WIDTH, TILE_HEIGHT],
+        "sheets": sheets,
+        "cards": cards,
+    }
+    index_path = os.path.join(image_dir, ATLAS_INDEX_NAME)
+    with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        f.write("\n")
+    os.replace(index_path + ".tmp", index_path)
+    link_atlas_in_image_map(map_path)
+
+    total_bytes = sum(sheet["size"] for sheet in sheets)
+    note = (f"{len(positions)} 张卡图（{source_bytes / 1024:.0f} KB）→ {len(sheets)} 张图集"
+            f"（{total_bytes / 1024:.0f} KB）")
+    if total_bytes >= source_bytes:
+        note += "，⚠️ 图集不比小图小，请降低 ATLAS_QUALITY"
+    if missing:
+        note += f"，⚠️ 缺失小图 {len(missing)} 张（先运行 tools/mirror_images.py）"
+    return "built", note
+
+
+def build_atlases(packs, force=False):
+    """为多个卡包生成图集（build_pack_data.py 调用）；未安装 Pillow 时只打印提示"""
+    if Image is None:
+        print("   💡 未安装 Pillow，跳过预览网格图集（pip install Pillow 后重新构建即可生成）")
+        return
+    for pack in packs:
+        status, note = build_pack_atlas(pack, force)
+        icon = {"built": "✅", "skipped": "⏭️", "failed": "❌"}[status]
+        print(f"   {icon} {pack['packId']}: {note}")
+
+
+def main():
+    args = sys.argv[1:]
+    force = "--force" in args
+    pack_ids = [a for a in args if not a.startswith("--")]
+
+    if Image is None:
+        print("❌ 需要 Pillow：pip install Pillow")
+        sys.exit(1)
+
+    packs = mirror_images.load_mirror_packs(pack_ids)
+    if not packs:
+        print("⚠️ 没有找到同时配置了 imageMapFile 和 localImagesDir 的卡包")
+        return
+
+    print(f"🧩 构建预览网格图集：{len(packs)} 个卡包，每张图集 {ATLAS_COLUMNS}×{ATLAS_MAX_ROWS} 格")
+    build_atlases(packs, force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+卡图派生尺寸生成工具
+tools/mirror_images.py 只镜像 _w200（小图）和 _w420（大图），其余尺寸仍需访问 S3 CDN。
+本脚本以本地的 _w420 原图为源，用进程池并行生成其余宽度（w100 / w140 / w260 / w360）的 webp，
+写入同一个卡包图片目录，并在卡图映射表中记录本地可用的尺寸，
+前端预览网格（没有图集时）据此用 srcset 让浏览器选择最合适的图片。
+
+【依赖】
+  需要 Pillow（pip install Pillow）
+
+用法：
+  cd YGOCardGame
+  python tools/build_image_derivatives.py                 # 所有配置了本地图片的卡包
+  python tools/build_image_derivatives.py ocg_loch        # 只处理指定卡包
+  python tools/build_image_derivatives.py --jobs 4        # 进程数（默认 CPU 核数）
+  python tools/build_image_derivatives.py --force         # 忽略已有文件，全部重新生成
+"""
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import mirror_images
+from mirror_images import ROOT_DIR, IMAGE_MAP_DIR, SIZES
+
+# 配置
+SOURCE_SIZE = "_w420"            # 派生图的源图（镜像的最大尺寸）
+DERIVED_WIDTHS = [100, 140, 260, 360]
+WEBP_QUALITY = 80
+
+
+def plan_targets(image_dir, meta_id):
+    """一张源图需要生成的文件：[(输出路径, 宽度, 格式, 质量)]"""
+    return [(os.path.join(image_dir, f"{meta_id}_w{width}.webp"), width, "WEBP", WEBP_QUALITY)
+            for width in DERIVED_WIDTHS]
+
+
+def is_fresh(out_path, source_path):
+    try:
+        return os.path.getmtime(out_path) >= os.path.getmtime(source_path)
+    except OSError:
+        return False
+
+
+def render_derivatives(job):
+    """
+    在子进程中执行：解码一次源图，依次缩放并写出所有目标文件
+    每个文件先写 .part 再原子替换；返回 (写入文件数, 写入字节数, 错误说明)
+    """
+    source_path, targets = job
+    written = 0
+    total_bytes = 0
+    try:
+        with Image.open(source_path) as src:
+            src.load()
+            for out_path, width, fmt, quality in targets:
+                height = max(1, round(src.height * width / src.width))
+                img = src.resize((width, height), Image.LANCZOS)
+                tmp_path = out_path + ".part"
+                img.save(tmp_path, fmt, quality=quality)
+                os.replace(tmp_path, out_path)
+                written += 1
+                total_bytes += os.path.getsize(out_path)
+    except (OSError, ValueError) as e:
+        return written, total_bytes, str(e)
+    return written, total_bytes, None
+
+
+def update_image_map(map_path):
+    """在卡图映射表中记录本地可用的尺寸（前端 getCardImageSrcset 使用）"""
+    with open(map_path, "r", encoding="utf-8") as f:
+        text = f.read()
+    map_data = json.loads(text)
+    local_images = {"widths": sorted(DERIVED_WIDTHS + [int(s[2:]) for s in SIZES])}
+    if map_data.get("localImages") == local_images:
+        return False
+    map_data["localImages"] = local_images
+    with open(map_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(map_data, ensure_ascii=False, indent=2))
+        if text.endswith("\n"):
+            f.write("\n")
+    return True
+
+
+def process_pack(pack, executor, force):
+    """生成一个卡包的派生图，返回 (生成文件数, 跳过文件数, 失败源图数, 写入字节数)"""
+    map_path = os.path.join(IMAGE_MAP_DIR, pack["imageMapFile"])
+    image_dir = os.path.join(ROOT_DIR, pack["localImagesDir"])
+    meta_ids = mirror_images.collect_meta_ids(map_path)
+    mirror_files = mirror_images.load_manifest(image_dir)["files"] if os.path.isdir(image_dir) else {}
+
+    print(f"\n📦 {pack['packId']} ({pack.get('packName', '')})")
+
+    jobs = []
+    skipped = 0
+    missing = []
+    for meta_id in sorted(meta_ids):
+        # 源图已被 build_image_store.py --prune 移入仓库时使用仓库中的文件
+        source_path = mirror_images.local_image_path(image_dir, f"{meta_id}{SOURCE_SIZE}.webp", mirror_files)
+        if source_path is None:
+            missing.append(meta_id)
+            continue
+        targets = plan_targets(image_dir, meta_id)
+        todo = [t for t in targets if force or not is_fresh(t[0], source_path)]
+        skipped += len(targets) - len(todo)
+        if todo:
+            jobs.append((source_path, todo))
+
+    print(f"   源图: {len(meta_ids) - len(missing)} | 需要生成: {sum(len(t) for _, t in jobs)} | 已是最新: {skipped}"
+          + (f" | ⚠️ 缺少源图: {len(missing)}（先运行 tools/mirror_images.py）" if missing else ""))
+
+    written = 0
+    failed = len(missing)
+    total_bytes = 0
+    futures = {executor.submit(render_derivatives, job): job for job in jobs}
+    for done, future in enumerate(as_completed(futures), 1):
+        count, size, error = future.result()
+        written += count
+        total_bytes += size
+        if error:
+            failed += 1
+            print(f"  [{done}/{len(jobs)}] ✗ {os.path.basename(futures[future][0])}: {error}")
+        elif done % 20 == 0 or done == len(jobs):
+            print(f"  [{done}/{len(jobs)}] 已生成 {written} 个文件")
+
+    if not failed and update_image_map(map_path):
+        print(f"   🗺️ 已更新映射表 {pack['imageMapFile']} 的 localImages")
+    return written, skipped, failed, total_bytes
+
+
+def main():
+    args = sys.argv[1:]
+    max_workers = os.cpu_count() or 1
+    if "--jobs" in args:
+        idx = args.index("--jobs")
+        if idx + 1 < len(args) and args[idx + 1].isdigit():
+            max_workers = max(1, int(args[idx + 1]))
+            del args[idx:idx + 2]
+        else:
+            del args[idx]
+    force = "--force" in args
+    pack_ids = [a for a in args if not a.startswith("--")]
+
+    if Image is None:
+        print("❌ 需要 Pillow：pip install Pillow")
+        sys.exit(1)
+
+    packs = mirror_images.load_mirror_packs(pack_ids)
+    if not packs:
+        print("⚠️ 没有找到同时配置了 imageMapFile 和 localImagesDir 的卡包")
+        return
+
+    print(f"🖼️ 生成派生卡图：{len(packs)} 个卡包，宽度 {', '.join(f'w{w}' for w in DERIVED_WIDTHS)}，"
+          f"{max_workers} 个进程")
+
+    start = time.time()
+    totals = [0, 0, 0, 0]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for pack in packs:
+            for i, value in enumerate(process_pack(pack, executor, force)):
+                totals[i] += value
+
+    written, skipped, failed, total_bytes = totals
+    print()
+    print(f"✅ 完成! 耗时 {time.time() - start:.1f} 秒")
+    print(f"   生成: {written}")
+    print(f"   跳过(已是最新): {skipped}")
+    print(f"   失败: {failed}")
+    print(f"   写入大小: {total_bytes / 1024 / 1024:.1f} MB")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+内容寻址卡图仓库构建脚本
+把各卡包 localImagesDir 中镜像好的卡图（tools/mirror_images.py 下载）按内容哈希合并到
+共享仓库 data/images/store/{哈希}.webp，相同内容（再录卡、共用的异画）只保存一份；
+并为每个卡包生成清单 data/images/manifests/{packId}.json（密码 + 稀有度 → 哈希），
+供前端 getCardImageUrl 直接拼出仓库中的图片地址。
+
+【前端启用方式】
+  在 data/ocg/packs.json 的卡包配置中加入：
+    "imageManifest": "data/images/manifests/{packId}.json"
+  前端会优先使用清单中的仓库图片，清单中没有的卡回退到 localImagesDir / S3 CDN。
+
+用法：
+  cd YGOCardGame
+  python tools/build_image_store.py               # 所有配置了本地图片的卡包
+  python tools/build_image_store.py ocg_loch      # 只处理指定卡包
+  python tools/build_image_store.py --prune       # 构建后删除已进入仓库的卡包目录副本，并清理仓库中无引用的文件
+
+  --prune 只清理已在 packs.json 中配置了 imageManifest（指向本次写入的清单）、
+  且清单引用的仓库文件全部存在的卡包；其余卡包的图片目录保持不动（前端仍从 localImagesDir 加载）
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import mirror_images
+from mirror_images import ROOT_DIR, IMAGE_MAP_DIR, STORE_DIR, STORE_HASH_LENGTH, store_path
+
+MANIFEST_DIR = os.path.join(ROOT_DIR, "data", "images", "manifests")
+STORE_URL_DIR = "data/images/store"  # 前端访问仓库图片的路径（相对于网站根目录）
+SIZE_KEYS = {"small": "_w200", "large": "_w420"}  # 与 js/api.js 的 SIZE_SMALL / SIZE_LARGE 一致
+
+
+def store_name(sha256):
+    return sha256[:STORE_HASH_LENGTH] + ".webp"
+
+
+def add_to_store(src_path, sha256):
+    """把文件放入仓库（已存在则跳过），优先硬链接，不支持时复制；返回是否新增"""
+    dst_path = store_path(sha256)
+    if os.path.exists(dst_path):
+        return False
+    tmp_path = dst_path + ".tmp"
+    try:
+        os.link(src_path, tmp_path)
+    except OSError:
+        shutil.copyfile(src_path, tmp_path)
+    os.replace(tmp_path, dst_path)
+    return True
+
+
+def file_sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def resolve_image(image_dir, filename, mirror_files):
+    """
+    返回卡包目录中某个文件的 SHA-256；优先使用镜像清单中的记录，
+    文件已被 --prune 删除但仓库中有对应内容时同样视为可用；找不到返回 None
+    """
+    path = os.path.join(image_dir, filename)
+    entry = mirror_files.get(filename)
+    if os.path.exists(path):
+        if entry and os.path.getsize(path) == entry["size"]:
+            return entry["sha256"]
+        return file_sha256(path)
+    if entry and os.path.exists(store_path(entry["sha256"])):
+        return entry["sha256"]
+    return None
+
+
+def build_pack_store(pack):
+    """
+    为一个卡包写入仓库并生成清单
+    返回 (清单路径, 引用的仓库文件名集合, 新增到仓库的文件数, 缺失图片数)
+    """
+    image_dir = os.path.join(ROOT_DIR, pack["localImagesDir"])
+    with open(os.path.join(IMAGE_MAP_DIR, pack["imageMapFile"]), "r", encoding="utf-8") as f:
+        image_map = json.load(f).get("cards", {})
+    mirror_files = mirror_images.load_manifest(image_dir)["files"] if os.path.isdir(image_dir) else {}
+
+    referenced = set()
+    added = 0
+    missing = 0
+
+    def variant(meta_id):
+        nonlocal added, missing
+        hashes = {}
+        for key, suffix in SIZE_KEYS.items():
+            filename = f"{meta_id}{suffix}.webp"
+            sha256 = resolve_image(image_dir, filename, mirror_files)
+            if sha256 is None:
+                missing += 1
+                continue
+            src_path = os.path.join(image_dir, filename)
+            if os.path.exists(src_path) and add_to_store(src_path, sha256):
+                added += 1
+            hashes[key] = sha256[:STORE_HASH_LENGTH]
+            referenced.add(store_name(sha256))
+        return hashes
+
+    cards = {}
+    for password, info in image_map.items():
+        if not info.get("metaId"):
+            continue
+        entry = variant(info["metaId"])
+        if not entry:
+            continue
+        # 稀有度替代卡图（如 OF 超框卡），与默认卡图相同时不重复记录
+        alts = {}
+        for rarity, alt_id in (info.get("altMetaId") or {}).items():
+            if alt_id and alt_id != info["metaId"]:
+                alt_entry = variant(alt_id)
+                if alt_entry:
+                    alts[rarity] = alt_entry
+        if alts:
+            entry["alt"] = alts
+        cards[password] = entry
+
+    manifest = {
+        "_说明": f"{pack['packId']} 卡图清单（tools/build_image_store.py 自动生成）—— 密码 → 仓库图片哈希，alt 为按稀有度的替代卡图",
+        "_更新时间": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "storeDir": STORE_URL_DIR,
+        "cards": cards,
+    }
+    os.makedirs(MANIFEST_DIR, exist_ok=True)
+    manifest_path = os.path.join(MANIFEST_DIR, f"{pack['packId']}.json")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(",", ":"))
+        f.write("\n")
+    return manifest_path, referenced, added, missing
+
+
+def manifest_store_files(manifest_path):
+    """一个卡包清单引用的仓库文件名集合"""
+    referenced = set()
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for entry in json.load(f).get("cards", {}).values():
+            for variant in [entry] + list(entry.get("alt", {}).values()):
+                for key in SIZE_KEYS:
+                    if key in variant:
+                        referenced.add(variant[key] + ".webp")
+    return referenced
+
+
+def referenced_by_all_manifests():
+    """所有卡包清单引用的仓库文件名（包括本次未处理的卡包）"""
+    referenced = set()
+    if not os.path.isdir(MANIFEST_DIR):
+        return referenced
+    for name in os.listdir(MANIFEST_DIR):
+        if name.endswith(".json"):
+            referenced |= manifest_store_files(os.path.join(MANIFEST_DIR, name))
+    return referenced
+
+
+def prune_blocker(pack, manifest_path):
+    """
+    检查能否删除卡包目录中的图片副本，返回不能删除的原因（可以删除时返回 None）
+    前端只有在卡包配置了 imageManifest 时才会通过 _store 从仓库加载图片，否则仍读 localImagesDir
+    """
+    manifest_rel = os.path.relpath(manifest_path, ROOT_DIR).replace(os.sep, "/")
+    if pack.get("imageManifest") != manifest_rel:
+        return f"packs.json 中没有配置 \"imageManifest\": \"{manifest_rel}\"，前端不会从仓库加载图片"
+    missing = [n for n in manifest_store_files(manifest_path) if not os.path.exists(os.path.join(STORE_DIR, n))]
+    if missing:
+        return f"清单引用的仓库文件有 {len(missing)} 个不存在（如 {missing[0]}）"
+    return None
+
+
+def prune_pack_dir(pack, referenced):
+    """
+    删除卡包目录中内容已进入仓库、且被该卡包清单引用的图片副本，返回 (删除数, 释放字节数)
+    referenced: 该卡包清单引用的仓库文件名集合（清单没有引用的文件前端仍从卡包目录加载，不删除）
+    """
+    image_dir = os.path.join(ROOT_DIR, pack["localImagesDir"])
+    if not os.path.isdir(image_dir):
+        return 0, 0
+    mirror_files = mirror_images.load_manifest(image_dir)["files"]
+    removed = 0
+    freed = 0
+    for filename, entry in mirror_files.items():
+        if store_name(entry["sha256"]) not in referenced:
+            continue
+        path = os.path.join(image_dir, filename)
+        stored = store_path(entry["sha256"])
+        if os.path.exists(path) and os.path.exists(stored) and os.path.getsize(stored) == entry["size"]:
+            # 硬链接的副本删除后不释放空间，但部署时不再重复上传
+            freed += entry["size"]
+            os.remove(path)
+            removed += 1
+    return removed, freed
+
+
+def main():
+    args = sys.argv[1:]
+    prune = "--prune" in args
+    pack_ids = [a for a in args if not a.startswith("--")]
+
+    packs = mirror_images.load_mirror_packs(pack_ids)
+    if not packs:
+        print("⚠️ 没有找到同时配置了 imageMapFile 和 localImagesDir 的卡包")
+        return
+
+    os.makedirs(STORE_DIR, exist_ok=True)
+    print(f"🗃️ 构建内容寻址卡图仓库：{len(packs)} 个卡包 → {os.path.abspath(STORE_DIR)}")
+
+    total_refs = 0
+    unique_refs = set()
+    manifest_paths = {}
+    for pack in packs:
+        manifest_path, referenced, added, missing = build_pack_store(pack)
+        manifest_paths[pack["packId"]] = manifest_path
+        total_refs += len(referenced)
+        unique_refs |= referenced
+        print(f"\n📦 {pack['packId']}")
+        print(f"   清单: {os.path.relpath(manifest_path, ROOT_DIR)}")
+        print(f"   引用仓库文件: {len(referenced)} | 新增到仓库: {added}"
+              + (f" | ⚠️ 缺失图片: {missing}（先运行 tools/mirror_images.py）" if missing else ""))
+        if pack.get("imageManifest") != os.path.relpath(manifest_path, ROOT_DIR).replace(os.sep, "/"):
+            print(f"   💡 在 packs.json 中为该卡包加入 \"imageManifest\": "
+                  f"\"{os.path.relpath(manifest_path, ROOT_DIR).replace(os.sep, '/')}\" 以启用仓库图片")
+
+    all_refs = referenced_by_all_manifests()
+    store_files = [n for n in os.listdir(STORE_DIR) if n.endswith(".webp")]
+    store_bytes = sum(os.path.getsize(os.path.join(STORE_DIR, n)) for n in store_files)
+    print(f"\n📊 仓库: {len(store_files)} 个文件 / {store_bytes / 1024 / 1024:.1f} MB"
+          f"（本次各卡包共引用 {total_refs} 个文件，去重后 {len(unique_refs)} 个）")
+
+    if prune:
+        removed = freed = 0
+        for pack in packs:
+            manifest_path = manifest_paths[pack["packId"]]
+            blocker = prune_blocker(pack, manifest_path)
+            if blocker:
+                print(f"⏭️ {pack['packId']}: 不清理卡包目录 —— {blocker}")
+                continue
+            n, size = prune_pack_dir(pack, manifest_store_files(manifest_path))
+            removed += n
+            freed += size
+        orphans = [n for n in store_files if n not in all_refs]
+        for name in orphans:
+            os.remove(os.path.join(STORE_DIR, name))
+        print(f"🧹 已删除卡包目录副本 {removed} 个（{freed / 1024 / 1024:.1f} MB），仓库无引用文件 {len(orphans)} 个")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+发布构建脚本
+仓库中的数据文件保持易读的 indent=2 格式和 _说明 等文档字段，
+发布时把网站文件复制到 dist/：JSON 去掉缩进和文档字段（以 _ 开头、含中文的键），
+并为文本文件生成 .gz / .br 预压缩副本，供支持预压缩的静态服务器直接返回。
+
+【文档字段】
+  以 "_" 开头且包含非 ASCII 字符的键（如 _说明、_数据源、_packScheme说明）视为文档，发布时删除；
+  前端读取的字段都是纯英文键，不受影响。
+
+【不发布的文件】
+  EXCLUDE_PATHS 中的路径和匹配 EXCLUDE_PATTERNS 的文件名（备份、下载/写入中的临时文件、
+  追加日志、失败记录、抓取索引等本地构建文件）不会复制到发布目录；隐藏文件（.cards_md5 等）同样跳过。
+  构建后列出超过 LARGE_FILE_SIZE 的发布文件，超过 Cloudflare Pages 单文件上限时构建失败。
+
+【依赖】
+  .br 需要 brotli（pip install brotli），未安装时只生成 .gz
+
+用法：
+  cd YGOCardGame
+  python tools/build_release.py                # 输出到 dist/
+  python tools/build_release.py --out public   # 输出到指定目录
+  python tools/build_release.py --all          # 尺寸表列出所有文本文件（默认只列出 JSON）
+  python tools/build_release.py --large 500    # 列出超过 500KB 的发布文件（默认 1024KB）
+"""
+
+import fnmatch
+import gzip
+import json
+import os
+import shutil
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# 配置
+DIST_DIR = os.path.join(ROOT_DIR, "dist")
+SITE_ENTRIES = ["index.html", "css", "js", "data"]  # functions/ 由 Cloudflare Pages 从项目根目录读取，不复制
+# 网页不需要的本地构建文件
+EXCLUDE_PATHS = {
+    "data/common/cards.json", "data/common/cards.json.bak", "data/common/cards.idx", "data/common/diffs",
+    "data/tcg/ygoprodeck_set_index.json", "data/tcg/yugiohmeta_failed.json",
+}
+# 按文件名匹配的本地构建文件：新增的构建脚本产生同类文件时不需要逐个登记
+EXCLUDE_PATTERNS = (
+    "*.bak", "*.tmp", "*.part", "*.part.json",  # 备份、写入/下载中的临时文件
+    "*.jsonl", "*.journal.*",                   # 追加日志
+    "*_failed.json", "*_set_index.json",        # 抓取失败记录、抓取用的索引
+)
+LARGE_FILE_SIZE = 1024 * 1024  # 构建后列出超过此大小的发布文件
+PAGES_FILE_LIMIT = 25 * 1024 * 1024  # Cloudflare Pages 单文件上限，超过时构建失败
+COMPRESS_SUFFIXES = (".json", ".js", ".css", ".html", ".svg")
+COMPRESS_MIN_SIZE = 1024  # 小于 1KB 的文件压缩收益可以忽略
+RELEASE_MARKER = ".release"  # 发布目录标记，只清空带有此标记的目录
+
+
+def is_doc_key(key):
+    return key.startswith("_") and not key.isascii()
+
+
+def strip_doc_keys(value):
+    """递归删除文档字段"""
+    if isinstance(value, dict):
+        return {k: strip_doc_keys(v) for k, v in value.items() if not is_doc_key(k)}
+    if isinstance(value, list):
+        return [strip_doc_keys(v) for v in value]
+    return value
+
+
+def minify_json(data):
+    return json.dumps(strip_doc_keys(json.loads(data)), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def is_excluded(rel_path):
+    """是否为网页不需要的本地构建文件（rel_path 相对于仓库根目录，使用 / 分隔）"""
+    name = rel_path.rsplit("/", 1)[-1]
+    if name.startswith(".") or rel_path in EXCLUDE_PATHS:
+        return True
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in EXCLUDE_PATTERNS)
+
+
+def iter_site_files():
+    """产出需要发布的文件（相对于仓库根目录，使用 / 分隔）"""
+    for entry in SITE_ENTRIES:
+        path = os.path.join(ROOT_DIR, entry)
+        if os.path.isfile(path):
+            yield entry
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            rel_dir = os.path.relpath(dirpath, ROOT_DIR).replace(os.sep, "/")
+            dirnames[:] = sorted(d for d in dirnames
+                                 if not d.startswith(".") and f"{rel_dir}/{d}" not in EXCLUDE_PATHS)
+            for name in sorted(filenames):
+                rel_path = f"{rel_dir}/{name}"
+                if not is_excluded(rel_path):
+                    yield rel_path
+
+
+def write_compressed(out_path, data):
+    """写入 .gz / .br 预压缩副本（压缩后更大时不写），返回 (gzip 字节数, brotli 字节数)，未生成为 None"""
+    gz_size = br_size = None
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gz) < len(data):
+        with open(out_path + ".gz", "wb") as f:
+            f.write(gz)
+        gz_size = len(gz)
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        if len(br) < len(data):
+            with open(out_path + ".br", "wb") as f:
+                f.write(br)
+            br_size = len(br)
+    return gz_size, br_size
+
+
+def build_release(out_dir):
+    """构建发布目录，返回尺寸记录 [(路径, 源文件字节数, 输出字节数, gzip, brotli)]"""
+    if os.path.exists(out_dir):
+        if os.listdir(out_dir) and not os.path.exists(os.path.join(out_dir, RELEASE_MARKER)):
+            raise ValueError(f"{out_dir} 不是空目录，也不是之前的发布目录，拒绝覆盖")
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir)
+    with open(os.path.join(out_dir, RELEASE_MARKER), "w", encoding="utf-8") as f:
+        f.write("tools/build_release.py 生成的发布目录，重新构建时会整个清空\n")
+
+    rows = []
+    for rel_path in iter_site_files():
+        src_path = os.path.join(ROOT_DIR, rel_path)
+        out_path = os.path.join(out_dir, rel_path)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+
+        if not rel_path.endswith(COMPRESS_SUFFIXES):
+            shutil.copyfile(src_path, out_path)
+            continue
+
+        with open(src_path, "rb") as f:
+            data = f.read()
+        src_size = len(data)
+        if rel_path.endswith(".json"):
+            data = minify_json(data)
+        with open(out_path, "wb") as f:
+            f.write(data)
+
+        gz_size = br_size = None
+        if len(data) >= COMPRESS_MIN_SIZE:
+            gz_size, br_size = write_compressed(out_path, data)
+        rows.append((rel_path, src_size, len(data), gz_size, br_size))
+    return rows
+
+
+def find_large_files(out_dir, min_size):
+    """发布目录中不小于 min_size 字节的文件，按大小降序返回 [(相对路径, 字节数)]"""
+    found = []
+    for dirpath, _, filenames in os.walk(out_dir):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            size = os.path.getsize(path)
+            if size >= min_size:
+                found.append((os.path.relpath(path, out_dir).replace(os.sep, "/"), size))
+    return sorted(found, key=lambda item: (-item[1], item[0]))
+
+
+def report_large_files(out_dir, min_size):
+    """列出大文件，返回是否有文件超过 Cloudflare Pages 单文件上限"""
+    large = find_large_files(out_dir, min_size)
+    if not large:
+        print(f"\n✅ 没有超过 {min_size / 1024:.0f} KB 的发布文件")
+        return False
+    print(f"\n⚠️ 超过 {min_size / 1024:.0f} KB 的发布文件 {len(large)} 个（确认是网页需要的文件）：")
+    over_limit = False
+    for rel_path, size in large:
+        mark = ""
+        if size > PAGES_FILE_LIMIT:
+            mark = f"  ❌ 超过 Cloudflare Pages 单文件上限 {PAGES_FILE_LIMIT // 1024 // 1024} MB"
+            over_limit = True
+        print(f"   {size / 1024:>10.1f} KB  {rel_path}{mark}")
+    return over_limit
+
+
+def format_kb(size):
+    return "-" if size is None else f"{size / 1024:.1f}"
+
+
+def print_size_table(rows, show_all):
+    shown = [r for r in rows if show_all or r[0].endswith(".json")]
+    width = max([len(r[0]) for r in shown] + [4])
+    print(f"\n{'文件':<{width}}  {'源文件 KB':>10}  {'精简 KB':>10}  {'gzip KB':>10}  {'br KB':>10}  {'最小/源':>8}")
+    for path, src_size, out_size, gz_size, br_size in shown:
+        best = min(s for s in (out_size, gz_size, br_size) if s is not None)
+        print(f"{path:<{width}}  {format_kb(src_size):>10}  {format_kb(out_size):>10}  "
+              f"{format_kb(gz_size):>10}  {format_kb(br_size):>10}  {best / src_size * 100:>7.1f}%")
+
+    total_src = sum(r[1] for r in rows)
+    total_out = sum(r[2] for r in rows)
+    total_gz = sum(r[3] if r[3] is not None else r[2] for r in rows)
+    print(f"\n📊 文本文件 {len(rows)} 个：源文件 {total_src / 1024:.1f} KB → 精简 {total_out / 1024:.1f} KB"
+          f" → gzip {total_gz / 1024:.1f} KB", end="")
+    if brotli is not None:
+        total_br = sum(r[4] if r[4] is not None else r[2] for r in rows)
+        print(f" → brotli {total_br / 1024:.1f} KB")
+    else:
+        print("（未安装 brotli，跳过 .br：pip install brotli）")
+
+
+def main():
+    args = sys.argv[1:]
+    out_dir = DIST_DIR
+    if "--out" in args:
+        idx = args.index("--out")
+        out_dir = os.path.abspath(args[idx + 1])
+        del args[idx:idx + 2]
+    show_all = "--all" in args
+    large_size = LARGE_FILE_SIZE
+    if "--large" in args:
+        idx = args.index("--large")
+        large_size = int(args[idx + 1]) * 1024
+        del args[idx:idx + 2]
+
+    print(f"📦 发布构建 → {out_dir}")
+    try:
+        rows = build_release(out_dir)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print_size_table(rows, show_all)
+    if report_large_files(out_dir, large_size):
+        print("❌ 有文件超过单文件上限，无法部署到 Cloudflare Pages")
+        sys.exit(1)
+    print(f"\n✅ 完成！部署 {os.path.relpath(out_dir, ROOT_DIR)}/ 目录即可")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,671 @@
+#!/usr/bin/env python3
+"""
+抽卡参考引擎（Python 版，固定随机种子）
+逐包照搬 js/game.js 的 drawCards_OCG / drawCardsBox_OCG / drawCards_LOCH / drawCardsBox_LOCH / drawCards_Legacy
+以及 openMultiPacks 的 +1 辅助包，用 random.Random(种子) 代替 Math.random()，同一种子的结果完全可复现。
+可以输出每包 / 每盒的具体卡牌（JSON Lines），也可以生成"黄金文件"：前端或其他工具改写抽卡代码后，
+把新实现的开包结果导出为同样格式的 JSONL，用 --compare 检验与参考实现是否同分布。
+
+【与前端保持一致的细节】
+  - 分支、兜底顺序、同包 / 整盒去重条件与前端相同；规则参数由 tools/pack_rules.py 解析（含 `||` 默认值）
+  - "在剩余卡中抽取"用重抽实现（抽到已选的卡就重抽，与在剩余卡中抽取同分布，与前端 drawTables 的写法相同），
+    连续 DRAW_MAX_TRIES 次重复时改为扫描剩余卡
+  - 转盘抽取的边界（`roll <= 0`）、兜底返回值（OCG / LOCH 取最后一项，旧版方案取 N / R）与前端相同
+  - 洗牌使用与 shuffleArray 相同的 Fisher-Yates 写法；每包内按 rarities.json 的 sortWeight 稳定排序
+
+【输出格式（JSON Lines，每行一个单位）】
+  单包：{"packId", "type": "pack", "index", "cards": [{"index", "id", "rarity"}, ...]}
+  整盒：{"packId", "type": "box", "index", "packs": [[卡牌, ...], ...], "bonus": 卡牌 或 null, "boxHasPSER"}
+  卡牌的 index 为卡包文件 cardIds 中的位置（前端 setNumber - 1），辅助包卡牌为 supplementPack.cards 中的位置
+
+【黄金文件】
+  tools/golden/<packId>.json：用固定种子开 GOLDEN_PACKS 包 + GOLDEN_BOXES 盒，记录每张卡每个稀有度版本的张数、
+  每包 / 每盒各稀有度张数的分布，以及卡包配置指纹。--compare 对这两组计数做双样本卡方检验（Wilson–Hilferty 近似），
+  p 值低于 P_FAIL 判为分布不一致；--check-golden 用相同种子重跑参考引擎，计数必须完全相同。
+
+用法：
+  cd YGOCardGame
+  python tools/draw_engine.py ocg_blzd --packs 10 --seed 1         # 开 10 包，JSONL 输出到屏幕
+  python tools/draw_engine.py ocg_loch --boxes 100 --out boxes.jsonl
+  python tools/draw_engine.py --golden                              # 生成 / 更新所有 OCG 卡包的黄金文件
+  python tools/draw_engine.py --check-golden                        # 参考引擎结果与黄金文件逐项核对
+  python tools/draw_engine.py --compare result.jsonl                # 检验其他实现的结果与黄金文件同分布
+  python tools/draw_engine.py --bench                               # 测试每秒开包数
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import sys
+import time
+from bisect import bisect_left
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import pack_rules
+from pack_rules import SCHEME_OCG, SCHEME_LEGACY, LEGACY_RARE_KEYS, LOCH_FIXED_SLOTS, CardPools, Tally
+
+# 配置
+GOLDEN_DIR = os.path.join(pack_rules.ROOT_DIR, "tools", "golden")
+GOLDEN_SEED = 20260101
+GOLDEN_PACKS = 200_000
+GOLDEN_BOXES = 5_000
+DRAW_MAX_TRIES = 16          # 与前端 DRAW_TABLE_MAX_TRIES 相同
+P_FAIL = 1e-4                # 卡方检验 p 值低于此值判为分布不一致
+MIN_BIN = 10                 # 两边合计少于此数的类别合并成一组再检验
+BENCH_SECONDS = 1.0
+
+
+def cumulative(weights):
+    total = 0
+    cum = []
+    for w in weights:
+        total += w
+        cum.append(total)
+    return cum
+
+
+class DrawEngine(CardPools):
+    """一个卡包的参考抽卡引擎，卡牌用 (cardIds 下标, 稀有度) 表示"""
+
+    def __init__(self, pack, config, rarity_order, seed=None):
+        super().__init__(pack, config)
+        self.rng = random.Random(seed)
+        self.random = self.rng.random
+
+        rules = self.rules
+        # N 卡池：NR 卡权重为 nrWeightRatio
+        nr_ratio = rules.get("nrWeightRatio", pack_rules.DEFAULT_NR_WEIGHT_RATIO)
+        self.n_weights = [nr_ratio if i in self.nr_cards else 1 for i in self.n_pool]
+        self.n_cum = cumulative(self.n_weights)
+
+        self.version_cache = {}
+        self.box_items = self._items(rules.get("boxRarityDistribution"))
+        self.slot4_items = self._items(rules.get("boxSlot4Distribution"))
+        self.of_items = self._items(rules.get("ofTypeOdds"))
+        if rules["scheme"] == SCHEME_OCG and not self.box_items[0]:
+            raise ValueError(f"{self.pack_id} 的 boxRarityDistribution 没有任何稀有度")
+
+        self._sort_key = lambda c: rarity_order.get(c[1], 0)    # 包内按 RARITY_ORDER_ASC 排序
+        if rules["scheme"] == SCHEME_LEGACY:
+            self.legacy_plan = self._legacy_plan()
+
+    @staticmethod
+    def _items(table):
+        items = pack_rules.weight_items(table)
+        return [k for k, _ in items], cumulative([w for _, w in items])
+
+    # ---------- 基础抽取 ----------
+
+    def _roll(self, items):
+        """转盘抽取（roll -= w; if (roll <= 0)），落空时取最后一项"""
+        names, cum = items
+        i = bisect_left(cum, self.random() * cum[-1])
+        return names[i] if i < len(names) else names[-1]
+
+    def _uniform(self, pool):
+        return pool[int(self.random() * len(pool))]
+
+    def _pick_unused(self, pool, used):
+        """在 pool 中等概率抽一张不在 used 中的卡，全部已使用时返回 -1"""
+        if not pool:
+            return -1
+        rand, n = self.random, len(pool)
+        for _ in range(DRAW_MAX_TRIES):
+            card = pool[int(rand() * n)]
+            if card not in used:
+                return card
+        available = [c for c in pool if c not in used]
+        return self._uniform(available) if available else -1
+
+    def _pick_n(self, used):
+        """weightedPickFromNPool：从 N 卡池按权重抽一张不在 used 中的卡，返回 (下标, 稀有度) 或 None"""
+        if not self.n_pool:
+            return None
+        rand, pool, cum = self.random, self.n_pool, self.n_cum
+        total = cum[-1]
+        for _ in range(DRAW_MAX_TRIES):
+            card = pool[bisect_left(cum, rand() * total)]
+            if card not in used:
+                return card, "NR" if card in self.nr_cards else "N"
+        available = [(c, w) for c, w in zip(pool, self.n_weights) if c not in used]
+        if not available:
+            return None
+        roll = rand() * sum(w for _, w in available)
+        card = available[-1][0]
+        for c, w in available:
+            roll -= w
+            if roll <= 0:
+                card = c
+                break
+        return card, "NR" if card in self.nr_cards else "N"
+
+    def _shuffle(self, items):
+        """shuffleArray（Fisher-Yates）"""
+        rand = self.random
+        for i in range(len(items) - 1, 0, -1):
+            j = int(rand() * (i + 1))
+            items[i], items[j] = items[j], items[i]
+        return items
+
+    def _sort(self, cards):
+        cards.sort(key=self._sort_key)
+        return cards
+
+    def resolve_version(self, idx):
+        """resolveCardVersion：按 versionOdds 为多版本卡选一个稀有度"""
+        if idx not in self.version_cache:
+            versions = self.cards[idx]["rarityVersions"]
+            odds = self.rules["versionOdds"]
+            self.version_cache[idx] = (versions, cumulative([pack_rules.version_weight(odds, v) for v in versions]))
+        versions, cum = self.version_cache[idx]
+        if len(versions) <= 1:
+            return versions[0]
+        return self._roll((versions, cum))
+
+    # ---------- ocg_default ----------
+
+    def ocg_pack(self):
+        """drawCards_OCG"""
+        rules = self.rules
+        results = []
+        used = set()
+        n_count = rules["cardsPerPack"] - 1
+        for _ in range(n_count):
+            picked = self._pick_n(used)
+            if picked is None:
+                break
+            used.add(picked[0])
+            results.append(picked)
+
+        # N 池不够时从 R 池补充
+        if len(results) < n_count:
+            for card in self._shuffle(list(self.base_pool("R"))):
+                if len(results) >= n_count:
+                    break
+                if card not in used:
+                    used.add(card)
+                    results.append((card, "R"))
+
+        target = self._roll(self.box_items)
+        if target == "SER" and self.random() < rules["boxPSERChance"]:
+            target = "PSER"
+
+        candidates = self.candidates(target)
+        card = self._pick_unused(candidates, used)
+        if card >= 0:
+            results.append((card, target))
+        elif candidates:
+            # 所有候选卡都与 N 位重复，允许重复
+            results.append((self._uniform(candidates), target))
+        else:
+            # 数据兜底：从所有非 N 卡中选，按 versionOdds 决定版本
+            card = self._pick_unused(self.non_n, used)
+            if card >= 0:
+                results.append((card, self.resolve_version(card)))
+        return self._sort(results)
+
+    def ocg_box(self):
+        """drawCardsBox_OCG，返回 (每包卡牌, 原盒是否出了 PSER)"""
+        rules = self.rules
+        slots = self.box_slots()
+        box_has_pser = False
+        for i, target in enumerate(slots):
+            # 每盒最多一个 SER 位变为 PSER
+            if target == "SER" and not box_has_pser and self.random() < rules["boxPSERChance"]:
+                slots[i] = "PSER"
+                box_has_pser = True
+        self._shuffle(slots)
+
+        n_count = (rules["cardsPerPack"] or 5) - 1
+        packs = []
+        for target in slots:
+            used = set()
+            pack_cards = []
+            candidates = self.candidates(target)
+            rare = None
+            if candidates:
+                rare = (self._uniform(candidates), target)
+            else:
+                # 兜底：基础稀有度池，再没有时全部非 N 卡，按 versionOdds 决定版本
+                pool = self.base_pool(target) or self.non_n
+                if pool:
+                    card = self._uniform(pool)
+                    rare = (card, self.resolve_version(card))
+            if rare:
+                used.add(rare[0])
+                pack_cards.append(rare)
+            for _ in range(n_count):
+                picked = self._pick_n(used)
+                if picked is not None:
+                    used.add(picked[0])
+                    pack_cards.append(picked)
+            packs.append(self._sort(pack_cards))
+        return packs, box_has_pser
+
+    # ---------- loch_special ----------
+
+    def _loch_slots123(self):
+        """1、2 号位 SR（不同卡），3 号位 UR（LOCH_FIXED_SLOTS）"""
+        results = []
+        for rarity, count in LOCH_FIXED_SLOTS:
+            pool = self.base_pool(rarity)
+            taken = set()
+            for _ in range(min(count, len(pool))):
+                card = self._pick_unused(pool, taken)
+                taken.add(card)
+                results.append((card, rarity))
+        return results
+
+    def _roll_slot4(self):
+        target = self._roll(self.slot4_items)
+        if target == "OF":
+            target = self._roll(self.of_items)
+        return target
+
+    def loch_pack(self):
+        """drawCards_LOCH"""
+        results = self._loch_slots123()
+        target = self._roll_slot4()
+        candidates = self.candidates(target)
+        # 包内不出 "编号 + 稀有度" 完全相同的卡
+        card = self._pick_unused(candidates, {c for c, r in results if r == target})
+        if card >= 0:
+            results.append((card, target))
+        elif candidates:
+            results.append((self._uniform(candidates), target))
+        elif self.cards:
+            # 极端兜底：全卡池 SER
+            results.append((int(self.random() * len(self.cards)), "SER"))
+        return self._sort(results)
+
+    def loch_box(self):
+        """drawCardsBox_LOCH，返回 (每包卡牌, False)"""
+        slots = [self._roll(self.of_items) if target == "OF" else target for target in self.box_slots()]
+        self._shuffle(slots)
+
+        used_slot4 = set()        # 整盒 4 号位编号不重复
+        packs = []
+        for target in slots:
+            pack_cards = self._loch_slots123()
+            candidates = self.candidates(target)
+            in_pack = {c for c, r in pack_cards if r == target}
+            card = self._pick_unused(candidates, in_pack | used_slot4)
+            if card < 0 and candidates:
+                # 放宽条件：忽略整盒编号去重；仍没有时忽略包内去重
+                card = self._pick_unused(candidates, in_pack)
+                if card < 0:
+                    card = self._uniform(candidates)
+            if card >= 0:
+                used_slot4.add(card)
+                pack_cards.append((card, target))
+            packs.append(self._sort(pack_cards))
+        return packs, False
+
+    # ---------- legacy ----------
+
+    def _legacy_outcome(self, rarity):
+        """findAvailableRarity：该稀有度没有卡时按固定顺序降级，返回 (稀有度, 卡池)"""
+        rarity = self.legacy_rarity(rarity) or "N"
+        return rarity, self.base_pool(rarity)
+
+    def _legacy_plan(self):
+        """
+        每个卡位的 (累计权重, 各稀有度降级后的 (稀有度, 卡池), 落空时的结果)
+        drawRandomRarity 落空时返回 N，drawGuaranteedRare 落空或保底权重全为 0 时返回 R；
+        rarityRates 含非数字字段时前端总权重出错，普通卡位永远抽到 N
+        """
+        rules = self.rules
+        items, usable = pack_rules.legacy_rate_items(rules["rarityRates"])
+        if usable and items:
+            normal = (cumulative([w for _, w in items]), [self._legacy_outcome(k) for k, _ in items])
+        else:
+            normal = (None, [])
+        rare = [rules["rarityRates"].get(k) or 0 for k in LEGACY_RARE_KEYS]
+        if sum(rare):
+            guaranteed = (cumulative(rare), [self._legacy_outcome(k) for k in LEGACY_RARE_KEYS])
+        else:
+            guaranteed = (None, [])
+
+        slots = rules["cardsPerPack"]
+        plan = [normal + (self._legacy_outcome("N"),) for _ in range(slots)]
+        if rules["guaranteedRareSlot"] and slots > 0:
+            plan[-1] = guaranteed + (self._legacy_outcome("R"),)
+        return plan
+
+    def legacy_pack(self):
+        """drawCards_Legacy"""
+        rand = self.random
+        results = []
+        for cum, outcomes, default in self.legacy_plan:
+            if cum:
+                i = bisect_left(cum, rand() * cum[-1])
+                rarity, pool = outcomes[i] if i < len(outcomes) else default
+            else:
+                rarity, pool = default
+            if pool:
+                results.append((pool[int(rand() * len(pool))], rarity))
+        return self._sort(results)
+
+    # ---------- 入口 ----------
+
+    def open_pack(self):
+        """drawCards：开一包，返回 [(下标, 稀有度)]"""
+        return self.pack_method()()
+
+    def open_box(self):
+        """openMultiPacks：开一盒，返回 (每包卡牌, 辅助包卡牌 或 None, 原盒是否出了 PSER)"""
+        box_method = self.box_method()
+        if box_method:
+            packs, box_has_pser = box_method()
+        else:
+            packs, box_has_pser = [self.open_pack() for _ in range(self.rules["packsPerBox"])], False
+        return packs, self.bonus_card(box_has_pser), box_has_pser
+
+    def bonus_card(self, box_has_pser):
+        """+1 辅助包：随机 1 张，原盒已出 PSER 时不再出 PSER"""
+        if not self.supplement:
+            return None
+        idx = int(self.random() * len(self.supplement))
+        versions = self.supplement[idx]["rarityVersions"]
+        rarity = versions[0]
+        if len(versions) > 1 and not box_has_pser:
+            if self.random() < self.rules["bonusPSERChance"] and "PSER" in versions:
+                rarity = "PSER"
+        return idx, rarity
+
+    # ---------- 输出 ----------
+
+    def card_record(self, card, bonus=False):
+        idx, rarity = card
+        source = self.supplement if bonus else self.cards
+        return {"index": idx, "id": source[idx]["id"], "rarity": rarity}
+
+    def pack_record(self, index, cards):
+        return {"packId": self.pack_id, "type": "pack", "index": index,
+                "cards": [self.card_record(c) for c in cards]}
+
+    def box_record(self, index, packs, bonus, box_has_pser):
+        return {"packId": self.pack_id, "type": "box", "index": index,
+                "packs": [[self.card_record(c) for c in cards] for cards in packs],
+                "bonus": self.card_record(bonus, bonus=True) if bonus else None,
+                "boxHasPSER": box_has_pser}
+
+    def fingerprint(self):
+        """卡包规则 + 卡池的指纹，配置修改后黄金文件需要重新生成"""
+        data = {"rules": self.rules,
+                "cards": [c["rarityVersions"] for c in self.cards],
+                "supplement": [c["rarityVersions"] for c in self.supplement]}
+        text = json.dumps(data, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def load_engine(pack_id, seed=None, config=None, rarity_order=None):
+    config = config or pack_rules.load_ocg_config()
+    pack = pack_rules.find_pack(config, pack_id)
+    if pack is None:
+        raise ValueError(f"找不到卡包 {pack_id}")
+    return DrawEngine(pack, config, rarity_order or pack_rules.load_rarity_order(), seed)
+
+
+# ---------- 统计 ----------
+
+def count_units(engine, packs, boxes):
+    """用参考引擎开 packs 包 + boxes 盒，返回 {"pack": 统计, "box": 统计}"""
+    result = {}
+    if packs > 0:
+        counter = Tally()
+        for _ in range(packs):
+            counter.add(engine.open_pack())
+        result["pack"] = counter.to_dict()
+    if boxes > 0:
+        counter = Tally()
+        for _ in range(boxes):
+            packs_cards, bonus, _ = engine.open_box()
+            counter.add([c for cards in packs_cards for c in cards], bonus)
+        result["box"] = counter.to_dict()
+    return result
+
+
+def count_jsonl(path):
+    """读取 JSONL 开包结果，按 packId 统计，返回 {packId: {"pack": 统计, "box": 统计}}"""
+    counters = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                unit_type = record["type"]
+                if unit_type == "pack":
+                    cards = [(c["index"], c["rarity"]) for c in record["cards"]]
+                    bonus = None
+                else:
+                    cards = [(c["index"], c["rarity"]) for pack in record["packs"] for c in pack]
+                    bonus = (record["bonus"]["index"], record["bonus"]["rarity"]) if record.get("bonus") else None
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path} 第 {line_no} 行格式错误：{e}")
+            counter = counters.setdefault(record["packId"], {}).setdefault(unit_type, Tally())
+            counter.add(cards, bonus)
+    return {pack_id: {k: c.to_dict() for k, c in units.items()} for pack_id, units in counters.items()}
+
+
+def chi2_pvalue(stat, dof):
+    """卡方分布上侧概率（Wilson–Hilferty 正态近似）"""
+    if dof <= 0:
+        return 1.0
+    z = ((stat / dof) ** (1 / 3) - (1 - 2 / (9 * dof))) / math.sqrt(2 / (9 * dof))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def homogeneity(expected, observed):
+    """
+    双样本卡方齐性检验：两组计数是否来自同一分布，返回 (p 值, 自由度)
+    两边合计少于 MIN_BIN 的类别合并为一组
+    """
+    total_a, total_b = sum(expected.values()), sum(observed.values())
+    if not total_a or not total_b:
+        return (1.0 if total_a == total_b else 0.0), 0
+    bins = []
+    small_a = small_b = 0
+    for key in set(expected) | set(observed):
+        a, b = expected.get(key, 0), observed.get(key, 0)
+        if a + b < MIN_BIN:
+            small_a += a
+            small_b += b
+        else:
+            bins.append((a, b))
+    if small_a + small_b:
+        bins.append((small_a, small_b))
+    ka, kb = math.sqrt(total_b / total_a), math.sqrt(total_a / total_b)
+    stat = sum((a * ka - b * kb) ** 2 / (a + b) for a, b in bins)
+    dof = len(bins) - 1
+    return chi2_pvalue(stat, dof), dof
+
+
+def compare_counts(golden, observed):
+    """对比一个单位类型（pack / box）的统计，返回 [(检验项, p 值, 自由度)] 和提示列表"""
+    tests = [("单卡版本分布", *homogeneity(golden["cards"], observed["cards"]))]
+    for rarity in sorted(set(golden["histogram"]) | set(observed["histogram"])):
+        expected = golden["histogram"].get(rarity, {"0": golden["units"]})
+        actual = observed["histogram"].get(rarity, {"0": observed["units"]})
+        tests.append((f"每单位 {rarity} 张数", *homogeneity(expected, actual)))
+    notes = []
+    unknown = sorted(set(observed["cards"]) - set(golden["cards"]))
+    if unknown:
+        notes.append(f"参考实现中没有出现过的卡牌版本：{', '.join(unknown[:10])}{' 等' if len(unknown) > 10 else ''}")
+    return tests, notes
+
+
+# ---------- 黄金文件 ----------
+
+def golden_path(pack_id):
+    return os.path.join(GOLDEN_DIR, f"{pack_id}.json")
+
+
+def build_golden(engine, seed=GOLDEN_SEED, packs=GOLDEN_PACKS, boxes=GOLDEN_BOXES):
+    golden = {
+        "_说明": "tools/draw_engine.py 生成的抽卡黄金文件 —— 参考引擎用固定种子开包的统计结果，"
+                 "改写抽卡代码后用 --compare 检验新实现与其同分布",
+        "packId": engine.pack_id,
+        "scheme": engine.rules["scheme"],
+        "fingerprint": engine.fingerprint(),
+        "seed": seed,
+    }
+    golden.update(count_units(engine, packs, boxes))
+    return golden
+
+
+def write_golden(golden):
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    with open(golden_path(golden["packId"]), "w", encoding="utf-8") as f:
+        json.dump(golden, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def load_golden(pack_id):
+    path = golden_path(pack_id)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ---------- 命令 ----------
+
+def cmd_draw(pack_id, packs, boxes, seed, out_path):
+    engine = load_engine(pack_id, seed)
+    out = open(out_path, "w", encoding="utf-8") if out_path else sys.stdout
+    try:
+        for i in range(packs):
+            out.write(json.dumps(engine.pack_record(i, engine.open_pack()), ensure_ascii=False) + "\n")
+        for i in range(boxes):
+            out.write(json.dumps(engine.box_record(i, *engine.open_box()), ensure_ascii=False) + "\n")
+    finally:
+        if out_path:
+            out.close()
+    if out_path:
+        print(f"💾 {pack_id}：{packs} 包 + {boxes} 盒 → {out_path}")
+
+
+def cmd_golden(pack_ids):
+    config, rarity_order = pack_rules.load_ocg_config(), pack_rules.load_rarity_order()
+    for pack_id in pack_ids:
+        start = time.time()
+        engine = DrawEngine(pack_rules.find_pack(config, pack_id), config, rarity_order, GOLDEN_SEED)
+        golden = build_golden(engine)
+        write_golden(golden)
+        print(f"💾 {pack_id}：{GOLDEN_PACKS:,} 包 + {GOLDEN_BOXES:,} 盒（{time.time() - start:.1f} 秒）"
+              f"→ {os.path.relpath(golden_path(pack_id), pack_rules.ROOT_DIR)}")
+
+
+def cmd_check_golden(pack_ids):
+    """用黄金文件中的种子重跑参考引擎，计数必须完全一致"""
+    config, rarity_order = pack_rules.load_ocg_config(), pack_rules.load_rarity_order()
+    failed = False
+    for pack_id in pack_ids:
+        golden = load_golden(pack_id)
+        if golden is None:
+            print(f"⚠️ {pack_id}：没有黄金文件，运行 --golden 生成")
+            continue
+        engine = DrawEngine(pack_rules.find_pack(config, pack_id), config, rarity_order, golden["seed"])
+        if engine.fingerprint() != golden["fingerprint"]:
+            print(f"⚠️ {pack_id}：卡包配置或卡池已修改（指纹不同），运行 --golden {pack_id} 重新生成")
+            continue
+        packs = golden["pack"]["units"] if "pack" in golden else 0
+        boxes = golden["box"]["units"] if "box" in golden else 0
+        result = count_units(engine, packs, boxes)
+        mismatched = [k for k in ("pack", "box") if result.get(k) != golden.get(k)]
+        if mismatched:
+            failed = True
+            print(f"❌ {pack_id}：{'、'.join(mismatched)} 统计与黄金文件不一致（参考引擎的抽卡结果改变了）")
+        else:
+            print(f"✅ {pack_id}：与黄金文件完全一致")
+    return not failed
+
+
+def cmd_compare(path):
+    """检验 JSONL 开包结果与黄金文件同分布"""
+    observed = count_jsonl(path)
+    failed = False
+    for pack_id, units in observed.items():
+        golden = load_golden(pack_id)
+        if golden is None:
+            print(f"⚠️ {pack_id}：没有黄金文件，跳过")
+            continue
+        print(f"\n🎲 {pack_id}")
+        for unit_type, counts in units.items():
+            if unit_type not in golden:
+                print(f"  ⚠️ 黄金文件中没有{'单包' if unit_type == 'pack' else '整盒'}统计，跳过")
+                continue
+            tests, notes = compare_counts(golden[unit_type], counts)
+            print(f"  {'单包' if unit_type == 'pack' else '整盒'} × {counts['units']:,}"
+                  f"（黄金文件 {golden[unit_type]['units']:,}）")
+            for name, p, dof in tests:
+                ok = p >= P_FAIL
+                failed = failed or not ok
+                print(f"    {'✅' if ok else '❌'} {name:<16} p={p:.4g}（自由度 {dof}）")
+            for note in notes:
+                print(f"    ⚠️ {note}")
+    print(f"\n{'❌ 存在分布不一致的检验项' if failed else '✅ 所有检验项通过'}（p < {P_FAIL:g} 判为不一致）")
+    return not failed
+
+
+def cmd_bench(pack_ids):
+    config, rarity_order = pack_rules.load_ocg_config(), pack_rules.load_rarity_order()
+    print(f"{'卡包':<12}{'方案':<14}{'单包 包/秒':>14}{'整盒 包/秒':>14}")
+    for pack_id in pack_ids:
+        engine = DrawEngine(pack_rules.find_pack(config, pack_id), config, rarity_order, 1)
+        rates = []
+        for opener, packs_per_unit in ((engine.open_pack, 1), (engine.open_box, engine.box_size())):
+            units = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < BENCH_SECONDS:
+                for _ in range(100):
+                    opener()
+                units += 100
+            rates.append(units * packs_per_unit / (time.perf_counter() - start))
+        print(f"{pack_id:<12}{engine.rules['scheme']:<14}{rates[0]:>14,.0f}{rates[1]:>14,.0f}")
+
+
+def main():
+    args = sys.argv[1:]
+    options = {"--packs": 0, "--boxes": 0, "--seed": None, "--out": None, "--compare": None}
+    for name in list(options):
+        if name in args:
+            idx = args.index(name)
+            value = args[idx + 1]
+            options[name] = value if name in ("--out", "--compare") else int(value)
+            del args[idx:idx + 2]
+    pack_ids = [a for a in args if not a.startswith("--")]
+
+    config = pack_rules.load_ocg_config()
+    unknown = [p for p in pack_ids if pack_rules.find_pack(config, p) is None]
+    if unknown:
+        print(f"❌ 找不到卡包：{', '.join(unknown)}")
+        sys.exit(1)
+    all_packs = pack_ids or [p["packId"] for p in config.get("packs", []) if p.get("cardFile")]
+
+    try:
+        if options["--compare"]:
+            sys.exit(0 if cmd_compare(options["--compare"]) else 1)
+        if "--golden" in args:
+            cmd_golden(all_packs)
+        elif "--check-golden" in args:
+            sys.exit(0 if cmd_check_golden(all_packs) else 1)
+        elif "--bench" in args:
+            cmd_bench(all_packs)
+        else:
+            if len(pack_ids) != 1 or not (options["--packs"] or options["--boxes"]):
+                print("用法：python tools/draw_engine.py <packId> --packs N [--boxes N] [--seed S] [--out 文件]")
+                sys.exit(1)
+            cmd_draw(pack_ids[0], options["--packs"], options["--boxes"], options["--seed"], options["--out"])
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+卡图本地镜像工具（通用版，适用于任意配置了本地图片的卡包）
+读取 data/ocg/packs.json 中同时配置了 imageMapFile 和 localImagesDir 的卡包，
+把映射表中所有 metaId / altMetaId 的 _w200（小图）和 _w420（大图）下载到对应的 localImagesDir。
+
+【特性】
+  - 并发下载，请求速率受 fetcher.py 的按域名限流约束（CDN 300ms）
+  - 卡图不写入 .http_cache/（本地镜像本身就是缓存，不必在磁盘上再存一份）
+  - 先写临时文件 {文件名}.part，校验通过后原子替换，中断不会留下半个文件
+  - 校验 WebP 文件头（RIFF....WEBP）和 RIFF 声明的长度，截断的文件会被识别并重新下载
+  - 每个图片目录维护 .mirror_manifest.json（文件大小 + SHA-256），
+    重新运行时只检查文件大小，只有缺失/变化的文件才会下载（--verify 时重新计算哈希）
+
+用法：
+  cd YGOCardGame
+  python tools/mirror_images.py                  # 所有配置了本地图片的卡包
+  python tools/mirror_images.py ocg_loch         # 只处理指定卡包
+  python tools/mirror_images.py --jobs 8         # 并发数（默认 4）
+  python tools/mirror_images.py --verify         # 重新计算所有已有文件的哈希
+  python tools/mirror_images.py --offline        # 不访问网络，只检查本地文件（缺失的文件计为失败）
+"""
+
+import hashlib
+import json
+import os
+import struct
+import sys
+from datetime import datetime
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT_DIR)
+from fetcher import FetchError, apply_offline_flag, get_fetcher
+
+# 配置
+CDN_BASE = "https://s3.duellinksmeta.com/cards"
+SIZES = ["_w200", "_w420"]
+OCG_PACKS_PATH = os.path.join(ROOT_DIR, "data", "ocg", "packs.json")
+IMAGE_MAP_DIR = os.path.join(ROOT_DIR, "data", "ocg")  # imageMapFile 相对于此目录（与 js/api.js 一致）
+MANIFEST_NAME = ".mirror_manifest.json"
+MIRROR_MAX_WORKERS = 4
+# 内容寻址卡图仓库（tools/build_image_store.py）：{SHA-256 前 16 位}.webp
+STORE_DIR = os.path.join(ROOT_DIR, "data", "images", "store")
+STORE_HASH_LENGTH = 16
+
+
+def load_mirror_packs(pack_ids=None):
+    """返回需要镜像的卡包配置（同时配置了 imageMapFile 和 localImagesDir）"""
+    with open(OCG_PACKS_PATH, "r", encoding="utf-8") as f:
+        packs = json.load(f).get("packs", [])
+    result = []
+    for pack in packs:
+        if pack_ids and pack.get("packId") not in pack_ids:
+            continue
+        if pack.get("imageMapFile") and pack.get("localImagesDir"):
+            result.append(pack)
+    return result
+
+
+def collect_meta_ids(map_path):
+    """从卡图映射表中收集所有 metaId / altMetaId（去重）"""
+    with open(map_path, "r", encoding="utf-8") as f:
+        cards = json.load(f).get("cards", {})
+    meta_ids = set()
+    for info in cards.values():
+        if info.get("metaId"):
+            meta_ids.add(info["metaId"])
+        # altMetaId（OF 超框卡图）
+        for alt_id in (info.get("altMetaId") or {}).values():
+            if alt_id:
+                meta_ids.add(alt_id)
+    return meta_ids
+
+
+def check_webp(data):
+    """校验 WebP 文件头和 RIFF 声明的长度，返回错误说明；正常返回 None"""
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WEBP":
+        return "不是 WebP 文件"
+    riff_size = struct.unpack("<I", data[4:8])[0] + 8
+    if riff_size != len(data):
+        return f"文件不完整（声明 {riff_size} 字节，实际 {len(data)} 字节）"
+    return None
+
+
+def load_manifest(image_dir):
+    path = os.path.join(image_dir, MANIFEST_NAME)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {"_说明": "卡图镜像清单（tools/mirror_images.py 自动生成）—— 文件名 → 大小 + SHA-256", "files": {}}
+
+
+def save_manifest(image_dir, manifest):
+    manifest = {
+        "_说明": manifest.get("_说明", ""),
+        "_更新时间": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "files": dict(sorted(manifest["files"].items())),
+    }
+    path = os.path.join(image_dir, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def file_entry(data):
+    return {"size": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+
+
+def store_path(sha256):
+    """内容在卡图仓库中的路径"""
+    return os.path.join(STORE_DIR, sha256[:STORE_HASH_LENGTH] + ".webp")
+
+
+def local_image_path(image_dir, filename, mirror_files):
+    """卡包目录中某个镜像文件的本地路径；已被 build_image_store.py --prune 移入仓库时返回仓库中的文件，都没有返回 None"""
+    path = os.path.join(image_dir, filename)
+    if os.path.exists(path):
+        return path
+    entry = mirror_files.get(filename)
+    if entry and os.path.exists(store_path(entry["sha256"])):
+        return store_path(entry["sha256"])
+    return None
+
+
+def is_up_to_date(path, entry, verify=False):
+    """
+    判断本地文件是否完好：默认只比较文件大小与清单记录（O(1)）；
+    verify=True 或清单中没有记录时读取文件，校验 WebP 头并计算哈希
+    文件已被 build_image_store.py --prune 移入卡图仓库时同样视为完好
+    返回 (是否完好, 新的清单记录)
+    """
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        if entry and os.path.exists(store_path(entry["sha256"])):
+            return True, entry
+        return False, None
+    if entry and not verify:
+        return size == entry["size"], entry
+    with open(path, "rb") as f:
+        data = f.read()
+    if check_webp(data):
+        return False, None
+    new_entry = file_entry(data)
+    if entry and verify and new_entry["sha256"] != entry["sha256"]:
+        return False, None
+    return True, new_entry
+
+
+def download_image(job):
+    """下载一个文件：写入临时文件，校验通过后原子替换；返回 (清单记录, 错误说明)"""
+    url, path = job
+    try:
+        resp = get_fetcher().get(url, cache=False)
+    except FetchError as e:
+        return None, str(e)
+    if not resp.ok:
+        return None, f"HTTP {resp.status}"
+    error = check_webp(resp.body)
+    if error:
+        return None, error
+    tmp_path = path + ".part"
+    with open(tmp_path, "wb") as f:
+        f.write(resp.body)
+    os.replace(tmp_path, path)
+    return file_entry(resp.body), None
+
+
+def mirror_pack(pack, max_workers=MIRROR_MAX_WORKERS, verify=False):
+    """镜像一个卡包的卡图，返回 (下载数, 跳过数, 失败数, 下载字节数)"""
+    map_path = os.path.join(IMAGE_MAP_DIR, pack["imageMapFile"])
+    image_dir = os.path.join(ROOT_DIR, pack["localImagesDir"])
+    meta_ids = collect_meta_ids(map_path)
+    os.makedirs(image_dir, exist_ok=True)
+
+    # 清理上次中断留下的临时文件
+    for name in os.listdir(image_dir):
+        if name.endswith(".part"):
+            os.remove(os.path.join(image_dir, name))
+
+    manifest = load_manifest(image_dir)
+    files = manifest["files"]
+    wanted = {f"{meta_id}{size}.webp" for meta_id in meta_ids for size in SIZES}
+
+    print(f"\n📦 {pack['packId']} ({pack.get('packName', '')})")
+    print(f"   映射表: {pack['imageMapFile']} | metaId: {len(meta_ids)} | 文件: {len(wanted)}")
+    print(f"   输出目录: {os.path.abspath(image_dir)}")
+
+    jobs = []
+    skipped = 0
+    for filename in sorted(wanted):
+        path = os.path.join(image_dir, filename)
+        ok, entry = is_up_to_date(path, files.get(filename), verify)
+        if ok:
+            files[filename] = entry
+            skipped += 1
+        else:
+            files.pop(filename, None)
+            jobs.append((f"{CDN_BASE}/{filename}", path))
+
+    # 映射表中已不存在的文件只从清单移除，不删除文件
+    for filename in list(files):
+        if filename not in wanted:
+            del files[filename]
+
+    print(f"   已完好: {skipped} | 需要下载: {len(jobs)}")
+
+    downloaded = 0
+    failed = 0
+    total_bytes = 0
+    try:
+        for done, ((url, path), (entry, error)) in enumerate(
+                get_fetcher().iter_many(jobs, download_image, max_workers), 1):
+            filename = os.path.basename(path)
+            if entry:
+                files[filename] = entry
+                downloaded += 1
+                total_bytes += entry["size"]
+                print(f"  [{done}/{len(jobs)}] ✓ {filename} ({entry['size'] / 1024:.1f} KB)")
+            else:
+                failed += 1
+                print(f"  [{done}/{len(jobs)}] ✗ {filename}: {error}")
+    finally:
+        # 中断时也保存已完成部分，下次只需下载剩余文件
+        save_manifest(image_dir, manifest)
+
+    return downloaded, skipped, failed, total_bytes
+
+
+def main(argv=None):
+    args = apply_offline_flag(sys.argv[1:] if argv is None else list(argv))
+    max_workers = MIRROR_MAX_WORKERS
+    if "--jobs" in args:
+        idx = args.index("--jobs")
+        max_workers = max(1, int(args[idx + 1]))
+        del args[idx:idx + 2]
+    verify = "--verify" in args
+    pack_ids = [a for a in args if not a.startswith("--")]
+
+    packs = load_mirror_packs(pack_ids)
+    if not packs:
+        print("⚠️ 没有找到同时配置了 imageMapFile 和 localImagesDir 的卡包")
+        return
+
+    print(f"🖼️ 卡图本地镜像：{len(packs)} 个卡包，尺寸 {', '.join(SIZES)}，并发 {max_workers}")
+    totals = [0, 0, 0, 0]
+    for pack in packs:
+        for i, value in enumerate(mirror_pack(pack, max_workers, verify)):
+            totals[i] += value
+
+    downloaded, skipped, failed, total_bytes = totals
+    print()
+    print(f"✅ 镜像完成!")
+    print(f"   下载: {downloaded}")
+    print(f"   跳过(已完好): {skipped}")
+    print(f"   失败: {failed}")
+    print(f"   下载大小: {total_bytes / 1024 / 1024:.1f} MB")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,890 @@
+#!/usr/bin/env python3
+"""
+卡包出率精确计算器（解析解）
+按 data/ocg/packs.json 的配置和卡包文件，直接推导 js/game.js 抽卡规则下的精确概率（不做随机模拟）：
+  - 每张卡每个稀有度版本的每包 / 每盒期望张数，各稀有度每包 / 每盒至少 1 张的概率
+  - 集齐全部卡（任意版本）、每个稀有度、全部版本的期望包数，以及按卡包 price / currency 折算的期望花费
+  - 核对卡包配置中 _说明 等文档字段里写的数字（如 "1/2160"、"36/144(25%)"、"1SER+1UTR+3UR+6SR+19R=30包"）
+每个卡包只需几毫秒，适合修改配置后快速核对；稀有事件（如 GMR-OF）也能得到精确值，模拟器难以覆盖。
+
+【计算方法】
+  N 卡位（按权重不放回抽取）：同权重的卡可以互换，按"每类已抽几张"做动态规划，得到每类张数的精确分布
+  非 N 位 / 4 号位"排除已选卡后等概率"：对与已选卡重叠的张数分布求期望
+  LOCH 整盒 4 号位编号去重：版本组合相同的卡可以互换，按"剩余卡位 + 每组已用张数"做动态规划
+  规则参数由 tools/pack_rules.py 解析，与 tools/simulate_packs.py 使用同一套规则，可用模拟结果交叉验证
+
+【近似】
+  集齐期望包数：把每包是否出现某张卡（版本）视为相互独立（忽略同包内卡位之间的相关性），误差远小于 1 包
+  单卡"每包出现概率"取期望张数（ocg_default / loch_special 同包内同一版本最多出现 1 次，仅兜底分支例外）
+
+用法：
+  cd YGOCardGame
+  python tools/pack_odds.py                    # 所有 OCG 卡包
+  python tools/pack_odds.py ocg_loch           # 只计算指定卡包
+  python tools/pack_odds.py --cards            # 列出每张卡每个稀有度版本的出率
+  python tools/pack_odds.py --check            # 只核对文档字段中的数字，有不一致时退出码为 1
+  python tools/pack_odds.py --json odds.json   # 结果写入 JSON
+"""
+
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import pack_rules
+from pack_rules import (SCHEME_OCG, SCHEME_LOCH, LEGACY_RARE_KEYS, LOCH_FIXED_SLOTS,
+                        OCG_BOX_SLOT_KEYS, LOCH_BOX_SLOT_KEYS, CardPools, slot_count, format_odds)
+
+# 配置
+COLLECT_GRID = 1000          # 集齐期望包数的数值积分点数（对数坐标 Simpson）
+CLAIM_REL_TOLERANCE = 0.005  # 文档中 "1/2160" 这类概率与计算值的相对误差上限
+
+
+def normalize(items):
+    """[(键, 权重)] → [(键, 概率)]，与前端转盘写法一致（总权重为 0 时取最后一项）"""
+    items = [(k, w) for k, w in items if isinstance(w, (int, float)) and not isinstance(w, bool)]
+    total = sum(w for _, w in items if w > 0)
+    if not items:
+        return []
+    if total <= 0:
+        return [(items[-1][0], 1.0)]
+    return [(k, w / total) for k, w in items if w > 0]
+
+
+def new_unit():
+    """一个抽取单位（包/盒）的结果：每张卡每个版本的期望张数、每个稀有度完全不出现的概率"""
+    return {"cards": defaultdict(float), "absent": {}}
+
+
+def combine(units):
+    """相互独立的单位合并（如一盒中给定封入分配后的各包）"""
+    result = new_unit()
+    for unit in units:
+        for key, value in unit["cards"].items():
+            result["cards"][key] += value
+        for label, p in unit["absent"].items():
+            result["absent"][label] = result["absent"].get(label, 1.0) * p
+    return result
+
+
+def mix(branches):
+    """按概率混合多个单位（如整盒是否出了 PSER 的两种情况）"""
+    result = new_unit()
+    labels = set()
+    for _, unit in branches:
+        labels.update(unit["absent"])
+    for p, unit in branches:
+        for key, value in unit["cards"].items():
+            result["cards"][key] += p * value
+    for label in labels:
+        result["absent"][label] = sum(p * unit["absent"].get(label, 1.0) for p, unit in branches)
+    return result
+
+
+def sequential_draws(classes, k):
+    """
+    按权重不放回抽 k 次（同类的卡权重相同、可以互换），返回 {每类已抽张数: 概率}
+    classes 为 [(张数, 权重, 阶段)]：先在阶段 0 的卡中抽，阶段 0 抽完后才在阶段 1 中等概率抽（N 卡池不足时从 R 卡池补充）
+    """
+    states = {tuple(0 for _ in classes): 1.0}
+    for _ in range(k):
+        nxt = defaultdict(float)
+        for m, p in states.items():
+            weights = [0.0] * len(classes)
+            for stage in (0, 1):
+                weights = [w * (size - m[c]) if s == stage else 0.0
+                           for c, (size, w, s) in enumerate(classes)]
+                if sum(weights) > 0:
+                    break
+            total = sum(weights)
+            if total <= 0:
+                nxt[m] += p
+                continue
+            for c, w in enumerate(weights):
+                if w > 0:
+                    nxt[m[:c] + (m[c] + 1,) + m[c + 1:]] += p * w / total
+        states = nxt
+    return states
+
+
+def hypergeom(population, marked, draws):
+    """从 population 张中不放回抽 draws 张，其中 marked 张被标记，返回 {抽中标记张数: 概率}"""
+    if draws > population:
+        draws = population
+    total = math.comb(population, draws)
+    return {u: math.comb(marked, u) * math.comb(population - marked, draws - u) / total
+            for u in range(max(0, draws - (population - marked)), min(marked, draws) + 1)}
+
+
+class OddsModel(CardPools):
+    """一个卡包的卡池和规则，以及各抽卡方案的精确概率"""
+
+    def __init__(self, pack, config, rarity_order):
+        super().__init__(pack, config)
+        self.rarity_order = rarity_order
+        self.notes = []
+
+    # ---------- 卡池查询 ----------
+
+    def resolve_version(self, card):
+        """resolveCardVersion：[(版本, 概率)]"""
+        versions = self.cards[card]["rarityVersions"]
+        if len(versions) <= 1:
+            return [(versions[0], 1.0)]
+        odds = self.rules["versionOdds"]
+        weights = [pack_rules.version_weight(odds, v) for v in versions]
+        total = sum(weights)
+        result = defaultdict(float)
+        for v, w in zip(versions, weights):
+            result[v] += w / total
+        return list(result.items())
+
+    def sort_labels(self, labels):
+        return sorted(labels, key=lambda c: (self.rarity_order.get(c, 0), c))
+
+    # ---------- ocg_default ----------
+
+    def _n_slot_classes(self, split=frozenset(), excluded=None, r_fill=False):
+        """
+        N 卡位的卡分类：[(成员, 权重, 阶段, 标签)]
+        按 N/NR 和是否属于 split（需要单独统计重叠张数的卡）细分；r_fill 时加入 R 卡池作为补充阶段
+        """
+        nr_ratio = self.rules["nrWeightRatio"]
+        groups = defaultdict(list)
+        for i in self.n_pool:
+            if i == excluded:
+                continue
+            label = "NR" if i in self.nr_cards else "N"
+            groups[(label, i in split, 0)].append(i)
+        if r_fill:
+            for i in self.base_pool("R"):
+                groups[("R", i in split, 1)].append(i)
+        classes = []
+        for (label, in_split, stage), members in sorted(groups.items()):
+            weight = nr_ratio if label == "NR" else 1.0
+            classes.append((members, weight, stage, label, in_split))
+        return classes
+
+    def _n_slot_draws(self, n_count, split=frozenset(), excluded=None, r_fill=False):
+        classes = self._n_slot_classes(split, excluded, r_fill)
+        states = sequential_draws([(len(m), w, s) for m, w, s, _, _ in classes], n_count)
+        return classes, states
+
+    @staticmethod
+    def _n_slot_unit(classes, states):
+        """N 卡位的期望张数和各标签不出现的概率"""
+        unit = new_unit()
+        for c, (members, _, _, label, _) in enumerate(classes):
+            mean = sum(p * m[c] for m, p in states.items())
+            for i in members:
+                unit["cards"][(i, label)] += mean / len(members)
+            absent = sum(p for m, p in states.items()
+                         if all(m[d] == 0 for d, cls in enumerate(classes) if cls[3] == label))
+            unit["absent"][label] = absent
+        return unit
+
+    @staticmethod
+    def _uniform_excluding(candidates, classes, states, allow_dup):
+        """
+        N 卡位抽完后，从 candidates 中排除已选卡等概率选一张，返回 {卡: 概率}
+        classes 需按 candidates 细分（in_split）；全部候选都已被选时 allow_dup 则在全部候选中等概率选
+        """
+        total = len(candidates)
+        in_split = {}
+        for c, (members, _, _, _, split) in enumerate(classes):
+            if split:
+                for i in members:
+                    in_split[i] = c
+        free = 0.0
+        kept = defaultdict(float)
+        all_used = 0.0
+        for m, p in states.items():
+            used = sum(m[c] for c, cls in enumerate(classes) if cls[4])
+            if used >= total:
+                all_used += p
+                continue
+            free += p / (total - used)
+            for c, cls in enumerate(classes):
+                if cls[4]:
+                    kept[c] += p * (len(cls[0]) - m[c]) / len(cls[0]) / (total - used)
+        result = {}
+        for i in candidates:
+            prob = kept[in_split[i]] if i in in_split else free
+            if allow_dup:
+                prob += all_used / total
+            result[i] = prob
+        return result
+
+    def ocg_pack(self):
+        """drawCards_OCG"""
+        rules = self.rules
+        n_count = max(rules["cardsPerPack"] - 1, 0)
+        if n_count > len(self.n_pool) and self.base_pool("R"):
+            self.notes.append("N 卡池不足，单包 N 卡位会从 R 卡池补充")
+        classes, states = self._n_slot_draws(n_count, r_fill=True)
+        unit = self._n_slot_unit(classes, states)
+
+        items = normalize(pack_rules.weight_items(rules["boxRarityDistribution"]))
+        targets = []
+        for name, p in items:
+            if name == "SER":
+                targets += [("SER", p * (1 - rules["boxPSERChance"])), ("PSER", p * rules["boxPSERChance"])]
+            else:
+                targets.append((name, p))
+
+        rare_label = defaultdict(float)
+        for name, p in targets:
+            if p <= 0:
+                continue
+            cand = self.candidates(name)
+            if cand:
+                classes_t, states_t = self._n_slot_draws(n_count, frozenset(cand), r_fill=True)
+                for i, q in self._uniform_excluding(cand, classes_t, states_t, True).items():
+                    unit["cards"][(i, name)] += p * q
+                rare_label[name] += p
+            elif self.non_n:
+                # 数据兜底：从所有非 N 卡中选一张（排除 N 位已选），按 versionOdds 决定版本
+                classes_t, states_t = self._n_slot_draws(n_count, frozenset(self.non_n), r_fill=True)
+                for i, q in self._uniform_excluding(self.non_n, classes_t, states_t, False).items():
+                    for version, v in self.resolve_version(i):
+                        unit["cards"][(i, version)] += p * q * v
+                        rare_label[version] += p * q * v
+        for label, p in rare_label.items():
+            unit["absent"][label] = unit["absent"].get(label, 1.0) * (1 - p)
+        return unit
+
+    def _ocg_box_pack(self, target, n_count):
+        """drawCardsBox_OCG 中目标稀有度为 target 的一包"""
+        # 非 N 位：[(卡, 版本, 概率)]
+        rare = []
+        cand = self.candidates(target)
+        if cand:
+            rare = [(i, target, 1 / len(cand)) for i in cand]
+        else:
+            pool = self.base_pool(target) or self.non_n
+            for i in pool:
+                rare += [(i, v, q / len(pool)) for v, q in self.resolve_version(i)]
+
+        unit = new_unit()
+        rare_label = defaultdict(float)
+        n_pool = set(self.n_pool)
+        by_excluded = defaultdict(list)
+        for i, v, q in rare:
+            unit["cards"][(i, v)] += q
+            rare_label[v] += q
+            by_excluded[i if i in n_pool else None].append((v, q))
+
+        # N 卡位：排除本包的非 N 卡（只有它本身属于 N 卡池时才影响）
+        labels = set(rare_label)
+        n_units = []
+        for excluded, rows in by_excluded.items():
+            weight = sum(q for _, q in rows)
+            classes, states = self._n_slot_draws(n_count, excluded=excluded)
+            n_unit = self._n_slot_unit(classes, states)
+            labels.update(n_unit["absent"])
+            n_units.append((weight, n_unit, rows))
+        if not rare:
+            classes, states = self._n_slot_draws(n_count)
+            n_unit = self._n_slot_unit(classes, states)
+            labels.update(n_unit["absent"])
+            n_units.append((1.0, n_unit, []))
+
+        for weight, n_unit, rows in n_units:
+            for key, value in n_unit["cards"].items():
+                unit["cards"][key] += weight * value
+        for label in labels:
+            absent = 0.0
+            for weight, n_unit, rows in n_units:
+                miss = 1 - sum(q for v, q in rows if v == label) / weight if rows else 1.0
+                absent += weight * miss * n_unit["absent"].get(label, 1.0)
+            unit["absent"][label] = absent
+        return unit
+
+    def ocg_box(self):
+        """drawCardsBox_OCG + 辅助包"""
+        rules = self.rules
+        slots = self.box_slots()
+        n_count = (rules["cardsPerPack"] or 5) - 1
+        cache = {}
+
+        def pack_unit(target):
+            if target not in cache:
+                cache[target] = self._ocg_box_pack(target, n_count)
+            return cache[target]
+
+        ser_slots = slots.count("SER")
+        p_pser = 1 - (1 - rules["boxPSERChance"]) ** ser_slots if ser_slots else 0.0
+        branches = []
+        if p_pser < 1:
+            branches.append((1 - p_pser, combine([pack_unit(t) for t in slots] + [self.bonus_unit(False)])))
+        if p_pser > 0:
+            pser_slots = list(slots)
+            pser_slots[pser_slots.index("SER")] = "PSER"
+            branches.append((p_pser, combine([pack_unit(t) for t in pser_slots] + [self.bonus_unit(True)])))
+        return mix(branches)
+
+    # ---------- loch_special ----------
+
+    def _loch_slots123(self):
+        """1、2 号位为两张不同的基础 SR 卡，3 号位为一张基础 UR 卡（LOCH_FIXED_SLOTS）"""
+        unit = new_unit()
+        for rarity, count in LOCH_FIXED_SLOTS:
+            pool = self.base_pool(rarity)
+            drawn = min(count, len(pool))
+            for i in pool:
+                unit["cards"][(i, rarity)] += drawn / len(pool)
+            unit["absent"][rarity] = 0.0 if drawn else 1.0
+        return unit
+
+    def _loch_slot4_targets(self):
+        """4 号位目标稀有度的概率：boxSlot4Distribution，OF 再按 ofTypeOdds 拆开"""
+        targets = []
+        of_types = normalize(pack_rules.weight_items(self.rules["ofTypeOdds"]))
+        for name, p in normalize(pack_rules.weight_items(self.rules["boxSlot4Distribution"])):
+            if name == "OF":
+                targets += [(of_name, p * q) for of_name, q in of_types]
+            else:
+                targets.append((name, p))
+        return targets
+
+    def loch_pack(self):
+        """drawCards_LOCH"""
+        unit = self._loch_slots123()
+        used_by = {rarity: (self.base_pool(rarity), count) for rarity, count in LOCH_FIXED_SLOTS}
+        slot4_label = defaultdict(float)
+        for name, p in self._loch_slot4_targets():
+            cand = self.candidates(name)
+            if not cand:
+                # 极端兜底：全卡池随机一张 SER
+                for i in range(self.n):
+                    unit["cards"][(i, "SER")] += p / self.n
+                slot4_label["SER"] += p if self.n else 0.0
+                continue
+            slot4_label[name] += p
+            pool, draws = used_by.get(name, ([], 0))
+            for i, q in self._uniform_excluding_subset(cand, pool, min(draws, len(pool))).items():
+                unit["cards"][(i, name)] += p * q
+        for label, p in slot4_label.items():
+            unit["absent"][label] = unit["absent"].get(label, 1.0) * (1 - p)
+        return unit
+
+    @staticmethod
+    def _uniform_excluding_subset(candidates, pool, draws):
+        """
+        pool 中等概率选出 draws 张不同的卡后，从 candidates 中排除这些卡等概率选一张（都被选过时在全部候选中选）
+        返回 {卡: 概率}
+        """
+        total = len(candidates)
+        if not draws:
+            return {i: 1 / total for i in candidates}
+        pool_set = set(pool)
+        overlap = sum(1 for i in candidates if i in pool_set)
+        free = sum(p / (total - u) for u, p in hypergeom(len(pool), overlap, draws).items() if u < total)
+        all_used = hypergeom(len(pool), overlap, draws).get(total, 0.0)
+        kept = 0.0
+        if overlap:
+            # 该卡未被选中时，其余重叠卡被选中张数的分布
+            kept = (1 - draws / len(pool)) * sum(
+                p / (total - u) for u, p in hypergeom(len(pool) - 1, overlap - 1, draws).items())
+        return {i: (kept if i in pool_set else free) + all_used / total for i in candidates}
+
+    def loch_box(self):
+        """drawCardsBox_LOCH + 辅助包"""
+        dist = self.rules["boxSlot4Distribution"]
+        kinds = [k for k in LOCH_BOX_SLOT_KEYS if slot_count(dist.get(k))]
+        counts = tuple(slot_count(dist.get(k)) for k in kinds)
+        packs = sum(counts)
+        of_types = normalize(pack_rules.weight_items(self.rules["ofTypeOdds"]))
+
+        # 版本组合相同的卡可以互换
+        groups = defaultdict(list)
+        for i in range(self.n):
+            groups[frozenset(self.version_sets[i])].append(i)
+        group_list = list(groups.items())
+        sizes = [len(members) for _, members in group_list]
+
+        holders = {label: [g for g, (versions, _) in enumerate(group_list) if label in versions]
+                   for label in kinds + [k for k, _ in of_types]}
+        slot_labels = [of_types if kind == "OF" else [(kind, 1.0)] for kind in kinds]
+
+        fixed = {rarity for rarity, _ in LOCH_FIXED_SLOTS}
+        if any(label in fixed for label in kinds + [k for k, _ in of_types]):
+            self.notes.append("4 号位目标含 SR/UR，整盒计算忽略了 4 号位与 1~3 号位的包内去重（近似）")
+
+        # 每类卡位的 [(稀有度, 概率, 持有该版本的组)]
+        slot_targets = [[(label, q, holders[label]) for label, q in slot_labels[k]] for k in range(len(kinds))]
+
+        # 状态：(剩余各类卡位数, 每组已用于 4 号位的张数)，每包 4 号位类型在剩余卡位中等概率（洗牌）
+        expected = defaultdict(float)
+        states = {(counts, tuple(0 for _ in group_list)): 1.0}
+        for _ in range(packs):
+            nxt = defaultdict(float)
+            for (remaining, used), p in states.items():
+                left = sum(remaining)
+                for k, n_left in enumerate(remaining):
+                    if not n_left:
+                        continue
+                    rest = remaining[:k] + (n_left - 1,) + remaining[k + 1:]
+                    p_kind = p * n_left / left
+                    for label, q, gs in slot_targets[k]:
+                        pq = p_kind * q
+                        if not gs:
+                            nxt[(rest, used)] += pq
+                            continue
+                        total = 0
+                        for g in gs:
+                            total += sizes[g] - used[g]
+                        if total:
+                            pq /= total
+                            for g in gs:
+                                a = sizes[g] - used[g]
+                                if a:
+                                    expected[(g, label)] += pq * a
+                                    nxt[(rest, used[:g] + (used[g] + 1,) + used[g + 1:])] += pq * a
+                        else:
+                            # 放宽条件：忽略整盒编号去重
+                            total = sum(sizes[g] for g in gs)
+                            for g in gs:
+                                expected[(g, label)] += pq * sizes[g] / total
+                            nxt[(rest, used)] += pq
+            states = nxt
+
+        slot4 = new_unit()
+        for (g, label), value in expected.items():
+            for i in group_list[g][1]:
+                slot4["cards"][(i, label)] += value / sizes[g]
+        # 4 号位稀有度只由封入分配和 OF 类型决定，与选到哪张卡无关
+        for k, kind in enumerate(kinds):
+            if kind == "OF":
+                for label, q in of_types:
+                    if holders[label]:
+                        slot4["absent"][label] = slot4["absent"].get(label, 1.0) * (1 - q) ** counts[k]
+            elif holders[kind]:
+                slot4["absent"][kind] = 0.0
+
+        slots123 = self._loch_slots123()
+        return combine([slots123] * packs + [slot4, self.bonus_unit(False)])
+
+    # ---------- legacy ----------
+
+    def legacy_pack(self):
+        """drawCards_Legacy"""
+        rules = self.rules
+        slots = rules["cardsPerPack"]
+        items, usable = pack_rules.legacy_rate_items(rules["rarityRates"])
+
+        def slot_dist(weighted):
+            dist = defaultdict(float)
+            for name, p in weighted:
+                eff = self.legacy_rarity(name)
+                if eff:
+                    dist[eff] += p
+            return dist
+
+        normal = slots - 1 if rules["guaranteedRareSlot"] else slots
+        slot_dists = []
+        if normal > 0:
+            weighted = normalize(items) if usable and items else [("N", 1.0)]
+            slot_dists += [slot_dist(weighted)] * normal
+        if rules["guaranteedRareSlot"] and slots > 0:
+            rates = rules["rarityRates"]
+            rare = [(k, rates.get(k) or 0) for k in LEGACY_RARE_KEYS]
+            weighted = normalize(rare) if sum(w for _, w in rare) > 0 else [("R", 1.0)]
+            slot_dists.append(slot_dist(weighted))
+
+        unit = new_unit()
+        hit_miss = defaultdict(lambda: 1.0)
+        for dist in slot_dists:
+            for label, p in dist.items():
+                members = self.base_pool(label)
+                for i in members:
+                    unit["cards"][(i, label)] += p / len(members)
+                    hit_miss[(i, label)] *= 1 - p / len(members)
+                unit["absent"][label] = unit["absent"].get(label, 1.0) * (1 - p)
+        # 同一包可能抽到同一张卡多次：单包至少出现 1 次的概率单独记录
+        unit["hit"] = {key: 1 - miss for key, miss in hit_miss.items()}
+        return unit
+
+    # ---------- 整盒通用 ----------
+
+    def bonus_unit(self, has_pser):
+        """+1 辅助包：从辅助包卡池随机 1 张，原盒已出 PSER 时不再出 PSER"""
+        unit = new_unit()
+        if not self.supplement:
+            return unit
+        chance = 0.0 if has_pser else self.rules["bonusPSERChance"]
+        labels = defaultdict(float)
+        for s, card in enumerate(self.supplement):
+            versions = card["rarityVersions"]
+            p = 1 / len(self.supplement)
+            if len(versions) > 1 and "PSER" in versions:
+                parts = [(versions[0], p * (1 - chance)), ("PSER", p * chance)]
+            else:
+                parts = [(versions[0], p)]
+            for label, q in parts:
+                if q > 0:
+                    unit["cards"][(self.n + s, label)] += q
+                    labels[label] += q
+        unit["absent"] = {label: 1 - q for label, q in labels.items()}
+        return unit
+
+    def pack_unit(self):
+        return self.pack_method()()
+
+    def box_unit(self, pack_unit):
+        box_method = self.box_method()
+        if box_method:
+            return box_method()
+        # 非专用方案：逐包抽取 packsPerBox 包
+        if self.rules["scheme"] == SCHEME_LOCH:
+            self.notes.append("未配置 packsPerBox，开整盒时前端逐包抽取 30 包（不走 LOCH 整盒方案）")
+        packs = [{"cards": pack_unit["cards"], "absent": pack_unit["absent"]}] * self.rules["packsPerBox"]
+        return combine(packs + [self.bonus_unit(False)])
+
+
+# ---------- 集齐期望 ----------
+
+def expected_packs_to_collect(probs):
+    """
+    不等概率的集卡问题：每包独立地以概率 p_i 出现第 i 项，求集齐全部项的期望包数
+    E = Σ_{n≥0} [1 - Π(1 - (1-p_i)^n)] ≈ ∫_0^∞ [1 - Π(1 - e^{-λ_i t})] dt + 1/2（λ_i = -ln(1-p_i)）
+    概率相同的项合并计算，积分在对数坐标下用 Simpson 公式；有概率为 0 的项时返回 None（无法集齐）
+    """
+    if not probs:
+        return 0.0
+    if min(probs) <= 0:
+        return None
+    grouped = defaultdict(int)
+    for p in probs:
+        grouped[min(p, 1.0)] += 1
+    rates = [(-math.log1p(-p) if p < 1 else math.inf, c) for p, c in grouped.items()]
+    finite = [lam for lam, _ in rates if lam < math.inf]
+    if not finite:
+        return 1.0
+    lam_max, lam_min = max(finite), min(finite)
+    total = sum(c for _, c in rates)
+
+    def tail(t):
+        log_all = sum(c * math.log1p(-math.exp(-lam * t)) for lam, c in rates if lam < math.inf)
+        return -math.expm1(log_all)
+
+    lo = math.log(1e-6 / lam_max)
+    hi = math.log((math.log(total) + 40) / lam_min)
+    h = (hi - lo) / COLLECT_GRID
+    acc = 0.0
+    for j in range(COLLECT_GRID + 1):
+        u = lo + j * h
+        weight = 1 if j in (0, COLLECT_GRID) else (4 if j % 2 else 2)
+        acc += weight * tail(math.exp(u)) * math.exp(u)
+    return math.exp(lo) + acc * h / 3 + 0.5
+
+
+# ---------- 文档字段核对 ----------
+
+COMPOSITION_RE = re.compile(r"(\d+)([A-Za-z][A-Za-z\-]*)((?:\+\d+[A-Za-z][A-Za-z\-]*)+)(?:=(\d+)包)?")
+FRACTION_RE = re.compile(r"([A-Za-z][A-Za-z\-]*)=(\d+)/(\d+)\((\d+(?:\.\d+)?)%\)")
+SINGLE_PACK_RE = re.compile(r"散包([A-Za-z][A-Za-z\-]*)概率=([^。，,；;]*)")
+CHANCE_RE = re.compile(r"([A-Za-z]+)位(\d+(?:\.\d+)?)%变([A-Za-z]+)")
+NR_RATIO_RE = re.compile(r"普通N卡的(\d+(?:\.\d+)?)%")
+TOTAL_CARDS_RE = re.compile(r"(?:共|全)(\d+)(?:张卡|种)")
+PER_PACK_RE = re.compile(r"1包(\d+)张")
+PER_BOX_RE = re.compile(r"1盒(\d+)包")
+COMBO_RE = re.compile(r"(\d+)种([A-Za-z]+)有[^(（]*[(（]([A-Za-z/\-]+)[)）]")
+
+
+def doc_texts(table):
+    """产出卡包配置中的文档字段 (所在的 dict, 文本)，文档字段为以 _ 开头且含中文的键"""
+    for key, child in table.items():
+        if key.startswith("_") and not key.isascii() and isinstance(child, str):
+            yield table, child
+        elif isinstance(child, dict):
+            yield from doc_texts(child)
+
+
+def parse_probability(text):
+    """文档中的概率写法：取最后一个 "=" 之后的 1/2160、0.05%、0.0005 等"""
+    text = text.split("=")[-1].strip()
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)/(\d+(?:\.\d+)?)", text)
+    if m:
+        return float(m.group(1)) / float(m.group(2))
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)%", text)
+    if m:
+        return float(m.group(1)) / 100
+    m = re.fullmatch(r"\d+(?:\.\d+)?", text)
+    return float(text) if m else None
+
+
+def percent_matches(stated, value):
+    """按文档写出的小数位数比较百分比（25% 与 25.0% 的容差不同）"""
+    decimals = len(stated.split(".")[1]) if "." in stated else 0
+    return abs(float(stated) - value * 100) <= 0.5 * 10 ** -decimals + 1e-9
+
+
+def check_claims(model, result):
+    """核对卡包 _说明 等文档字段中的数字，返回 [{"text", "ok", "detail"}]"""
+    rules = model.rules
+    pack = model.pack
+    claims = []
+
+    def add(text, ok, detail):
+        claims.append({"text": text, "ok": bool(ok), "detail": detail})
+
+    if rules["scheme"] == SCHEME_OCG:
+        box_table, box_keys = rules["boxRarityDistribution"], OCG_BOX_SLOT_KEYS
+    elif rules["scheme"] == SCHEME_LOCH:
+        box_table, box_keys = rules["boxSlot4Distribution"], LOCH_BOX_SLOT_KEYS
+    else:
+        box_table, box_keys = {}, []
+    base_counts = defaultdict(int)
+    for b in model.base:
+        base_counts[b] += 1
+
+    for table, text in doc_texts(pack):
+        for m in COMPOSITION_RE.finditer(text):
+            parts = [(int(n), k) for n, k in re.findall(r"(\d+)([A-Za-z][A-Za-z\-]*)", m.group(0).split("=")[0])]
+            keys = [k for _, k in parts]
+            stated_total = int(m.group(4)) if m.group(4) else None
+            if all(k in box_keys for k in keys):
+                actual = {k: slot_count(box_table.get(k)) for k in box_keys}
+                wrong = [f"{k} 实际 {actual[k]}" for n, k in parts if actual[k] != n]
+                missing = [f"{k}={actual[k]}" for k in box_keys if actual[k] and k not in keys]
+                size = model.box_size()
+                if stated_total is not None and stated_total != size:
+                    wrong.append(f"合计实际 {size} 包")
+                if sum(n for n, _ in parts) != size:
+                    wrong.append(f"各项之和 {sum(n for n, _ in parts)} ≠ 每盒 {size} 包")
+                add(m.group(0), not wrong and not missing,
+                    "；".join(wrong + ([f"未写出 {', '.join(missing)}"] if missing else [])) or "与整盒封入分配一致")
+            elif all(k in base_counts or k in model.rarity_order for k in keys):
+                wrong = [f"{k} 实际 {base_counts.get(k, 0)} 种" for n, k in parts if base_counts.get(k, 0) != n]
+                add(m.group(0), not wrong, "；".join(wrong) or "与卡池基础稀有度张数一致")
+
+        for m in FRACTION_RE.finditer(text):
+            key, num, den, pct = m.group(1), int(m.group(2)), int(m.group(3)), m.group(4)
+            items = dict(pack_rules.weight_items(table))
+            total = sum(v for v in items.values() if isinstance(v, (int, float)))
+            wrong = []
+            if key not in items:
+                wrong.append(f"权重表中没有 {key}")
+            else:
+                if items[key] != num:
+                    wrong.append(f"{key} 权重实际为 {items[key]}")
+                if total != den:
+                    wrong.append(f"总权重实际为 {total}")
+            if not percent_matches(pct, num / den):
+                wrong.append(f"{num}/{den} = {num / den * 100:.4f}%")
+            add(m.group(0), not wrong, "；".join(wrong) or "与权重表一致")
+
+        for m in SINGLE_PACK_RE.finditer(text):
+            key = m.group(1)
+            stated = parse_probability(m.group(2))
+            rarity = result["pack"]["rarities"].get(key)
+            actual = rarity["atLeastOne"] if rarity else 0.0
+            if stated is None:
+                add(m.group(0), False, "无法解析概率写法")
+                continue
+            ok = abs(actual - stated) <= CLAIM_REL_TOLERANCE * stated
+            add(m.group(0), ok, f"计算值 {actual:.6g}（1/{1 / actual:,.1f}）" if actual else "计算值为 0")
+
+        for m in CHANCE_RE.finditer(text):
+            if m.group(1) == "SER" and m.group(3) == "PSER" and rules["scheme"] == SCHEME_OCG:
+                actual = rules["boxPSERChance"]
+                add(m.group(0), percent_matches(m.group(2), actual), f"boxPSERChance = {actual}")
+
+        for m in NR_RATIO_RE.finditer(text):
+            if rules["scheme"] == SCHEME_OCG:
+                actual = rules["nrWeightRatio"]
+                add(m.group(0), percent_matches(m.group(1), actual), f"nrWeightRatio = {actual}")
+
+        for m in TOTAL_CARDS_RE.finditer(text):
+            add(m.group(0), int(m.group(1)) == model.n, f"卡包文件共 {model.n} 张")
+
+        for m in PER_PACK_RE.finditer(text):
+            add(m.group(0), int(m.group(1)) == rules["cardsPerPack"], f"cardsPerPack = {rules['cardsPerPack']}")
+
+        for m in PER_BOX_RE.finditer(text):
+            add(m.group(0), int(m.group(1)) == model.box_size(), f"每盒 {model.box_size()} 包")
+
+        for m in COMBO_RE.finditer(text):
+            count, base, versions = int(m.group(1)), m.group(2), m.group(3).split("/")
+            actual = sum(1 for i in range(model.n)
+                         if model.base[i] == base and model.version_sets[i] == set(versions))
+            add(m.group(0), actual == count, f"卡包文件中 {actual} 种")
+    return claims
+
+
+# ---------- 结果整理 ----------
+
+def summarize(model, unit, per_pack):
+    """单位结果 → {"rarities": {稀有度: {mean, atLeastOne}}, "cards": [...]}"""
+    means = defaultdict(float)
+    for (_, label), value in unit["cards"].items():
+        means[label] += value
+    rarities = {}
+    for label in model.sort_labels(set(means) | set(unit["absent"])):
+        if means[label] <= 0:
+            continue
+        rarities[label] = {"mean": means[label], "atLeastOne": 1 - unit["absent"].get(label, 1.0)}
+
+    hit = unit.get("hit", {})
+    all_cards = model.cards + model.supplement
+    cards = []
+    for (c, label), value in sorted(unit["cards"].items(),
+                                    key=lambda kv: (kv[0][0], model.rarity_order.get(kv[0][1], 0))):
+        if value <= 0:
+            continue
+        card = all_cards[c]
+        entry = {"id": card["id"], "setNumber": card["setNumber"], "name": card["name"],
+                 "rarity": label, "bonus": c >= model.n, "mean": value}
+        if per_pack:
+            entry["atLeastOne"] = hit.get((c, label), min(value, 1.0))
+        cards.append(entry)
+    return {"rarities": rarities, "cards": cards}
+
+
+def collect_summary(model, pack_result):
+    """集齐期望：全部卡（任意版本）、每个稀有度版本、全部版本（单包购买，不含辅助包卡片）"""
+    per_version = {}
+    per_card = defaultdict(lambda: 1.0)
+    for card in pack_result["cards"]:
+        per_version[(card["setNumber"], card["id"], card["rarity"])] = card["atLeastOne"]
+        per_card[(card["setNumber"], card["id"])] *= 1 - card["atLeastOne"]
+    price = model.pack.get("price") or 0
+    rows = []
+
+    def add(name, probs, missing=0):
+        packs = None if missing else expected_packs_to_collect(probs)
+        rows.append({"target": name, "kinds": len(probs) + missing, "packs": packs,
+                     "cost": packs * price if packs is not None else None})
+
+    seen_cards = {(card["setNumber"], card["id"]) for card in model.cards}
+    add("全部卡（任意版本）", [1 - miss for miss in per_card.values()], len(seen_cards) - len(per_card))
+    for label in model.sort_labels({r for _, _, r in per_version}):
+        add(label, [p for (_, _, r), p in per_version.items() if r == label])
+    add("全部版本", list(per_version.values()))
+    return {"price": price, "currency": model.pack.get("currency") or "gold", "targets": rows}
+
+
+def compute(pack_id, config=None, rarity_order=None, include_box=True):
+    """
+    计算一个卡包的精确出率，返回 {"packId", "scheme", "notes", "boxSize", "pack", "box", "collect", "claims", "ms"}
+    include_box=False 时跳过整盒（"box" 为 None），LOCH 整盒的动态规划占了大部分耗时
+    供测试或其他脚本直接调用
+    """
+    config = config or pack_rules.load_ocg_config()
+    pack = pack_rules.find_pack(config, pack_id)
+    if pack is None:
+        raise ValueError(f"找不到卡包 {pack_id}")
+    start = time.perf_counter()
+    model = OddsModel(pack, config, rarity_order or pack_rules.load_rarity_order())
+    pack_unit = model.pack_unit()
+    result = {
+        "packId": pack_id,
+        "scheme": model.rules["scheme"],
+        "notes": model.notes,
+        "boxSize": model.box_size(),
+        "pack": summarize(model, pack_unit, True),
+        "box": summarize(model, model.box_unit(pack_unit), False) if include_box else None,
+    }
+    result["collect"] = collect_summary(model, result["pack"])
+    result["claims"] = check_claims(model, result)
+    result["ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+def print_claims(result):
+    for claim in result["claims"]:
+        icon = "✅" if claim["ok"] else "❌"
+        print(f"  {icon} 「{claim['text']}」 {claim['detail']}")
+
+
+def print_result(result, show_cards):
+    print(f"\n  {'稀有度':<8}{'每包张数':>12}{'单包至少 1 张':>16}{'':<14}{'每盒张数':>12}{'每盒至少 1 张':>16}")
+    box = result["box"]["rarities"]
+    for code in sorted(set(result["pack"]["rarities"]) | set(box),
+                       key=lambda c: list(result["pack"]["rarities"]).index(c)
+                       if c in result["pack"]["rarities"] else len(result["pack"]["rarities"])):
+        r = result["pack"]["rarities"].get(code, {"mean": 0.0, "atLeastOne": 0.0})
+        b = box.get(code, {"mean": 0.0, "atLeastOne": 0.0})
+        print(f"  {code:<10}{r['mean']:>12.6f}{r['atLeastOne'] * 100:>15.5f}%  {format_odds(r['atLeastOne']):<12}"
+              f"{b['mean']:>12.5f}{b['atLeastOne'] * 100:>15.4f}%")
+
+    if show_cards:
+        print(f"\n  {'编号':<14}{'稀有度':<9}{'单包出现率':>14}{'':<14}{'每盒张数':>10}  卡名")
+        box_means = {(c["setNumber"], c["id"], c["rarity"], c["bonus"]): c["mean"] for c in result["box"]["cards"]}
+        for card in sorted(result["box"]["cards"], key=lambda c: (c["bonus"], c["setNumber"])):
+            key = (card["setNumber"], card["id"], card["rarity"], card["bonus"])
+            pack_p = next((c["atLeastOne"] for c in result["pack"]["cards"]
+                           if (c["setNumber"], c["id"], c["rarity"], c["bonus"]) == key), 0.0)
+            tag = "（辅助包）" if card["bonus"] else ""
+            print(f"  {card['setNumber']:<14}{card['rarity']:<10}{pack_p:>14.7f}  {format_odds(pack_p):<12}"
+                  f"{box_means[key]:>10.5f}  {card['name']}{tag}")
+
+    collect = result["collect"]
+    print(f"\n  集齐期望（单包购买，每包 {collect['price']} {collect['currency']}）：")
+    for row in collect["targets"]:
+        if row["packs"] is None:
+            print(f"    {row['target']:<16}{row['kinds']:>4} 种  无法集齐（有卡单包出现概率为 0）")
+        else:
+            print(f"    {row['target']:<16}{row['kinds']:>4} 种  {row['packs']:>14,.1f} 包  "
+                  f"{row['cost']:>16,.0f} {collect['currency']}")
+
+
+def main():
+    args = sys.argv[1:]
+    json_path = None
+    if "--json" in args:
+        idx = args.index("--json")
+        json_path = args[idx + 1]
+        del args[idx:idx + 2]
+    show_cards = "--cards" in args
+    check_only = "--check" in args
+    pack_ids = [a for a in args if not a.startswith("--")]
+
+    config = pack_rules.load_ocg_config()
+    if not pack_ids:
+        pack_ids = [p["packId"] for p in config.get("packs", []) if p.get("cardFile")]
+    unknown = [p for p in pack_ids if pack_rules.find_pack(config, p) is None]
+    if unknown:
+        print(f"❌ 找不到卡包：{', '.join(unknown)}")
+        sys.exit(1)
+
+    rarity_order = pack_rules.load_rarity_order()
+    results = {}
+    failed = 0
+    for pack_id in pack_ids:
+        result = compute(pack_id, config, rarity_order, include_box=not check_only)
+        results[pack_id] = result
+        failed += sum(1 for c in result["claims"] if not c["ok"])
+        pack = pack_rules.find_pack(config, pack_id)
+        print(f"\n📐 {pack_id}（{pack.get('packName', '')}）方案 {result['scheme']}，"
+              f"每盒 {result['boxSize']} 包，计算耗时 {result['ms']} ms")
+        for note in result["notes"]:
+            print(f"  ⚠️ {note}")
+        if not check_only:
+            print_result(result, show_cards)
+        if result["claims"]:
+            print(f"\n  文档字段核对：")
+            print_claims(result)
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"\n💾 结果已写入 {json_path}")
+
+    total = sum(len(r["claims"]) for r in results.values())
+    if failed:
+        print(f"\n❌ 文档字段核对：{total} 条中 {failed} 条与配置不一致")
+        if check_only:
+            sys.exit(1)
+    elif total:
+        print(f"\n✅ 文档字段核对：{total} 条全部一致")
+
+
+if __name__ == "__main__":
+    main()
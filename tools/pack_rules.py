@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+卡包抽卡规则（Python 版）
+读取 data/ocg/packs.json 和卡包文件，按 js/game.js 中 drawCards / drawCardsBox_OCG / drawCardsBox_LOCH
+的写法解析出每个卡包实际使用的规则参数（包括前端 `||` 写法带来的默认值），
+供抽卡模拟、概率计算等工具共用，保证这些工具和网页看到的是同一套规则。
+
+【与前端保持一致的细节】
+  - 卡包方案：pack.packScheme || 'legacy'（不读取 defaultPackScheme）
+  - 权重表中的 _说明 字段会被过滤；但旧版方案的 rarityRates 不过滤（见 legacy_rate_items）
+  - 数值为 0 的配置项会被 `||` 替换成默认值（如 boxPSERChance: 0 → 0.25）
+  - 卡牌身份按卡包文件 cardIds 中的位置区分（前端 setNumber = 序号），辅助包卡片单独成池
+
+【抽卡模型共用部分】
+  CardPools 按前端的写法整理卡池分组、整盒封入卡位和旧版方案的降级顺序，并按卡包方案分派到子类的
+  ocg_pack / loch_pack / legacy_pack / ocg_box / loch_box；simulate_packs.py（NumPy 批量模拟）、
+  pack_odds.py（精确概率）、draw_engine.py（逐包参考引擎）只实现各自的抽取方式。
+  Tally 累计抽取结果（每张卡每个版本的张数、每个单位各稀有度张数的分布）。
+
+用法（作为模块）：
+  from pack_rules import load_ocg_config, find_pack, load_pack_cards, resolve_rules, CardPools, Tally
+"""
+
+import json
+import math
+import os
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+OCG_PACKS_PATH = os.path.join(ROOT_DIR, "data", "ocg", "packs.json")
+OCG_CARDS_DIR = os.path.join(ROOT_DIR, "data", "ocg", "cards")
+RARITIES_PATH = os.path.join(ROOT_DIR, "data", "common", "rarities.json")
+
+DOC_KEY = "_说明"
+
+SCHEME_OCG = "ocg_default"
+SCHEME_LOCH = "loch_special"
+SCHEME_LEGACY = "legacy"
+
+# js/game.js 中写死的默认值
+DEFAULT_BOX_RARITY_DISTRIBUTION = {"SER": 1, "UTR": 1, "UR": 3, "SR": 6, "R": 19}
+DEFAULT_BOX_PSER_CHANCE = 0.25
+DEFAULT_NR_WEIGHT_RATIO = 0.2
+DEFAULT_BOX_SLOT4_DISTRIBUTION = {"OF": 1, "PSER": 1, "UTR": 2, "CR": 2, "SER": 9}
+DEFAULT_OF_TYPE_ODDS = {"PSER-OF": 36, "UR-OF": 107, "GMR-OF": 1}
+DEFAULT_BONUS_PSER_CHANCE = 4 / 24
+DEFAULT_PACKS_PER_BOX = 30
+LOCH_BOX_PACKS = 15                 # openMultiPacks 只有包数等于 packsPerBox || 15 时才走 LOCH 整盒方案
+OCG_BOX_SLOT_KEYS = ["SER", "UTR", "UR", "SR", "R"]           # drawCardsBox_OCG 只读取这些键（按此顺序）
+LOCH_BOX_SLOT_KEYS = ["OF", "PSER", "UTR", "CR", "SER"]       # drawCardsBox_LOCH 只读取这些键（按此顺序）
+LEGACY_FALLBACK_ORDER = ["N", "NR", "R", "SR", "UR", "SER", "UTR", "PSER"]
+LEGACY_RARE_KEYS = ["R", "SR", "UR"]                          # drawGuaranteedRare 的保底范围
+LOCH_FIXED_SLOTS = (("SR", 2), ("UR", 1))                     # drawCards_LOCH 1~3 号位：两张不同的基础 SR 卡 + 一张基础 UR 卡
+
+
+def load_ocg_config():
+    with open(OCG_PACKS_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_rarity_order():
+    """稀有度代码 → sortWeight（越大越稀有），与前端 RARITY_ORDER_ASC 一致"""
+    with open(RARITIES_PATH, "r", encoding="utf-8") as f:
+        return {r["code"]: r.get("sortWeight", 0) for r in json.load(f).get("rarities", [])}
+
+
+def find_pack(config, pack_id):
+    for pack in config.get("packs", []):
+        if pack.get("packId") == pack_id:
+            return pack
+    return None
+
+
+def card_name(card_def):
+    d = card_def.get("cardData") or {}
+    return card_def.get("name_hint") or d.get("cn_name") or d.get("jp_name") or str(card_def.get("id", ""))
+
+
+def load_pack_cards(pack):
+    """
+    读取卡包文件，返回 (卡池, 辅助包卡池)
+    每张卡为 {"id", "setNumber", "name", "rarityVersions"}，顺序与 cardIds 一致
+    （与 buildOCGCardsFromLocalData / buildSupplementCardsFromLocalData 相同：缺省稀有度分别为 N / UR，辅助包跳过无 id 的卡）
+    """
+    with open(os.path.join(OCG_CARDS_DIR, pack["cardFile"]), "r", encoding="utf-8") as f:
+        data = json.load(f)
+    cards = []
+    for card_def in data.get("cardIds", []):
+        cards.append({
+            "id": card_def.get("id"),
+            "setNumber": card_def.get("setNumber", ""),
+            "name": card_name(card_def),
+            "rarityVersions": card_def.get("rarityVersions") or ["N"],
+        })
+    supplement = []
+    for card_def in (data.get("supplementPack") or {}).get("cards", []):
+        if not card_def.get("id"):
+            continue
+        supplement.append({
+            "id": card_def["id"],
+            "setNumber": card_def.get("setNumber", ""),
+            "name": card_name(card_def),
+            "rarityVersions": card_def.get("rarityVersions") or ["UR"],
+        })
+    return cards, supplement
+
+
+def weight_items(table):
+    """权重表 → [(键, 权重)]，与前端一样只过滤 _说明 字段"""
+    return [(k, v) for k, v in (table or {}).items() if k != DOC_KEY]
+
+
+def legacy_rate_items(rates):
+    """
+    旧版方案的稀有度权重：drawCards_Legacy 用 Object.keys(rates) 求和，不过滤 _说明。
+    返回 ([(稀有度, 权重)], 是否可用)；含有非数字值时前端总权重变成字符串，drawRandomRarity 永远返回 N
+    """
+    items = list((rates or {}).items())
+    usable = all(isinstance(v, (int, float)) and not isinstance(v, bool) for _, v in items)
+    return items, usable
+
+
+def version_weight(version_odds, rarity):
+    """resolveCardVersion 中的单个版本权重：versionOdds[v] || 1"""
+    return version_odds.get(rarity) or 1
+
+
+def resolve_rules(pack, config):
+    """
+    解析卡包的完整抽卡规则，返回 dict：
+      scheme, cardsPerPack, packsPerBox, boxScheme（整盒是否走专用方案）, versionOdds,
+      ocg_default: nrWeightRatio, boxRarityDistribution, boxPSERChance
+      loch_special: boxSlot4Distribution, ofTypeOdds
+      legacy: rarityRates, guaranteedRareSlot
+      bonusPSERChance（开整盒时的 +1 辅助包）
+    """
+    scheme = pack.get("packScheme") or SCHEME_LEGACY
+    if scheme not in (SCHEME_OCG, SCHEME_LOCH):
+        scheme = SCHEME_LEGACY
+    packs_per_box = pack.get("packsPerBox") or DEFAULT_PACKS_PER_BOX
+    if scheme == SCHEME_OCG:
+        box_scheme = True
+    elif scheme == SCHEME_LOCH:
+        box_scheme = packs_per_box == (pack.get("packsPerBox") or LOCH_BOX_PACKS)
+    else:
+        box_scheme = False
+
+    rules = {
+        "packId": pack.get("packId"),
+        "scheme": scheme,
+        "cardsPerPack": pack.get("cardsPerPack") or 0,
+        "packsPerBox": packs_per_box,
+        "boxScheme": box_scheme,
+        "versionOdds": pack.get("versionOdds") or config.get("defaultVersionOdds") or {},
+        "bonusPSERChance": pack.get("bonusPSERChance") or DEFAULT_BONUS_PSER_CHANCE,
+    }
+    if scheme == SCHEME_OCG:
+        rules["nrWeightRatio"] = pack.get("nrWeightRatio") or DEFAULT_NR_WEIGHT_RATIO
+        rules["boxRarityDistribution"] = pack.get("boxRarityDistribution") or DEFAULT_BOX_RARITY_DISTRIBUTION
+        rules["boxPSERChance"] = pack.get("boxPSERChance") or DEFAULT_BOX_PSER_CHANCE
+    elif scheme == SCHEME_LOCH:
+        rules["boxSlot4Distribution"] = pack.get("boxSlot4Distribution") or DEFAULT_BOX_SLOT4_DISTRIBUTION
+        rules["ofTypeOdds"] = pack.get("ofTypeOdds") or DEFAULT_OF_TYPE_ODDS
+    else:
+        rules["rarityRates"] = pack.get("rarityRates") or config.get("defaultRarityRates") or {}
+        rules["guaranteedRareSlot"] = bool(pack.get("guaranteedRareSlot"))
+    return rules
+
+
+def slot_count(value):
+    """drawCardsBox_* 中 `for (i = 0; i < (dist.X || 0); i++)` 的循环次数"""
+    if not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+        return 0
+    return math.ceil(value)
+
+
+def box_slots(table, keys):
+    """整盒封入分配展开成每包的目标稀有度（按 keys 的顺序，未打乱）"""
+    return [k for k in keys for _ in range(slot_count((table or {}).get(k)))]
+
+
+def format_odds(p):
+    """概率的 "≈1/N" 写法，p 不小于 0.5 时返回空字符串"""
+    return f"≈1/{1 / p:,.0f}" if 0 < p < 0.5 else ""
+
+
+class CardPools:
+    """
+    一个卡包的规则和按稀有度分组的卡池（下标为卡包文件 cardIds 中的位置），各抽卡模型的基类：
+      base_pools     基础稀有度（rarityVersions[0]）→ 卡（poolByRarity / srPool / urPool / cardsByRarity）
+      version_pools  稀有度 → rarityVersions 包含它的卡（findCardsForTargetRarity）
+      n_pool         N 卡池，其中 nr_cards 按 nrWeightRatio 加权（weightedPickFromNPool）
+      non_n          所有基础稀有度不是 N 的卡（非 N 位的数据兜底）
+    子类实现 ocg_pack / loch_pack / legacy_pack / ocg_box / loch_box，由 pack_method / box_method 按方案分派
+    """
+
+    def __init__(self, pack, config):
+        self.pack = pack
+        self.pack_id = pack.get("packId")
+        self.rules = resolve_rules(pack, config)
+        self.cards, self.supplement = load_pack_cards(pack)
+        self.n = len(self.cards)
+        self.base = [card["rarityVersions"][0] for card in self.cards]
+        self.version_sets = [set(card["rarityVersions"]) for card in self.cards]
+
+        self.base_pools = {}
+        self.version_pools = {}
+        for idx, card in enumerate(self.cards):
+            versions = card["rarityVersions"]
+            self.base_pools.setdefault(versions[0], []).append(idx)
+            for version in dict.fromkeys(versions):
+                self.version_pools.setdefault(version, []).append(idx)
+        self.n_pool = self.base_pools.get("N", [])
+        self.nr_cards = {i for i in self.n_pool if "NR" in self.version_sets[i]}
+        self.non_n = [i for i in range(self.n) if self.base[i] != "N"]
+
+    def base_pool(self, rarity):
+        return self.base_pools.get(rarity, [])
+
+    def candidates(self, rarity):
+        return self.version_pools.get(rarity, [])
+
+    def legacy_rarity(self, rarity):
+        """findAvailableRarity：该稀有度没有卡时按 LEGACY_FALLBACK_ORDER 降级，卡池为空时返回 None"""
+        if self.base_pools.get(rarity):
+            return rarity
+        return next((r for r in LEGACY_FALLBACK_ORDER if self.base_pools.get(r)), None)
+
+    def box_slots(self):
+        """专用整盒方案每包的目标稀有度（OCG 为非 N 位，LOCH 为 4 号位；未打乱），非专用方案返回 None"""
+        if not self.rules["boxScheme"]:
+            return None
+        if self.rules["scheme"] == SCHEME_OCG:
+            return box_slots(self.rules["boxRarityDistribution"], OCG_BOX_SLOT_KEYS)
+        return box_slots(self.rules["boxSlot4Distribution"], LOCH_BOX_SLOT_KEYS)
+
+    def box_size(self):
+        """一盒的包数（专用方案按分配表的槽位数，与前端一致）"""
+        slots = self.box_slots()
+        return self.rules["packsPerBox"] if slots is None else len(slots)
+
+    def pack_method(self):
+        """drawCards 按方案选择的单包抽取方法"""
+        scheme = self.rules["scheme"]
+        if scheme == SCHEME_OCG:
+            return self.ocg_pack
+        if scheme == SCHEME_LOCH:
+            return self.loch_pack
+        return self.legacy_pack
+
+    def box_method(self):
+        """openMultiPacks 的专用整盒方法，非专用方案返回 None（逐包抽取 packsPerBox 包）"""
+        if not self.rules["boxScheme"]:
+            return None
+        return self.ocg_box if self.rules["scheme"] == SCHEME_OCG else self.loch_box
+
+    def check(self):
+        """会让前端走兜底分支的配置，返回提示列表"""
+        notes = []
+        rules = self.rules
+        if rules["scheme"] == SCHEME_OCG:
+            for name, _ in weight_items(rules["boxRarityDistribution"]) + [("PSER", 0)]:
+                if not self.candidates(name):
+                    notes.append(f"没有 rarityVersions 包含 {name} 的卡，该卡位会走兜底逻辑")
+            if self.box_size() != rules["packsPerBox"]:
+                notes.append(f"boxRarityDistribution 合计 {self.box_size()} 包，与 packsPerBox {rules['packsPerBox']} 不一致")
+        elif rules["scheme"] == SCHEME_LOCH:
+            names = [k for k, _ in weight_items(rules["boxSlot4Distribution"]) if k != "OF"]
+            names += [k for k, _ in weight_items(rules["ofTypeOdds"])]
+            for name in names:
+                if not self.candidates(name):
+                    notes.append(f"没有 rarityVersions 包含 {name} 的卡，4 号位会走兜底逻辑")
+            if not rules["boxScheme"]:
+                notes.append("未配置 packsPerBox，开整盒时前端逐包抽取 30 包（不走 LOCH 整盒方案）")
+        else:
+            _, usable = legacy_rate_items(rules["rarityRates"])
+            if not usable:
+                notes.append("rarityRates 含非数字字段（如 _说明），前端总权重计算出错，非保底卡位永远抽到 N")
+        return notes
+
+
+class Tally:
+    """
+    累计抽取结果：每张卡每个稀有度版本的张数（键为 "下标:稀有度"，辅助包卡牌为 "+下标:稀有度"），
+    以及每个单位（包 / 盒）各稀有度张数的分布 {稀有度: {张数: 单位数}}（只记录张数大于 0 的单位）
+    """
+
+    def __init__(self):
+        self.units = 0
+        self.cards = {}
+        self.histogram = {}
+
+    def add(self, cards, bonus=None):
+        """cards 为 [(下标, 稀有度)]；bonus 为辅助包卡牌，分布中记作 "+稀有度" """
+        self.units += 1
+        per_unit = {}
+        for idx, rarity in cards:
+            key = f"{idx}:{rarity}"
+            self.cards[key] = self.cards.get(key, 0) + 1
+            per_unit[rarity] = per_unit.get(rarity, 0) + 1
+        if bonus is not None:
+            key = f"+{bonus[0]}:{bonus[1]}"
+            self.cards[key] = self.cards.get(key, 0) + 1
+            per_unit["+" + bonus[1]] = per_unit.get("+" + bonus[1], 0) + 1
+        for rarity, count in per_unit.items():
+            hist = self.histogram.setdefault(rarity, {})
+            hist[count] = hist.get(count, 0) + 1
+
+    def merge(self, units, cards, histogram):
+        """合并一批已经计好数的单位：cards 为 {键: 张数}，histogram 为 {稀有度: {张数: 单位数}}"""
+        self.units += units
+        for key, count in cards.items():
+            self.cards[key] = self.cards.get(key, 0) + count
+        for rarity, counts in histogram.items():
+            hist = self.histogram.setdefault(rarity, {})
+            for count, n in counts.items():
+                if count > 0:
+                    hist[count] = hist.get(count, 0) + n
+
+    def card_items(self):
+        """产出 (下标, 稀有度, 是否辅助包, 张数)"""
+        for key, count in self.cards.items():
+            idx, rarity = key.lstrip("+").split(":", 1)
+            yield int(idx), rarity, key.startswith("+"), count
+
+    def moments(self, rarity):
+        """该稀有度每个单位张数的 (总和, 平方和, 至少 1 张的单位数, 最少, 最多)"""
+        hist = self.histogram.get(rarity, {})
+        hit = sum(hist.values())
+        total = sum(count * n for count, n in hist.items())
+        total_sq = sum(count * count * n for count, n in hist.items())
+        low = min(hist) if hist and hit == self.units else 0
+        return total, total_sq, hit, low, max(hist, default=0)
+
+    def to_dict(self):
+        """未出现某稀有度的单位计入 0 张"""
+        histogram = {}
+        for rarity in sorted(self.histogram):
+            hist = dict(self.histogram[rarity])
+            hist[0] = self.units - sum(hist.values())
+            histogram[rarity] = {str(k): v for k, v in sorted(hist.items()) if v}
+        return {"units": self.units, "cards": dict(sorted(self.cards.items())), "histogram": histogram}
@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+"""
+卡包开包模拟器（蒙特卡洛）
+按 data/ocg/packs.json 的配置和卡包文件，用与 js/game.js 相同的规则批量模拟开包 / 开整盒，
+统计各稀有度、每张卡（按稀有度版本）的出现率及 95% 置信区间，以及整盒保底（每盒各稀有度张数的最少/最多）。
+修改卡包配置（versionOdds / boxRarityDistribution / boxSlot4Distribution / ofTypeOdds / boxPSERChance /
+nrWeightRatio / rarityRates 等）后运行一次，即可确认网页实际的出率，不需要在页面上反复开包。
+
+【支持的方案】
+  ocg_default   单包 drawCards_OCG，整盒 drawCardsBox_OCG（+1 辅助包）
+  loch_special  单包 drawCards_LOCH，整盒 drawCardsBox_LOCH（包数与前端条件一致时）
+  legacy        单包 drawCards_Legacy，整盒为逐包抽取
+  规则参数由 tools/pack_rules.py 解析（含前端的默认值写法）
+
+【实现】
+  每批同时模拟 BATCH_SIZE 包（NumPy 向量化）。前端"从剩余卡中抽取"的写法用整批抽取 + 只重抽重复的行实现
+  （拒绝采样，与在剩余卡中抽取同分布）；多次重复的行和卡池太小的情况改用掩码 / 指数随机键精确抽取。
+  单卡出现率的置信区间按泊松近似计算，稀有度的"每包/每盒张数"按正态近似，"至少 1 张"使用 Wilson 区间。
+
+【依赖】
+  需要 NumPy（pip install numpy）
+
+用法：
+  cd YGOCardGame
+  python tools/simulate_packs.py                        # 所有 OCG 卡包：单包 100 万次 + 整盒 10 万次
+  python tools/simulate_packs.py ocg_loch ocg_blzd      # 只模拟指定卡包
+  python tools/simulate_packs.py --packs 5000000 --boxes 0
+  python tools/simulate_packs.py --seed 42              # 固定随机种子（结果可复现）
+  python tools/simulate_packs.py --cards                # 列出每张卡每个稀有度版本的出现率
+  python tools/simulate_packs.py --json result.json     # 结果写入 JSON（供对比配置修改前后的差异）
+"""
+
+import json
+import math
+import os
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import pack_rules
+from pack_rules import LEGACY_RARE_KEYS, LOCH_FIXED_SLOTS, CardPools, Tally, format_odds
+
+# 配置
+DEFAULT_PACKS = 1_000_000
+DEFAULT_BOXES = 100_000
+BATCH_SIZE = 100_000        # 每批模拟的包数（整盒按 BATCH_SIZE // 每盒包数 盒一批）
+Z95 = 1.959964
+
+
+def categorical(rng, weights, size):
+    """按权重抽取下标（与前端 roll -= w; if (roll <= 0) 的转盘写法等价）"""
+    cum = np.cumsum(np.asarray(weights, dtype=float))
+    idx = np.searchsorted(cum, rng.random(size) * cum[-1], side="left")
+    return np.minimum(idx, len(cum) - 1)
+
+
+def pick_masked(rng, mask):
+    """每行在 mask 为 True 的列中等概率选一列，返回 (列下标, 该行是否有可选列)"""
+    keys = rng.random(mask.shape)
+    keys[~mask] = -1.0
+    return keys.argmax(axis=1), mask.any(axis=1)
+
+
+def pick_uniform(rng, cand_idx, taken, n_cards, tries=16):
+    """
+    每行从 cand_idx 中等概率选一张不在 taken 中的卡（taken 为 (行数, m) 的卡下标，-1 表示空位）
+    先拒绝采样；多次都选到已有卡的行改用掩码在剩余候选中抽取，结果仍是剩余候选中的均匀分布
+    返回 (卡下标, 该行是否有可选卡)
+    """
+    rows = len(taken)
+    pick = cand_idx[rng.integers(len(cand_idx), size=rows)]
+    bad = np.nonzero((pick[:, None] == taken).any(axis=1))[0]
+    for _ in range(tries):
+        if not len(bad):
+            break
+        pick[bad] = cand_idx[rng.integers(len(cand_idx), size=len(bad))]
+        bad = bad[(pick[bad, None] == taken[bad]).any(axis=1)]
+    ok = np.ones(rows, dtype=bool)
+    if len(bad):
+        mask = np.zeros((len(bad), n_cards), dtype=bool)
+        mask[:, cand_idx] = True
+        hit = taken[bad] >= 0
+        mask[np.nonzero(hit)[0], taken[bad][hit]] = False
+        pick[bad], ok[bad] = pick_masked(rng, mask)
+    return pick, ok
+
+
+def weighted_without_replacement(rng, weights, k, rows, excluded=None):
+    """
+    每行按权重不放回抽 k 个下标（与前端"在剩余卡中按权重抽一张"重复 k 次同分布）
+    excluded 为每行需要排除的下标（-1 表示不排除）；可选数量不足 k 时不足的位置为 -1
+    卡池足够大时逐张加权抽取、与已选重复的行重抽；卡池太小时改用指数随机键取最小的 k 个（Efraimidis–Spirakis）
+    """
+    n = len(weights)
+    k = max(k, 0)
+    result = np.full((rows, k), -1, dtype=np.int64)
+    if k == 0 or n == 0:
+        return result
+    if excluded is None:
+        excluded = np.full(rows, -1, dtype=np.int64)
+
+    if k > n - 1:
+        keys = rng.exponential(size=(rows, n)) / weights
+        has_excluded = excluded >= 0
+        keys[np.nonzero(has_excluded)[0], excluded[has_excluded]] = np.inf
+        k_eff = min(k, n)
+        chosen = np.argpartition(keys, k_eff - 1, axis=1)[:, :k_eff]
+        chosen[np.isinf(np.take_along_axis(keys, chosen, axis=1))] = -1
+        result[:, :k_eff] = chosen
+        return result
+
+    for j in range(k):
+        taken = np.column_stack([result[:, :j], excluded])
+        result[:, j] = categorical(rng, weights, rows)
+        bad = np.nonzero((result[:, j, None] == taken).any(axis=1))[0]
+        while len(bad):
+            result[bad, j] = categorical(rng, weights, len(bad))
+            bad = bad[(result[bad, j, None] == taken[bad]).any(axis=1)]
+    return result
+
+
+class PackModel(CardPools):
+    """一个卡包的卡池和规则，预先整理成 NumPy 数组"""
+
+    def __init__(self, pack, config, rarity_order):
+        super().__init__(pack, config)
+
+        codes = {"N", "NR", "SER"}
+        for card in self.cards + self.supplement:
+            codes.update(card["rarityVersions"])
+        for key in ("boxRarityDistribution", "boxSlot4Distribution", "ofTypeOdds"):
+            codes.update(k for k, _ in pack_rules.weight_items(self.rules.get(key)))
+        codes.update(k for k in self.rules.get("rarityRates", {}) if k != pack_rules.DOC_KEY)
+        codes.add("PSER")
+        codes.discard("OF")
+        self.labels = sorted(codes, key=lambda c: (rarity_order.get(c, 0), c))
+        self.label_index = {c: i for i, c in enumerate(self.labels)}
+
+        self.non_n_mask = np.zeros(self.n, dtype=bool)
+        self.non_n_mask[self.non_n] = True
+        self.n_pool_array = self.pool_array("N")
+        self.n_is_nr = np.array([i in self.nr_cards for i in self.n_pool], dtype=bool)
+        self._has_cache = {}
+        self._version_cache = {}
+
+    # ---------- 卡池查询 ----------
+
+    def has(self, rarity):
+        """rarityVersions 中包含该稀有度的卡（findCardsForTargetRarity）"""
+        if rarity not in self._has_cache:
+            mask = np.zeros(self.n, dtype=bool)
+            mask[self.candidates(rarity)] = True
+            self._has_cache[rarity] = mask
+        return self._has_cache[rarity]
+
+    def pool_array(self, rarity):
+        """基础稀有度卡池（base_pool）的 NumPy 数组"""
+        return np.array(self.base_pool(rarity), dtype=np.int64)
+
+    def label(self, rarity):
+        return self.label_index[rarity]
+
+    def resolve_versions(self, rng, cards):
+        """resolveCardVersion：按 versionOdds 为每张卡选一个版本，返回稀有度下标"""
+        labels = np.empty(len(cards), dtype=np.int64)
+        odds = self.rules["versionOdds"]
+        for c in np.unique(cards):
+            mask = cards == c
+            versions = self.cards[c]["rarityVersions"]
+            if c not in self._version_cache:
+                weights = [pack_rules.version_weight(odds, v) for v in versions]
+                self._version_cache[c] = (np.array([self.label(v) for v in versions]), weights)
+            version_labels, weights = self._version_cache[c]
+            if len(versions) <= 1:
+                labels[mask] = version_labels[0]
+            else:
+                labels[mask] = version_labels[categorical(rng, weights, int(mask.sum()))]
+        return labels
+
+    # ---------- ocg_default ----------
+
+    def _draw_n_cards(self, rng, rows, n_count, excluded=None):
+        """N 卡位：从 N 卡池按权重（NR 卡为 nrWeightRatio）不放回抽取"""
+        weights = np.where(self.n_is_nr, self.rules["nrWeightRatio"], 1.0)
+        picks = weighted_without_replacement(rng, weights, n_count, rows, excluded)
+        valid = picks >= 0
+        safe = np.where(valid, picks, 0)
+        cards = np.where(valid, self.n_pool_array[safe] if len(self.n_pool) else -1, -1)
+        nr_label = np.where(self.n_is_nr[safe] if len(self.n_pool) else False, self.label("NR"), self.label("N"))
+        return cards, np.where(valid, nr_label, -1)
+
+    def ocg_pack(self, rng, rows):
+        rules = self.rules
+        n_count = max(rules["cardsPerPack"] - 1, 0)
+        n_cards, n_labels = self._draw_n_cards(rng, rows, n_count)
+
+        # N 卡池不够时从 R 卡池补充（不重复）
+        short = n_count - len(self.n_pool)
+        if short > 0:
+            r_pool = self.pool_array("R")
+            take = min(short, len(r_pool))
+            if take:
+                order = np.argpartition(rng.random((rows, len(r_pool))), take - 1, axis=1)[:, :take]
+                n_cards[:, len(self.n_pool):len(self.n_pool) + take] = r_pool[order]
+                n_labels[:, len(self.n_pool):len(self.n_pool) + take] = self.label("R")
+
+        # 非 N 位：按 boxRarityDistribution 选目标稀有度，SER 有 boxPSERChance 概率变为 PSER
+        items = pack_rules.weight_items(rules["boxRarityDistribution"])
+        names = [k for k, _ in items] + ["PSER"]
+        target = categorical(rng, [w for _, w in items], rows)
+        if "SER" in names[:-1]:
+            ser = (target == names.index("SER")) & (rng.random(rows) < rules["boxPSERChance"])
+            target[ser] = len(names) - 1
+
+        rare_cards = np.full(rows, -1, dtype=np.int64)
+        rare_labels = np.full(rows, -1, dtype=np.int64)
+        for t_idx, name in enumerate(names):
+            sel = np.nonzero(target == t_idx)[0]
+            if not len(sel):
+                continue
+            cand_idx = np.nonzero(self.has(name))[0]
+            if len(cand_idx):
+                pick, ok = pick_uniform(rng, cand_idx, n_cards[sel], self.n)
+                if not ok.all():
+                    # 候选卡都与 N 位重复时允许重复
+                    pick[~ok] = cand_idx[rng.integers(len(cand_idx), size=int((~ok).sum()))]
+                rare_cards[sel] = pick
+                rare_labels[sel] = self.label(name)
+            elif self.non_n:
+                # 数据兜底：从所有非 N 卡中选一张，按 versionOdds 决定版本
+                pick, ok = pick_uniform(rng, np.nonzero(self.non_n_mask)[0], n_cards[sel], self.n)
+                sel, pick = sel[ok], pick[ok]
+                rare_cards[sel] = pick
+                rare_labels[sel] = self.resolve_versions(rng, pick)
+
+        return (np.column_stack([n_cards, rare_cards]), np.column_stack([n_labels, rare_labels]))
+
+    def ocg_box(self, rng, boxes):
+        rules = self.rules
+        slot_names = self.box_slots()
+        packs = len(slot_names)
+        names = sorted(set(slot_names) | {"PSER"})
+        targets = np.tile(np.array([names.index(k) for k in slot_names], dtype=np.int64), (boxes, 1))
+
+        # 每盒最多一个 SER 位变为 PSER
+        ser_slots = slot_names.count("SER")
+        if ser_slots:
+            has_pser = (rng.random((boxes, ser_slots)) < rules["boxPSERChance"]).any(axis=1)
+            targets[has_pser, slot_names.index("SER")] = names.index("PSER")
+        else:
+            has_pser = np.zeros(boxes, dtype=bool)
+
+        flat = targets.ravel()
+        rows = len(flat)
+        rare_cards = np.full(rows, -1, dtype=np.int64)
+        rare_labels = np.full(rows, -1, dtype=np.int64)
+        for t_idx, name in enumerate(names):
+            sel = np.nonzero(flat == t_idx)[0]
+            if not len(sel):
+                continue
+            cand_idx = np.nonzero(self.has(name))[0]
+            if len(cand_idx):
+                rare_cards[sel] = cand_idx[rng.integers(len(cand_idx), size=len(sel))]
+                rare_labels[sel] = self.label(name)
+                continue
+            pool = self.pool_array(name)
+            if not len(pool):
+                pool = np.nonzero(self.non_n_mask)[0]
+            if len(pool):
+                pick = pool[rng.integers(len(pool), size=len(sel))]
+                rare_cards[sel] = pick
+                rare_labels[sel] = self.resolve_versions(rng, pick)
+
+        # N 卡位：排除本包的非 N 卡
+        n_count = (rules["cardsPerPack"] or 5) - 1
+        pool_pos = np.full(self.n + 1, -1, dtype=np.int64)    # 卡下标 → N 卡池中的位置（最后一格对应 -1）
+        pool_pos[self.n_pool_array] = np.arange(len(self.n_pool))
+        excluded = pool_pos[rare_cards]
+        n_cards, n_labels = self._draw_n_cards(rng, rows, n_count, excluded)
+
+        cards = np.column_stack([rare_cards, n_cards]).reshape(boxes, packs * (1 + max(n_count, 0)))
+        labels = np.column_stack([rare_labels, n_labels]).reshape(boxes, packs * (1 + max(n_count, 0)))
+        return self.add_bonus(rng, cards, labels, has_pser)
+
+    # ---------- loch_special ----------
+
+    def _loch_slots123(self, rng, rows):
+        """1、2 号位从基础 SR 卡池选两张不同的卡，3 号位从基础 UR 卡池选一张（LOCH_FIXED_SLOTS）"""
+        cols, labels = [], []
+        for rarity, count in LOCH_FIXED_SLOTS:
+            pool = self.pool_array(rarity)
+            picks = []
+            for j in range(min(count, len(pool))):
+                # 在剩余 len - j 张中等概率选一张：按已选位置从小到大依次跳过
+                pick = rng.integers(len(pool) - j, size=rows)
+                for prev in (np.sort(np.column_stack(picks), axis=1).T if picks else []):
+                    pick += pick >= prev
+                picks.append(pick)
+                cols.append(pool[pick])
+                labels.append(self.label(rarity))
+        cards = np.column_stack(cols) if cols else np.empty((rows, 0), dtype=np.int64)
+        return cards, np.tile(np.array(labels, dtype=np.int64), (rows, 1))
+
+    def _roll_of_type(self, rng, size):
+        """OF 卡位按 ofTypeOdds 决定具体类型，返回稀有度下标"""
+        items = pack_rules.weight_items(self.rules["ofTypeOdds"])
+        of_labels = np.array([self.label(k) for k, _ in items], dtype=np.int64)
+        return of_labels[categorical(rng, [w for _, w in items], size)]
+
+    def loch_pack(self, rng, rows):
+        cards, labels = self._loch_slots123(rng, rows)
+
+        # 4 号位：按 boxSlot4Distribution 选版本，OF 再按 ofTypeOdds 选具体类型
+        items = pack_rules.weight_items(self.rules["boxSlot4Distribution"])
+        slot4_names = [k for k, _ in items]
+        target = categorical(rng, [w for _, w in items], rows)
+        slot4_labels = np.array([-1 if k == "OF" else self.label(k) for k in slot4_names], dtype=np.int64)[target]
+        if "OF" in slot4_names:
+            is_of = target == slot4_names.index("OF")
+            slot4_labels[is_of] = self._roll_of_type(rng, int(is_of.sum()))
+
+        slot4_cards = np.full(rows, -1, dtype=np.int64)
+        for label in np.unique(slot4_labels):
+            sel = np.nonzero(slot4_labels == label)[0]
+            cand_idx = np.nonzero(self.has(self.labels[label]))[0]
+            if len(cand_idx):
+                # 包内不出 "编号 + 稀有度" 完全相同的卡
+                taken = np.where(labels[sel] == label, cards[sel], -1)
+                pick, ok = pick_uniform(rng, cand_idx, taken, self.n)
+                if not ok.all():
+                    pick[~ok] = cand_idx[rng.integers(len(cand_idx), size=int((~ok).sum()))]
+                slot4_cards[sel] = pick
+            else:
+                # 极端兜底：全卡池随机一张 SER
+                slot4_cards[sel] = rng.integers(self.n, size=len(sel))
+                slot4_labels[sel] = self.label("SER")
+        return np.column_stack([cards, slot4_cards]), np.column_stack([labels, slot4_labels])
+
+    def loch_box(self, rng, boxes):
+        slot_names = self.box_slots()
+        packs = len(slot_names)
+        targets = np.empty((boxes, packs), dtype=np.int64)
+        for j, name in enumerate(slot_names):
+            targets[:, j] = self._roll_of_type(rng, boxes) if name == "OF" else self.label(name)
+        # 打乱 4 号位的稀有度顺序（整盒编号去重与顺序有关）
+        order = np.argsort(rng.random((boxes, packs)), axis=1)
+        targets = np.take_along_axis(targets, order, axis=1)
+
+        cards, labels = self._loch_slots123(rng, boxes * packs)
+        per_pack = cards.shape[1]
+        cards = cards.reshape(boxes, packs, per_pack)
+        labels = labels.reshape(boxes, packs, per_pack)
+
+        slot4_cards = np.full((boxes, packs), -1, dtype=np.int64)
+        slot4_labels = np.full((boxes, packs), -1, dtype=np.int64)
+        for j in range(packs):
+            column = targets[:, j]
+            for label in np.unique(column):
+                cand_idx = np.nonzero(self.has(self.labels[label]))[0]
+                if not len(cand_idx):
+                    continue
+                sel = np.nonzero(column == label)[0]
+                in_pack = np.where(labels[sel, j] == label, cards[sel, j], -1)
+                # 整盒 4 号位编号不重复，包内不出完全相同的卡
+                pick, ok = pick_uniform(rng, cand_idx, np.column_stack([in_pack, slot4_cards[sel, :j]]), self.n)
+                if not ok.all():
+                    # 放宽条件：忽略整盒编号去重；仍没有时忽略包内去重
+                    retry, ok2 = pick_uniform(rng, cand_idx, in_pack[~ok], self.n)
+                    retry[~ok2] = cand_idx[rng.integers(len(cand_idx), size=int((~ok2).sum()))]
+                    pick[~ok] = retry
+                slot4_cards[sel, j] = pick
+                slot4_labels[sel, j] = label
+
+        cards = np.concatenate([cards, slot4_cards[:, :, None]], axis=2).reshape(boxes, -1)
+        labels = np.concatenate([labels, slot4_labels[:, :, None]], axis=2).reshape(boxes, -1)
+        return self.add_bonus(rng, cards, labels, np.zeros(boxes, dtype=bool))
+
+    # ---------- legacy ----------
+
+    def legacy_pack(self, rng, rows):
+        rules = self.rules
+        slots = rules["cardsPerPack"]
+        items, usable = pack_rules.legacy_rate_items(rules["rarityRates"])
+        names = [k for k, _ in items]
+
+        def effective(name):
+            """该稀有度没有卡时按 findAvailableRarity 的顺序降级，返回稀有度下标（没有任何卡时为 -1）"""
+            name = self.legacy_rarity(name)
+            return self.label(name) if name else -1
+
+        rarity = np.empty((rows, slots), dtype=np.int64)
+        normal = slots - 1 if rules["guaranteedRareSlot"] else slots
+        if normal > 0:
+            if usable and names:
+                eff = np.array([effective(k) for k in names], dtype=np.int64)
+                rarity[:, :normal] = eff[categorical(rng, [w for _, w in items], (rows, normal))]
+            else:
+                rarity[:, :normal] = effective("N")
+        if rules["guaranteedRareSlot"] and slots > 0:
+            rates = rules["rarityRates"]
+            rare_weights = [rates.get(k) or 0 for k in LEGACY_RARE_KEYS]
+            if sum(rare_weights) == 0:
+                rarity[:, -1] = effective("R")
+            else:
+                eff = np.array([effective(k) for k in LEGACY_RARE_KEYS], dtype=np.int64)
+                rarity[:, -1] = eff[categorical(rng, rare_weights, rows)]
+
+        # 卡牌按基础稀有度排序后，每个稀有度是一段连续区间，在区间内等概率选一张
+        order = np.array(sorted(range(self.n), key=lambda i: self.label(self.base[i])), dtype=np.int64)
+        sizes = np.zeros(len(self.labels) + 1, dtype=np.int64)
+        for b, members in self.base_pools.items():
+            sizes[self.label(b)] = len(members)
+        starts = np.concatenate([[0], np.cumsum(sizes[:-1])])
+        offset = (rng.random((rows, slots)) * sizes[rarity]).astype(np.int64)
+        valid = (rarity >= 0) & (sizes[rarity] > 0)
+        cards = np.where(valid, order[np.minimum(starts[rarity] + offset, max(self.n - 1, 0))], -1)
+        return cards, np.where(valid, rarity, -1)
+
+    # ---------- 整盒通用 ----------
+
+    def add_bonus(self, rng, cards, labels, has_pser):
+        """+1 辅助包：从辅助包卡池随机 1 张，原盒已出 PSER 时不再出 PSER"""
+        if not self.supplement:
+            return cards, labels
+        boxes = len(cards)
+        pick = rng.integers(len(self.supplement), size=boxes)
+        bonus_labels = np.empty(boxes, dtype=np.int64)
+        lucky = rng.random(boxes) < self.rules["bonusPSERChance"]
+        for s, card in enumerate(self.supplement):
+            mask = pick == s
+            versions = card["rarityVersions"]
+            bonus_labels[mask] = self.label(versions[0])
+            if len(versions) > 1 and "PSER" in versions:
+                bonus_labels[mask & lucky & ~has_pser] = self.label("PSER")
+        return (np.column_stack([cards, pick + self.n]), np.column_stack([labels, bonus_labels]))
+
+    def sample_packs(self, rng, rows):
+        return self.pack_method()(rng, rows)
+
+    def sample_boxes(self, rng, boxes):
+        box_method = self.box_method()
+        if box_method:
+            return box_method(rng, boxes)
+        # 非专用方案：逐包抽取 packsPerBox 包
+        packs = self.rules["packsPerBox"]
+        cards, labels = self.sample_packs(rng, boxes * packs)
+        cards, labels = cards.reshape(boxes, -1), labels.reshape(boxes, -1)
+        return self.add_bonus(rng, cards, labels, np.zeros(boxes, dtype=bool))
+
+
+def wilson(successes, n):
+    """Wilson 置信区间（95%）"""
+    if n == 0:
+        return 0.0, 0.0
+    p = successes / n
+    denom = 1 + Z95 ** 2 / n
+    center = (p + Z95 ** 2 / (2 * n)) / denom
+    half = Z95 * math.sqrt(p * (1 - p) / n + Z95 ** 2 / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def add_batch(tally, model, cards, labels):
+    """
+    一批单位的抽取结果（卡牌下标、稀有度下标矩阵，-1 为空位，下标不小于 model.n 的是辅助包卡牌）
+    用 bincount 计数后合并进 Tally；辅助包卡牌计入所属稀有度的每单位张数
+    """
+    units = len(cards)
+    n_labels = len(model.labels)
+    valid = cards >= 0
+    unit_idx = np.broadcast_to(np.arange(units)[:, None], cards.shape)[valid]
+    label_idx = labels[valid]
+    per_unit = np.bincount(unit_idx * n_labels + label_idx,
+                           minlength=units * n_labels).reshape(units, n_labels)
+    histogram = {}
+    for i, code in enumerate(model.labels):
+        counts = np.bincount(per_unit[:, i])
+        histogram[code] = {c: int(k) for c, k in enumerate(counts) if c and k}
+
+    card_counts = np.bincount(cards[valid] * n_labels + label_idx)
+    card_keys = {}
+    for key in np.nonzero(card_counts)[0]:
+        c, i = divmod(int(key), n_labels)
+        name = f"+{c - model.n}" if c >= model.n else str(c)
+        card_keys[f"{name}:{model.labels[i]}"] = int(card_counts[key])
+    tally.merge(units, card_keys, histogram)
+
+
+def summarize(model, tally, elapsed):
+    """把累计结果整理成 dict（--json 输出的格式）"""
+    n = tally.units
+    rarities = {}
+    for code in model.labels:
+        total, total_sq, hit, low, high = tally.moments(code)
+        if high == 0:
+            continue
+        mean = total / n
+        var = max(total_sq / n - mean ** 2, 0.0)
+        half = Z95 * math.sqrt(var / n)
+        rarities[code] = {
+            "mean": mean,
+            "ci": [mean - half, mean + half],
+            "atLeastOne": hit / n,
+            "atLeastOneCi": list(wilson(hit, n)),
+            "min": low,
+            "max": high,
+        }
+
+    cards = []
+    for idx, rarity, bonus, count in sorted(tally.card_items(),
+                                            key=lambda item: (item[2], item[0], model.label(item[1]))):
+        card = model.supplement[idx] if bonus else model.cards[idx]
+        half = Z95 * math.sqrt(count) / n
+        cards.append({
+            "id": card["id"],
+            "setNumber": card["setNumber"],
+            "name": card["name"],
+            "rarity": rarity,
+            "bonus": bonus,
+            "mean": count / n,
+            "ci": [max(0.0, count / n - half), count / n + half],
+        })
+    return {"units": n, "seconds": round(elapsed, 3), "rarities": rarities, "cards": cards}
+
+
+def run(model, rng, units, sampler, batch_units):
+    """分批模拟 units 个单位，返回 summarize() 的结果"""
+    tally = Tally()
+    start = time.time()
+    done = 0
+    while done < units:
+        size = min(batch_units, units - done)
+        cards, labels = sampler(rng, size)
+        add_batch(tally, model, cards, labels)
+        done += size
+    return summarize(model, tally, time.time() - start)
+
+
+def simulate(pack_id, packs=DEFAULT_PACKS, boxes=DEFAULT_BOXES, seed=None):
+    """
+    模拟一个卡包，返回 {"packId", "scheme", "notes", "pack": 单包结果 或 None, "box": 整盒结果 或 None}
+    供测试或其他脚本直接调用
+    """
+    if np is None:
+        raise RuntimeError("需要 NumPy：pip install numpy")
+    config = pack_rules.load_ocg_config()
+    pack = pack_rules.find_pack(config, pack_id)
+    if pack is None:
+        raise ValueError(f"找不到卡包 {pack_id}")
+    model = PackModel(pack, config, pack_rules.load_rarity_order())
+    rng = np.random.default_rng(seed)
+    result = {"packId": pack_id, "scheme": model.rules["scheme"], "notes": model.check(),
+              "boxSize": model.box_size(), "pack": None, "box": None}
+    if packs > 0:
+        result["pack"] = run(model, rng, packs, model.sample_packs, BATCH_SIZE)
+    if boxes > 0:
+        result["box"] = run(model, rng, boxes, model.sample_boxes, max(1, BATCH_SIZE // max(model.box_size(), 1)))
+    return result
+
+
+def print_result(result, unit_name, show_cards):
+    if result is None:
+        return
+    n = result["units"]
+    speed = n / result["seconds"] if result["seconds"] else float("inf")
+    print(f"\n  {unit_name} × {n:,}（{result['seconds']:.2f} 秒，{speed / 10000:,.0f} 万{unit_name[-1]}/秒）")
+    print(f"  {'稀有度':<8}{'每' + unit_name[-1] + '张数 (95% CI)':<32}{'至少 1 张 (95% CI)':<36}{'最少':>4}{'最多':>6}")
+    for code, r in result["rarities"].items():
+        mean_text = f"{r['mean']:.5f} [{r['ci'][0]:.5f}, {r['ci'][1]:.5f}]"
+        any_text = (f"{r['atLeastOne'] * 100:.4f}% [{r['atLeastOneCi'][0] * 100:.4f}, "
+                    f"{r['atLeastOneCi'][1] * 100:.4f}] {format_odds(r['atLeastOne'])}")
+        print(f"  {code:<10}{mean_text:<34}{any_text:<40}{r['min']:>4}{r['max']:>6}")
+
+    by_rarity = {}
+    for card in result["cards"]:
+        by_rarity.setdefault((card["rarity"], card["bonus"]), []).append(card)
+    if show_cards:
+        print(f"\n  {'编号':<14}{'稀有度':<9}{'每' + unit_name[-1] + '张数 (95% CI)':<34}卡名")
+        for card in sorted(result["cards"], key=lambda c: (c["bonus"], c["setNumber"], c["rarity"])):
+            text = f"{card['mean']:.6f} [{card['ci'][0]:.6f}, {card['ci'][1]:.6f}]"
+            tag = "（辅助包）" if card["bonus"] else ""
+            print(f"  {card['setNumber']:<14}{card['rarity']:<10}{text:<36}{card['name']}{tag}")
+    else:
+        print(f"  单卡（按版本）出现率范围：")
+        for (code, bonus), cards in by_rarity.items():
+            means = [c["mean"] for c in cards]
+            print(f"    {code + ('（辅助包）' if bonus else ''):<14}{len(cards):>3} 种  "
+                  f"{min(means):.6f} ~ {max(means):.6f}")
+
+
+def main():
+    args = sys.argv[1:]
+    options = {"--packs": DEFAULT_PACKS, "--boxes": DEFAULT_BOXES, "--seed": None, "--json": None}
+    for name in list(options):
+        if name in args:
+            idx = args.index(name)
+            value = args[idx + 1]
+            options[name] = value if name == "--json" else int(value)
+            del args[idx:idx + 2]
+    show_cards = "--cards" in args
+    pack_ids = [a for a in args if not a.startswith("--")]
+
+    if np is None:
+        print("❌ 需要 NumPy：pip install numpy")
+        sys.exit(1)
+
+    config = pack_rules.load_ocg_config()
+    if not pack_ids:
+        pack_ids = [p["packId"] for p in config.get("packs", []) if p.get("cardFile")]
+
+    unknown = [p for p in pack_ids if pack_rules.find_pack(config, p) is None]
+    if unknown:
+        print(f"❌ 找不到卡包：{', '.join(unknown)}")
+        sys.exit(1)
+
+    results = {}
+    for pack_id in pack_ids:
+        result = simulate(pack_id, options["--packs"], options["--boxes"], options["--seed"])
+        results[pack_id] = result
+        pack = pack_rules.find_pack(config, pack_id)
+        print(f"\n🎲 {pack_id}（{pack.get('packName', '')}）方案 {result['scheme']}，每盒 {result['boxSize']} 包")
+        for note in result["notes"]:
+            print(f"  ⚠️ {note}")
+        print_result(result["pack"], "单包", show_cards)
+        print_result(result["box"], "整盒", show_cards)
+
+    if options["--json"]:
+        with open(options["--json"], "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"\n💾 结果已写入 {options['--json']}")
+
+
+if __name__ == "__main__":
+    main()
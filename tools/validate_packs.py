@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+卡包配置校验
+一次性读取 data/ocg/packs.json、data/tcg/packs.json、每个卡包文件和 data/common/rarities.json，
+为每个卡包建立"基础稀有度 → 张数"、"稀有度版本 → 可出的卡"索引后逐项检查，所有问题一起报告。
+这些问题在网页上不会报错，只会在开包时悄悄走兜底分支（出率和配置写的不一样），所以放在构建前检查。
+
+【检查项】
+  错误（build_pack_data.py 构建前遇到错误会停止）：
+    - packId 缺失或重复、packScheme 不是已知方案、cardsPerPack 不是正整数
+    - cardFile 不存在 / 无法解析、cardIds 为空、卡牌缺少 id、rarityVersions 中有 rarities.json 没有的稀有度
+    - 权重表（versionOdds / boxRarityDistribution / boxSlot4Distribution / ofTypeOdds / rarityRates）
+      含未知稀有度、负数或非数字、总权重为 0；概率项（boxPSERChance / bonusPSERChance）不在 0~1
+    - ocg_default：boxRarityDistribution 合计包数与 packsPerBox 不一致、含整盒方案不读取的稀有度、
+      某个非 N 位稀有度（含 SER 变成的 PSER）没有可出的卡
+    - loch_special：boxSlot4Distribution 合计包数与 packsPerBox 不一致、含整盒方案不读取的键、
+      SR 卡不足 2 种 / 没有 UR 卡、某个 4 号位稀有度（含 OF 的各类型）没有可出的卡
+    - legacy：rarityRates 含非数字字段（前端总权重计算出错，普通卡位永远抽到 N）
+    - textShard 指向的文本分片不存在
+  警告：
+    - 同一卡包 cardIds 中有重复的卡、辅助包卡牌缺少 id（前端会跳过）
+    - N 卡不够填满 N 位（前端从 R 卡补充）、旧版方案某稀有度没有卡（前端降级）
+    - LOCH 整盒 4 号位可出的卡不够做编号去重（前端放宽去重条件）、未配置 packsPerBox（不走整盒方案）
+    - drawTables 与当前卡池（cardsHash）或 nrWeightRatio / versionOdds 不一致（前端退回逐张扫描，重新构建即可）
+
+用法：
+  cd YGOCardGame
+  python tools/validate_packs.py                  # 校验全部卡包，有错误时退出码为 1
+  python build_pack_data.py --validate            # 同上（构建时也会自动校验）
+"""
+
+import itertools
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import pack_rules
+from build_pack_data import cards_hash
+from pack_rules import (SCHEME_OCG, SCHEME_LOCH, SCHEME_LEGACY, OCG_BOX_SLOT_KEYS, LOCH_BOX_SLOT_KEYS,
+                        box_slots, slot_count)
+
+TCG_PACKS_PATH = os.path.join(pack_rules.ROOT_DIR, "data", "tcg", "packs.json")
+KNOWN_SCHEMES = (SCHEME_OCG, SCHEME_LOCH, SCHEME_LEGACY)
+WEIGHT_TABLE_KEYS = ("versionOdds", "boxRarityDistribution", "boxSlot4Distribution", "ofTypeOdds", "rarityRates")
+CHANCE_KEYS = ("boxPSERChance", "bonusPSERChance")
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class Report:
+    """按卡包收集错误和警告"""
+
+    def __init__(self):
+        self.items = []     # (级别, 卡包, 说明)
+
+    def error(self, where, message):
+        self.items.append(("error", where, message))
+
+    def warn(self, where, message):
+        self.items.append(("warning", where, message))
+
+    @property
+    def errors(self):
+        return [i for i in self.items if i[0] == "error"]
+
+    @property
+    def warnings(self):
+        return [i for i in self.items if i[0] == "warning"]
+
+
+class PackIndex:
+    """一个卡包文件的索引（单遍扫描 cardIds 建立）"""
+
+    def __init__(self, cards):
+        self.base_counts = {}       # 基础稀有度 → 张数
+        self.eligible = {}          # 稀有度 → rarityVersions 包含它的卡（下标集合）
+        for idx, versions in enumerate(cards):
+            self.base_counts[versions[0]] = self.base_counts.get(versions[0], 0) + 1
+            for version in versions:
+                self.eligible.setdefault(version, set()).add(idx)
+
+    def count(self, rarity):
+        return len(self.eligible.get(rarity, ()))
+
+
+def load_json(path, report, where):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except OSError as e:
+        report.error(where, f"无法读取 {os.path.relpath(path, pack_rules.ROOT_DIR)}：{e.strerror or e}")
+    except ValueError as e:
+        report.error(where, f"{os.path.relpath(path, pack_rules.ROOT_DIR)} 不是合法的 JSON：{e}")
+    return None
+
+
+def check_rarities(report):
+    """rarities.json：编码唯一、sortWeight 为数字；返回编码集合"""
+    data = load_json(pack_rules.RARITIES_PATH, report, "rarities.json")
+    if data is None:
+        return None
+    codes = set()
+    for entry in data.get("rarities", []):
+        code = entry.get("code")
+        if not code:
+            report.error("rarities.json", f"稀有度缺少 code：{entry}")
+            continue
+        if code in codes:
+            report.error("rarities.json", f"稀有度 {code} 重复")
+        codes.add(code)
+        if not is_number(entry.get("sortWeight")):
+            report.error("rarities.json", f"稀有度 {code} 的 sortWeight 不是数字（前端按它排序）")
+    return codes
+
+
+def check_weight_table(report, where, name, table, codes, extra_keys=()):
+    """权重表：键为已知稀有度、值为非负数字、总权重大于 0"""
+    if table is None:
+        return
+    if not isinstance(table, dict):
+        report.error(where, f"{name} 应为对象")
+        return
+    items = pack_rules.weight_items(table)
+    if not items:
+        report.error(where, f"{name} 没有任何稀有度")
+        return
+    valid = True
+    for key, value in items:
+        if key not in codes and key not in extra_keys:
+            report.error(where, f"{name} 中的 {key} 不是 rarities.json 中的稀有度")
+        if not is_number(value) or value < 0:
+            report.error(where, f"{name}.{key} = {value!r}，应为非负数字")
+            valid = False
+    if valid and not sum(v for _, v in items):
+        report.error(where, f"{name} 的总权重为 0")
+
+
+def check_card_list(report, where, cards, codes, default_rarity, label):
+    """
+    检查卡牌列表（cardIds 或 supplementPack.cards），返回每张卡的 rarityVersions（缺省为 default_rarity）
+    辅助包（label 不为 cardIds）缺少 id 的卡前端会跳过，返回结果中同样跳过
+    """
+    result = []
+    seen_ids = set()
+    unknown = {}
+    for pos, card in enumerate(cards):
+        if not isinstance(card, dict):
+            report.error(where, f"{label}[{pos}] 应为对象")
+            continue
+        card_id = card.get("id")
+        if card_id is None or card_id == "":
+            if label == "cardIds":
+                report.error(where, f"{label}[{pos}] 缺少 id")
+            else:
+                report.warn(where, f"{label}[{pos}] 缺少 id，前端会跳过这张卡")
+                continue
+        elif card_id in seen_ids:
+            report.warn(where, f"{label} 中卡牌 {card_id} 重复出现")
+        seen_ids.add(card_id)
+
+        versions = card.get("rarityVersions") or [default_rarity]
+        if not isinstance(versions, list) or not all(isinstance(v, str) for v in versions):
+            report.error(where, f"{label}[{pos}]（{card_id}）的 rarityVersions 应为字符串数组")
+            versions = [default_rarity]
+        for version in versions:
+            if version not in codes:
+                unknown.setdefault(version, []).append(card_id)
+        if len(set(versions)) != len(versions):
+            report.warn(where, f"{label}[{pos}]（{card_id}）的 rarityVersions 中有重复的稀有度")
+        result.append(versions)
+
+    for version, ids in unknown.items():
+        sample = "、".join(str(i) for i in ids[:5]) + (" 等" if len(ids) > 5 else "")
+        report.error(where, f"{label} 中 {len(ids)} 张卡的稀有度 {version} 不在 rarities.json 中（{sample}）")
+    return result
+
+
+def check_ocg_default(report, where, rules, index):
+    dist = rules["boxRarityDistribution"]
+    items = pack_rules.weight_items(dist)
+    for key, _ in items:
+        if key not in OCG_BOX_SLOT_KEYS:
+            report.error(where, f"boxRarityDistribution 中的 {key} 整盒方案不会读取"
+                                f"（只读取 {'/'.join(OCG_BOX_SLOT_KEYS)}），单包与整盒出率会不一致")
+    for key, value in items:
+        if is_number(value) and value != int(value):
+            report.error(where, f"boxRarityDistribution.{key} = {value} 不是整数，整盒包数会向上取整")
+
+    box_size = len(box_slots(dist, OCG_BOX_SLOT_KEYS))
+    if box_size != rules["packsPerBox"]:
+        report.error(where, f"boxRarityDistribution 合计 {box_size} 包，与 packsPerBox {rules['packsPerBox']} 不一致"
+                            f"（开整盒时前端按分配表开 {box_size} 包）")
+
+    targets = [k for k, v in items if is_number(v) and v > 0]
+    if "SER" in targets:
+        targets.append("PSER")
+    for rarity in targets:
+        if not index.count(rarity):
+            report.error(where, f"没有 rarityVersions 包含 {rarity} 的卡，该非 N 位会走兜底逻辑"
+                                f"（从其他非 N 卡中按 versionOdds 随机）")
+
+    n_count = (rules["cardsPerPack"] or 5) - 1
+    n_pool = index.base_counts.get("N", 0)
+    if n_pool < n_count:
+        report.warn(where, f"N 卡只有 {n_pool} 种，不够每包 {n_count} 个 N 位，前端会从 R 卡补充")
+
+    ratio = rules["nrWeightRatio"]
+    if not is_number(ratio) or ratio < 0:
+        report.error(where, f"nrWeightRatio = {ratio!r}，应为正数")
+
+
+def check_loch_special(report, where, rules, index, pack):
+    dist = rules["boxSlot4Distribution"]
+    items = pack_rules.weight_items(dist)
+    for key, _ in items:
+        if key not in LOCH_BOX_SLOT_KEYS:
+            report.error(where, f"boxSlot4Distribution 中的 {key} 整盒方案不会读取"
+                                f"（只读取 {'/'.join(LOCH_BOX_SLOT_KEYS)}），单包与整盒出率会不一致")
+
+    if index.base_counts.get("SR", 0) < 2:
+        report.error(where, f"基础稀有度为 SR 的卡只有 {index.base_counts.get('SR', 0)} 种，1、2 号位需要 2 种不同的 SR")
+    if not index.base_counts.get("UR"):
+        report.error(where, "没有基础稀有度为 UR 的卡，3 号位会空缺")
+
+    of_types = [k for k, v in pack_rules.weight_items(rules["ofTypeOdds"]) if is_number(v) and v > 0]
+    slot4_targets = [k for k, v in items if is_number(v) and v > 0]
+    for rarity in slot4_targets:
+        for target in (of_types if rarity == "OF" else [rarity]):
+            if not index.count(target):
+                source = "（OF 卡位的类型，见 ofTypeOdds）" if rarity == "OF" else ""
+                report.error(where, f"没有 rarityVersions 包含 {target} 的卡{source}，4 号位会走兜底逻辑")
+
+    if not pack.get("packsPerBox"):
+        report.warn(where, f"未配置 packsPerBox，开整盒时前端逐包开 {rules['packsPerBox']} 包，不走 LOCH 整盒方案")
+        return
+    box_size = len(box_slots(dist, LOCH_BOX_SLOT_KEYS))
+    if box_size != rules["packsPerBox"]:
+        report.error(where, f"boxSlot4Distribution 合计 {box_size} 包，与 packsPerBox {rules['packsPerBox']} 不一致"
+                            f"（开整盒时前端按分配表开 {box_size} 包）")
+
+    # 整盒 4 号位编号不重复：任意几种稀有度的卡位数不能超过可出这些稀有度的卡的种数（OF 卡位按最坏情况全部变成同一类型）
+    slots = {k: slot_count(dist.get(k)) for k in LOCH_BOX_SLOT_KEYS if k != "OF"}
+    for of_type in (of_types if slot_count(dist.get("OF")) else [None]):
+        demand = dict(slots)
+        if of_type:
+            demand[of_type] = demand.get(of_type, 0) + slot_count(dist.get("OF"))
+        names = [k for k, v in demand.items() if v]
+        for size in range(1, len(names) + 1):
+            for group in itertools.combinations(names, size):
+                need = sum(demand[k] for k in group)
+                have = len(set().union(*(index.eligible.get(k, set()) for k in group)))
+                if have and need > have:
+                    report.warn(where, f"整盒 4 号位 {'+'.join(group)} 共 {need} 包，可出的卡只有 {have} 种，"
+                                       f"编号去重无法满足时前端会放宽条件")
+                    return
+
+
+def check_legacy(report, where, rules, index, pack):
+    rates = rules["rarityRates"]
+    items, usable = pack_rules.legacy_rate_items(rates)
+    if not usable:
+        bad = [k for k, v in items if not is_number(v)]
+        source = "rarityRates" if pack.get("rarityRates") else "defaultRarityRates（卡包未配置 rarityRates）"
+        report.error(where, f"{source} 中的 {'、'.join(bad)} 不是数字（前端不过滤 _说明），普通卡位永远抽到 N")
+    if index is None:
+        return
+    for rarity, weight in items:
+        if is_number(weight) and weight > 0 and not index.base_counts.get(rarity):
+            report.warn(where, f"rarityRates 中的 {rarity} 没有基础稀有度为它的卡，抽到时前端降级为其他稀有度")
+    if rules["guaranteedRareSlot"] and not any(is_number(rates.get(k)) and rates.get(k) > 0
+                                               for k in pack_rules.LEGACY_RARE_KEYS):
+        report.warn(where, "开启了 guaranteedRareSlot，但 R/SR/UR 权重都为 0，保底位固定为 R")
+
+
+def check_draw_tables(report, where, tables, rules, cards, card_defs):
+    """drawTables 是否与当前卡池（cardIds 的密码和稀有度）和抽卡参数一致（build_pack_data.py 生成）"""
+    stale = []
+    if tables.get("cardCount") != len(cards):
+        stale.append(f"卡牌数 {tables.get('cardCount')} ≠ {len(cards)}")
+    if tables.get("cardsHash") != cards_hash([c for c in card_defs if isinstance(c, dict)]):
+        stale.append("cardsHash 与 cardIds 不一致" if tables.get("cardsHash") else "缺少 cardsHash")
+    n_pool = tables.get("nPool")
+    if n_pool and n_pool.get("nrWeightRatio") != rules["nrWeightRatio"]:
+        stale.append(f"nrWeightRatio {n_pool.get('nrWeightRatio')} ≠ {rules['nrWeightRatio']}")
+    for key, table in (tables.get("versionAlias") or {}).items():
+        versions = key.split("/")
+        if table.get("weights") != [pack_rules.version_weight(rules["versionOdds"], v) for v in versions]:
+            stale.append(f"{key} 的版本权重与 versionOdds 不一致")
+            break
+    if stale:
+        report.warn(where, f"drawTables 已过期（{'；'.join(stale)}），前端会退回逐张扫描，重新运行 build_pack_data.py 即可")
+
+
+def check_pack(report, pack, config, codes, mode):
+    where = f"{mode}:{pack.get('packId') or '?'}"
+    scheme = pack.get("packScheme")
+    if scheme is not None and scheme not in KNOWN_SCHEMES:
+        report.error(where, f"packScheme {scheme!r} 不是已知方案（{'/'.join(KNOWN_SCHEMES)}），前端会按 legacy 抽卡")
+    cards_per_pack = pack.get("cardsPerPack")
+    if not is_number(cards_per_pack) or cards_per_pack <= 0 or cards_per_pack != int(cards_per_pack):
+        report.error(where, f"cardsPerPack = {cards_per_pack!r}，应为正整数")
+    for key in WEIGHT_TABLE_KEYS:
+        check_weight_table(report, where, key, pack.get(key), codes, ("OF",) if key == "boxSlot4Distribution" else ())
+    for key in CHANCE_KEYS:
+        value = pack.get(key)
+        if value is not None and (not is_number(value) or not 0 <= value <= 1):
+            report.error(where, f"{key} = {value!r}，应为 0~1 之间的概率")
+    packs_per_box = pack.get("packsPerBox")
+    if packs_per_box is not None and (not is_number(packs_per_box) or packs_per_box <= 0
+                                      or packs_per_box != int(packs_per_box)):
+        report.error(where, f"packsPerBox = {packs_per_box!r}，应为正整数")
+
+    rules = pack_rules.resolve_rules(pack, config)
+    index = None
+    cards = []
+    card_file = pack.get("cardFile")
+    if card_file:
+        path = os.path.join(pack_rules.OCG_CARDS_DIR, card_file)
+        data = load_json(path, report, where)
+        if data is not None:
+            card_ids = data.get("cardIds")
+            if not isinstance(card_ids, list) or not card_ids:
+                report.error(where, f"{card_file} 的 cardIds 为空")
+                card_ids = []
+            cards = check_card_list(report, where, card_ids, codes, "N", "cardIds")
+            supplement = (data.get("supplementPack") or {}).get("cards") or []
+            check_card_list(report, where, supplement, codes, "UR", "supplementPack.cards")
+            if data.get("packId") and data["packId"] != pack.get("packCode") and data["packId"] != pack.get("packId"):
+                report.warn(where, f"{card_file} 中的 packId {data['packId']} 与 packs.json 不一致")
+            shard = data.get("textShard")
+            if shard and not os.path.exists(os.path.join(pack_rules.OCG_CARDS_DIR, shard)):
+                report.error(where, f"textShard 指向的 {shard} 不存在，前端无法加载效果文本")
+            if rules["scheme"] == SCHEME_OCG and data.get("drawTables"):
+                check_draw_tables(report, where, data["drawTables"], rules, cards, card_ids)
+            index = PackIndex(cards)
+    elif rules["scheme"] != SCHEME_LEGACY:
+        report.error(where, f"{rules['scheme']} 方案需要 cardFile")
+
+    if rules["scheme"] == SCHEME_OCG and index:
+        check_ocg_default(report, where, rules, index)
+    elif rules["scheme"] == SCHEME_LOCH and index:
+        check_loch_special(report, where, rules, index, pack)
+    elif rules["scheme"] == SCHEME_LEGACY:
+        check_legacy(report, where, rules, index, pack)
+
+
+def check_config(report, path, mode, codes):
+    """校验一个 packs.json（OCG / TCG）"""
+    config = load_json(path, report, f"{mode}/packs.json")
+    if config is None:
+        return 0
+    for key in ("defaultVersionOdds", "defaultRarityRates"):
+        check_weight_table(report, f"{mode}/packs.json", key, config.get(key), codes)
+    seen = set()
+    packs = config.get("packs", [])
+    for pos, pack in enumerate(packs):
+        pack_id = pack.get("packId")
+        if not pack_id:
+            report.error(f"{mode}/packs.json", f"packs[{pos}] 缺少 packId")
+        elif pack_id in seen:
+            report.error(f"{mode}:{pack_id}", "packId 重复")
+        seen.add(pack_id)
+        check_pack(report, pack, config, codes, mode)
+    return len(packs)
+
+
+def validate():
+    """校验全部卡包配置，返回 (Report, 卡包数)"""
+    report = Report()
+    codes = check_rarities(report)
+    if codes is None:
+        return report, 0
+    count = check_config(report, pack_rules.OCG_PACKS_PATH, "ocg", codes)
+    count += check_config(report, TCG_PACKS_PATH, "tcg", codes)
+    return report, count
+
+
+def print_report(report, count, elapsed):
+    for level, where, message in report.items:
+        print(f"  {'❌' if level == 'error' else '⚠️'} [{where}] {message}")
+    errors, warnings = len(report.errors), len(report.warnings)
+    status = "❌" if errors else "✅"
+    print(f"{status} 卡包配置校验：{count} 个卡包，错误 {errors} 个，警告 {warnings} 个（{elapsed * 1000:.0f} ms）")
+
+
+def run():
+    """校验并打印报告，没有错误时返回 True（供 build_pack_data.py 调用）"""
+    start = time.perf_counter()
+    report, count = validate()
+    print_report(report, count, time.perf_counter() - start)
+    return not report.errors
+
+
+def main():
+    sys.exit(0 if run() else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,25 +23,30 @@ update_cards_db.py — 百鸽(YGOCDB) 卡牌数据库更新脚本
   1. 获取远程 MD5 校验值
   2. 计算本地 cards.json 的 MD5
   3. 如果 MD5 不同（有新数据），下载 cards.zip
-  4. 解压得到 cards.json，替换本地文件
-  5. （可选）自动运行 build_pack_data.py 重建卡包数据
+  4. 解压得到 cards.json，与旧数据逐卡对比，差异写入 data/common/diffs/cards_diff_{时间}.json
+  5. 替换本地文件
+  6. （可选）自动运行 build_pack_data.py 只重建受影响的卡包
 
 【注意事项】
   - 下载文件约 3~5MB（压缩后），解压约 12~15MB
+  - 下载/解压均为流式处理，中断后重新运行会断点续传（cards.zip.part）
   - 请合理使用，不要频繁调用（百鸽服务器是作者自费维护的）
   - 更新后建议运行 build_pack_data.py 重建卡包数据
 """
 
 import hashlib
-import io
 import json
 import os
+import shutil
 import subprocess
 import sys
 import time
+import urllib.error
 import urllib.request
 import zipfile
 
+import cards_index
+
 
 # ====== 配置 ======
 YGOCDB_CARDS_ZIP_URL = 'https://ygocdb.com/api/v0/cards.zip'
@@ -55,9 +60,18 @@ CARDS_JSON_PATH = os.path.join(COMMON_DIR, 'cards.json')
 # 本地 MD5 缓存文件（记录上次下载的 MD5，避免重复计算大文件的哈希）
 LOCAL_MD5_PATH = os.path.join(COMMON_DIR, '.cards_md5')
 
+# 下载过程中的临时文件（cards.zip 分块下载 / cards.json 解压后原子替换）
+ZIP_PART_PATH = os.path.join(COMMON_DIR, 'cards.zip.part')
+
+# 卡牌差异记录目录（每次更新生成一个 cards_diff_{时间}.json）
+CARDS_DIFF_DIR = os.path.join(COMMON_DIR, 'diffs')
+
 # HTTP 请求超时（秒）
 REQUEST_TIMEOUT = 60
 
+# 下载/解压时每次读写的字节数
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
 # User-Agent（标识项目来源，对百鸽作者友好）
 USER_AGENT = 'YGOCardGame/update_cards_db (https://github.com/SnowCastorice/YGOCardGame)'
 
@@ -76,24 +90,24 @@ def get_remote_md5():
         return None
 
 
-def get_local_md5():
+def get_local_md5(cards_path=CARDS_JSON_PATH, md5_path=LOCAL_MD5_PATH):
     """获取本地 cards.json 的 MD5 校验值"""
     # 优先使用缓存的 MD5
-    if os.path.exists(LOCAL_MD5_PATH):
-        with open(LOCAL_MD5_PATH, 'r') as f:
+    if os.path.exists(md5_path):
+        with open(md5_path, 'r') as f:
             cached_md5 = f.read().strip().lower()
             if cached_md5:
                 print(f'   本地 MD5（缓存）: {cached_md5}')
                 return cached_md5
 
     # 没有缓存则计算
-    if not os.path.exists(CARDS_JSON_PATH):
+    if not os.path.exists(cards_path):
         print('   本地 cards.json 不存在')
         return None
 
     print('   正在计算本地 cards.json 的 MD5（首次可能需要几秒）...')
     md5 = hashlib.md5()
-    with open(CARDS_JSON_PATH, 'rb') as f:
+    with open(cards_path, 'rb') as f:
         for chunk in iter(lambda: f.read(8192), b''):
             md5.update(chunk)
 
@@ -101,109 +115,365 @@ def get_local_md5():
     print(f'   本地 MD5: {local_md5}')
 
     # 缓存 MD5
-    save_local_md5(local_md5)
+    save_local_md5(local_md5, md5_path)
 
     return local_md5
 
 
-def save_local_md5(md5_value):
+def save_local_md5(md5_value, md5_path=LOCAL_MD5_PATH):
     """保存本地 MD5 缓存"""
-    os.makedirs(os.path.dirname(LOCAL_MD5_PATH), exist_ok=True)
-    with open(LOCAL_MD5_PATH, 'w') as f:
+    os.makedirs(os.path.dirname(md5_path), exist_ok=True)
+    with open(md5_path, 'w') as f:
         f.write(md5_value)
 
 
-def download_and_extract():
+def diff_cards_db(old_path, new_path):
     """
-    下载 cards.zip 并解压得到 cards.json
-    返回: (成功标志, 新的 MD5 值)
+    对比新旧卡牌数据库，按 cid 统计新增 / 删除 / 变更的卡牌
+
+    两个文件都是流式读取：先记录旧数据每张卡的哈希，再逐条比对新数据，
+    最后只取回变更卡牌的旧记录计算变化字段，内存中不会同时存在两个完整数据库。
+
+    参数:
+      old_path: 旧 cards.json 路径
+      new_path: 新 cards.json 路径
+
+    返回: {
+      'added':   [{cid, id, cn_name}, ...],
+      'removed': [{cid, id, cn_name}, ...],
+      'changed': [{cid, id, cn_name, fields: [变化的字段]}, ...],
+      'changedPasswords': [受影响的卡牌密码（升序）],
+    }
     """
-    print(f'\n📥 正在下载 cards.zip ...')
-    print(f'   URL: {YGOCDB_CARDS_ZIP_URL}')
-    start_time = time.time()
+    def brief(card):
+        return {'cid': card.get('cid'), 'id': card.get('id'), 'cn_name': card.get('cn_name', '')}
+
+    def record_hash(card):
+        return hashlib.md5(json.dumps(card, ensure_ascii=False, sort_keys=True).encode('utf-8')).digest()
+
+    def changed_fields(old, new):
+        # 顶层字段逐个比较，text / data 展开到子字段（如 text.desc）
+        fields = []
+        for key in sorted(set(old) | set(new)):
+            old_value, new_value = old.get(key), new.get(key)
+            if old_value == new_value:
+                continue
+            if isinstance(old_value, dict) and isinstance(new_value, dict):
+                for sub in sorted(set(old_value) | set(new_value)):
+                    if old_value.get(sub) != new_value.get(sub):
+                        fields.append(f'{key}.{sub}')
+            else:
+                fields.append(key)
+        return fields
+
+    # 第 1 遍：旧数据 cid → (记录哈希, 卡牌密码)
+    old_hashes = {}
+    for cid_str, old_card in cards_index.iter_cards_json(old_path):
+        old_hashes[cid_str] = (record_hash(old_card), old_card.get('id'))
+
+    # 第 2 遍：逐条比对新数据
+    added = []
+    changed_new = {}
+    seen = set()
+    for cid_str, new_card in cards_index.iter_cards_json(new_path):
+        seen.add(cid_str)
+        old = old_hashes.get(cid_str)
+        if old is None:
+            added.append(brief(new_card))
+        elif old[0] != record_hash(new_card):
+            changed_new[cid_str] = new_card
+
+    # 第 3 遍：取回被删除 / 变更卡牌的旧记录
+    removed = []
+    changed = []
+    passwords = {c['id'] for c in added}
+    for cid_str, old_card in cards_index.iter_cards_json(old_path):
+        if cid_str not in seen:
+            removed.append(brief(old_card))
+            passwords.add(old_card.get('id'))
+        elif cid_str in changed_new:
+            new_card = changed_new[cid_str]
+            item = brief(new_card)
+            item['fields'] = changed_fields(old_card, new_card)
+            changed.append(item)
+            passwords.update((old_card.get('id'), new_card.get('id')))
+
+    return {
+        'added': added,
+        'removed': removed,
+        'changed': changed,
+        'changedPasswords': sorted(int(p) for p in passwords if p),
+    }
+
+
+def save_cards_diff(diff, old_md5, new_md5, diff_dir=CARDS_DIFF_DIR):
+    """把卡牌差异写入 data/common/diffs/cards_diff_{时间}.json，返回文件路径"""
+    now = time.localtime()
+    os.makedirs(diff_dir, exist_ok=True)
+    diff_path = os.path.join(diff_dir, time.strftime('cards_diff_%Y%m%d_%H%M%S.json', now))
+
+    output = {
+        '_说明': 'cards.json 更新差异记录（按 cid 对比）—— 由 update_cards_db.py 自动生成',
+        '_用法': '运行 python build_pack_data.py --changed <本文件> 只重建受影响的卡包',
+        'generatedAt': time.strftime('%Y-%m-%d %H:%M:%S', now),
+        'oldMd5': old_md5 or '',
+        'newMd5': new_md5,
+        'summary': {
+            'added': len(diff['added']),
+            'removed': len(diff['removed']),
+            'changed': len(diff['changed']),
+        },
+    }
+    output.update(diff)
+
+    with open(diff_path, 'w', encoding='utf-8') as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    return diff_path
+
+
+def download_zip(zip_url, part_path):
+    """
+    以流式方式下载 cards.zip 到 part_path（分块写入磁盘，边写边计算 MD5）
+
+    part_path 已有未完成的下载时，使用 HTTP Range 断点续传；
+    上次记录的 ETag / Last-Modified 通过 If-Range 发送，远程文件有变化时服务器会返回完整文件。
+
+    返回: 下载完成的 ZIP 文件 MD5，失败返回 None（未完成的部分保留，下次继续）
+    """
+    meta_path = part_path + '.json'
+    existing = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    validator = None
+    if existing and os.path.exists(meta_path):
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('url') == zip_url:
+                validator = meta.get('etag') or meta.get('lastModified')
+        except (OSError, ValueError):
+            pass
+    if not validator:
+        # 没有校验信息的残留文件无法确认是否同一版本，重新下载
+        existing = 0
+
+    headers = {'User-Agent': USER_AGENT}
+    if existing:
+        headers['Range'] = f'bytes={existing}-'
+        headers['If-Range'] = validator
+        print(f'   ⏯️ 发现未完成的下载（{existing / (1024 * 1024):.1f} MB），尝试断点续传')
 
+    md5 = hashlib.md5()
     try:
-        req = urllib.request.Request(YGOCDB_CARDS_ZIP_URL, headers={'User-Agent': USER_AGENT})
+        req = urllib.request.Request(zip_url, headers=headers)
         with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT) as resp:
-            zip_data = resp.read()
-            elapsed = time.time() - start_time
-            size_mb = len(zip_data) / (1024 * 1024)
-            print(f'   下载完成: {size_mb:.1f} MB（耗时 {elapsed:.1f}s）')
-    except Exception as e:
+            if resp.status == 206 and existing:
+                mode = 'ab'
+                # 续传：先把已下载部分计入 MD5
+                with open(part_path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+                        md5.update(chunk)
+            else:
+                mode = 'wb'
+                existing = 0
+
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'url': zip_url,
+                    'etag': resp.headers.get('ETag', ''),
+                    'lastModified': resp.headers.get('Last-Modified', ''),
+                }, f)
+
+            expected = int(resp.headers.get('Content-Length') or 0)
+            received = 0
+            with open(part_path, mode) as f:
+                for chunk in iter(lambda: resp.read(DOWNLOAD_CHUNK_SIZE), b''):
+                    f.write(chunk)
+                    md5.update(chunk)
+                    received += len(chunk)
+
+            if expected and received < expected:
+                print(f'❌ 下载中断：收到 {received} / {expected} 字节（已下载部分已保留，重新运行可断点续传）')
+                return None
+    except urllib.error.HTTPError as e:
+        if e.code == 416 and existing:
+            # 请求范围超出文件大小：说明上次其实已经下载完整
+            print('   ✅ 上次已下载完整，直接使用')
+            with open(part_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+                    md5.update(chunk)
+            return md5.hexdigest()
         print(f'❌ 下载失败: {e}')
-        return False, None
+        return None
+    except Exception as e:
+        print(f'❌ 下载失败（已下载部分已保留，重新运行可断点续传）: {e}')
+        return None
+
+    if existing:
+        print(f'   续传 {received / (1024 * 1024):.1f} MB（此前已下载 {existing / (1024 * 1024):.1f} MB）')
+    return md5.hexdigest()
 
-    # 解压 ZIP
+
+def extract_cards_json(zip_path, output_path):
+    """
+    从 ZIP 中流式解压 cards.json 到 output_path，边写边计算 MD5
+    返回: (MD5, 解压后字节数)；ZIP 中没有 cards.json 时抛出 ValueError
+    """
+    with zipfile.ZipFile(zip_path) as zf:
+        names = zf.namelist()
+        json_file = None
+        for name in names:
+            if name.endswith('cards.json'):
+                json_file = name
+                break
+
+        if not json_file:
+            raise ValueError(f'ZIP 中未找到 cards.json，包含文件: {names}')
+
+        md5 = hashlib.md5()
+        size = 0
+        # ZipFile.open 逐块解压，读完时会自动校验 CRC
+        with zf.open(json_file) as src, open(output_path, 'wb') as dst:
+            for chunk in iter(lambda: src.read(DOWNLOAD_CHUNK_SIZE), b''):
+                dst.write(chunk)
+                md5.update(chunk)
+                size += len(chunk)
+
+    return md5.hexdigest(), size
+
+
+def validate_cards_json(path):
+    """
+    流式验证 cards.json：能完整解析，并抽样检查第一条记录的字段
+    返回: 卡牌记录数；格式无效时抛出 ValueError
+    """
+    card_count = 0
+    for _, card in cards_index.iter_cards_json(path):
+        if card_count == 0:
+            required_fields = ['cid', 'id', 'cn_name', 'jp_name', 'text', 'data']
+            missing_fields = [f for f in required_fields if f not in card]
+            if missing_fields:
+                print(f'   ⚠️ 数据格式可能有变化，缺少字段: {missing_fields}')
+            else:
+                print(f'   ✅ 数据格式验证通过')
+        card_count += 1
+    return card_count
+
+
+def download_and_extract(zip_url=YGOCDB_CARDS_ZIP_URL, dest_dir=COMMON_DIR):
+    """
+    下载 cards.zip 并解压得到 cards.json
+
+    全程流式处理：ZIP 分块写入临时文件（支持断点续传），cards.json 直接解压到磁盘，
+    验证通过后再原子替换正式文件，中途失败不会破坏现有的 cards.json。
+    旧 cards.json 存在时，会与新数据逐卡对比并生成差异记录。
+
+    参数:
+      zip_url: cards.zip 下载地址
+      dest_dir: 目标目录（默认 data/common），cards.json、cards.idx、MD5 缓存、下载临时文件、差异记录都写在这里
+
+    返回: (成功标志, 新的 MD5 值, 差异记录路径或 None)
+    """
+    cards_json_path = os.path.join(dest_dir, os.path.basename(CARDS_JSON_PATH))
+    cards_json_tmp_path = cards_json_path + '.tmp'
+    zip_part_path = os.path.join(dest_dir, os.path.basename(ZIP_PART_PATH))
+    md5_path = os.path.join(dest_dir, os.path.basename(LOCAL_MD5_PATH))
+    diff_dir = os.path.join(dest_dir, os.path.basename(CARDS_DIFF_DIR))
+    index_path = os.path.join(dest_dir, os.path.basename(cards_index.CARDS_INDEX_PATH))
+
+    print(f'\n📥 正在下载 cards.zip ...')
+    print(f'   URL: {zip_url}')
+    start_time = time.time()
+
+    os.makedirs(dest_dir, exist_ok=True)
+    zip_md5 = download_zip(zip_url, zip_part_path)
+    if not zip_md5:
+        return False, None, None
+
+    elapsed = time.time() - start_time
+    size_mb = os.path.getsize(zip_part_path) / (1024 * 1024)
+    print(f'   下载完成: {size_mb:.1f} MB（耗时 {elapsed:.1f}s，ZIP MD5: {zip_md5}）')
+
+    # 解压 ZIP（直接写入临时文件）
     print('📦 正在解压...')
     try:
-        with zipfile.ZipFile(io.BytesIO(zip_data)) as zf:
-            # 查找 cards.json
-            names = zf.namelist()
-            json_file = None
-            for name in names:
-                if name.endswith('cards.json'):
-                    json_file = name
-                    break
-
-            if not json_file:
-                print(f'❌ ZIP 中未找到 cards.json，包含文件: {names}')
-                return False, None
-
-            # 读取 JSON 数据
-            json_data = zf.read(json_file)
-            json_size_mb = len(json_data) / (1024 * 1024)
-            print(f'   解压完成: {json_file} ({json_size_mb:.1f} MB)')
-    except Exception as e:
+        new_md5, json_size = extract_cards_json(zip_part_path, cards_json_tmp_path)
+        print(f'   解压完成: cards.json ({json_size / (1024 * 1024):.1f} MB)')
+    except (zipfile.BadZipFile, ValueError, OSError) as e:
         print(f'❌ 解压失败: {e}')
-        return False, None
-
-    # 计算解压后文件的 MD5（与远程 MD5 对应）
-    new_md5 = hashlib.md5(json_data).hexdigest()
+        # 损坏的压缩包不能用于续传，删除后下次重新下载
+        remove_files(zip_part_path, zip_part_path + '.json', cards_json_tmp_path)
+        return False, None, None
 
     # 验证 JSON 格式
     print('🔍 验证 JSON 格式...')
     try:
-        parsed = json.loads(json_data)
-        card_count = len(parsed)
+        card_count = validate_cards_json(cards_json_tmp_path)
         print(f'   ✅ JSON 有效，包含 {card_count} 条卡牌记录')
-
-        # 简单抽样检查数据格式
-        sample_key = list(parsed.keys())[0]
-        sample = parsed[sample_key]
-        required_fields = ['cid', 'id', 'cn_name', 'jp_name', 'text', 'data']
-        missing_fields = [f for f in required_fields if f not in sample]
-        if missing_fields:
-            print(f'   ⚠️ 数据格式可能有变化，缺少字段: {missing_fields}')
-        else:
-            print(f'   ✅ 数据格式验证通过')
-    except json.JSONDecodeError as e:
+    except ValueError as e:
         print(f'❌ JSON 格式无效: {e}')
-        return False, None
+        remove_files(cards_json_tmp_path)
+        return False, None, None
 
-    # 备份旧文件
-    if os.path.exists(CARDS_JSON_PATH):
-        backup_path = CARDS_JSON_PATH + '.bak'
+    # 与旧数据逐卡对比，记录差异（供 build_pack_data.py 只重建受影响的卡包）
+    diff_path = None
+    if os.path.exists(cards_json_path):
+        print('🔍 对比新旧卡牌数据...')
+        try:
+            old_md5 = get_local_md5(cards_json_path, md5_path)
+            diff = diff_cards_db(cards_json_path, cards_json_tmp_path)
+            diff_path = save_cards_diff(diff, old_md5, new_md5, diff_dir)
+            print(f'   新增 {len(diff["added"])} 张 / 删除 {len(diff["removed"])} 张 / 变更 {len(diff["changed"])} 张')
+            print(f'   涉及卡牌密码 {len(diff["changedPasswords"])} 个，差异记录: {os.path.relpath(diff_path, SCRIPT_DIR)}')
+        except Exception as e:
+            print(f'   ⚠️ 对比失败（将全量重建）: {e}')
+
+    # 备份旧文件（硬链接优先，不支持时复制），保证替换前正式文件始终存在
+    if os.path.exists(cards_json_path):
+        backup_path = cards_json_path + '.bak'
         print(f'📋 备份旧文件: {os.path.basename(backup_path)}')
         try:
-            os.replace(CARDS_JSON_PATH, backup_path)
+            remove_files(backup_path)
+            try:
+                os.link(cards_json_path, backup_path)
+            except OSError:
+                shutil.copy2(cards_json_path, backup_path)
         except Exception as e:
             print(f'   ⚠️ 备份失败（继续写入）: {e}')
 
-    # 写入新文件
+    # 原子替换为新的 cards.json
     print('💾 写入新的 cards.json ...')
-    os.makedirs(os.path.dirname(CARDS_JSON_PATH), exist_ok=True)
-    with open(CARDS_JSON_PATH, 'wb') as f:
-        f.write(json_data)
+    os.replace(cards_json_tmp_path, cards_json_path)
+    remove_files(zip_part_path, zip_part_path + '.json')
 
     # 更新本地 MD5 缓存
-    save_local_md5(new_md5)
+    save_local_md5(new_md5, md5_path)
+
+    # 生成二进制索引 cards.idx（与 MD5 绑定，供其他脚本快速查卡）
+    print('🗂️ 生成卡牌索引 cards.idx ...')
+    try:
+        index_count = cards_index.build_index(cards_json_path, index_path, md5=new_md5)
+        print(f'   ✅ 索引已写入：{index_count} 条记录')
+    except Exception as e:
+        print(f'   ⚠️ 索引生成失败（下次加载时会自动重建）: {e}')
 
     print(f'✅ 更新完成！共 {card_count} 条卡牌记录')
-    return True, new_md5
+    return True, new_md5, diff_path
+
 
+def remove_files(*paths):
+    """删除文件（不存在时忽略）"""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
 
-def run_build_pack_data():
-    """运行 build_pack_data.py 重建所有卡包数据"""
+
+def run_build_pack_data(diff_path=None):
+    """
+    运行 build_pack_data.py 重建卡包数据
+    指定 diff_path 时只重建引用了变更卡牌的卡包
+    """
     build_script = os.path.join(SCRIPT_DIR, 'build_pack_data.py')
     if not os.path.exists(build_script):
         print('⚠️ 未找到 build_pack_data.py，跳过重建')
@@ -213,8 +483,12 @@ def run_build_pack_data():
     print('🔨 自动运行 build_pack_data.py 重建卡包数据...')
     print(f'{"=" * 50}\n')
 
+    cmd = [sys.executable, build_script]
+    if diff_path:
+        cmd += ['--changed', diff_path]
+
     try:
-        subprocess.run([sys.executable, build_script], cwd=SCRIPT_DIR, check=True)
+        subprocess.run(cmd, cwd=SCRIPT_DIR, check=True)
     except subprocess.CalledProcessError as e:
         print(f'⚠️ build_pack_data.py 运行异常（退出码 {e.returncode}）')
     except Exception as e:
@@ -242,10 +516,10 @@ def cmd_update(force=False, rebuild=False):
         print('\n⚡ 强制下载模式，跳过 MD5 检查')
 
     # 下载并解压
-    success, new_md5 = download_and_extract()
+    success, new_md5, diff_path = download_and_extract()
 
     if success and rebuild:
-        run_build_pack_data()
+        run_build_pack_data(diff_path)
 
     if success:
         print(f'\n{"=" * 50}')
@@ -289,21 +563,25 @@ def cmd_info():
         print(f'   文件大小: {size / (1024 * 1024):.1f} MB')
         print(f'   最后修改: {mtime_str}')
 
-        # 统计卡牌数量
+        # 统计卡牌数量（通过二进制索引，无需解析整个 cards.json）
         try:
-            with open(CARDS_JSON_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            print(f'   卡牌总数: {len(data)} 条')
-
-            # 统计有各语言名称的卡
-            cn_count = sum(1 for c in data.values() if c.get('cn_name'))
-            jp_count = sum(1 for c in data.values() if c.get('jp_name'))
-            en_count = sum(1 for c in data.values() if c.get('en_name'))
-            print(f'   有中文名: {cn_count}')
-            print(f'   有日文名: {jp_count}')
-            print(f'   有英文名: {en_count}')
-        except Exception:
-            pass
+            index = cards_index.open_index(CARDS_JSON_PATH)
+            if index is None:
+                print('   ⚠️ 无法打开卡牌索引 cards.idx，跳过卡牌统计')
+            else:
+                with index:
+                    records = list(index.iter_records())
+                print(f'   卡牌总数: {len(records)} 条')
+
+                # 统计有各语言名称的卡
+                cn_count = sum(1 for c in records if c.get('cn_name'))
+                jp_count = sum(1 for c in records if c.get('jp_name'))
+                en_count = sum(1 for c in records if c.get('en_name'))
+                print(f'   有中文名: {cn_count}')
+                print(f'   有日文名: {jp_count}')
+                print(f'   有英文名: {en_count}')
+        except (OSError, ValueError) as e:
+            print(f'   ⚠️ 卡牌统计失败: {e}')
     else:
         print('   ⚠️ 文件不存在')
 